@@ -1,645 +1,791 @@
-import dash
-from dash import dcc, html, Input, Output
-import dash_bootstrap_components as dbc
-import pandas as pd  # 数据处理
-import numpy as np  # 数值计算
-from openpyxl import load_workbook  # 用于读取 Excel 文件
-import plotly.graph_objects as go  # Plotly 图表
-import plotly.express as px
-from dash import Dash, dcc, html, Input, Output
-from dash import dash_table
-
-# 1. 数据预处理
-# Excel 文件路径
-file_path = r"C:\Users\Administrator\Desktop\Tableau\2.Data\Vietnam Data-20241118.xlsx"
+import os
+import sys
+import time
+
+# 导入开始时刻：用于统计导入到第一个响应、导入到数据就绪的耗时（/readyz）
+IMPORT_STARTED = time.perf_counter()
+
+import dash  # noqa: E402
+from dash import dcc, html, Input, Output, State, ClientsideFunction, no_update  # noqa: E402
+from dash import dash_table  # noqa: E402
+from dash.exceptions import PreventUpdate  # noqa: E402
+from figure_cache import FigureCache  # noqa: E402
+from loader import DataLoader, SnapshotStore  # noqa: E402
+from metrics import CallbackMetrics  # noqa: E402
+from selection import SelectionStage  # noqa: E402
+from transport import Transport  # noqa: E402
+# 依赖 pandas / plotly 的模块（data_loader、snapshot、figures、kpi、export 等）在数据加载线程或回调中才导入，
+# 服务启动时不承担这些导入耗时
+
+# 1. 配置
+# Excel 文件路径：环境变量 DASH_DATA_PATH（多个路径或通配符以 os.pathsep 分隔），
+# 例如 DASH_DATA_PATH="C:\Users\Administrator\Desktop\Tableau\2.Data\* Data-*.xlsx"；
+# 也可在命令行指定：python PPT1.py <工作簿> [<工作簿> ...]；默认读取本目录下 data/*.xlsx
+default_data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "*.xlsx")
+data_paths = os.environ.get("DASH_DATA_PATH", default_data_path).split(os.pathsep)
 sheet_name = "Production statistics"
 
-# 读取 Excel 文件
-df = pd.read_excel(file_path, sheet_name=sheet_name)
-
-# 数据清洗和处理
-# 1. 转换日期格式
-df["Statistical time"] = pd.to_datetime(df["Statistical time"], errors="coerce")
-
-# 2. 将所有变量列转换为数值类型
-columns_to_numeric = [
-    "Average ambient temperature (°C)",
-    "Active Energy Imported(kWh)",
-    "Active Energy Exported(kWh)",
-    "Energy production time (h)",
-    "Equivalent Utilization Hours (H)",
-    "Loss due to curtailment (kWh)",
-    "Curtailment duration (h)",
-    "Loss due to fault (kWh)",
-    "Fault duration (h)",
-    "Average wind speed (m/s)"
+# 数据源列表：每个国家一个导出文件，可写路径或通配符；国家名默认取文件名第一段（"Vietnam Data-20241118.xlsx"）
+# 多个工作簿在 ingest_workers 个进程中并行解析，None 表示使用全部 CPU 核心
+# reader="streaming" 使用 openpyxl 只读模式分批读取，内存占用有界；"pandas" 使用 pd.read_excel
+data_sources = [
+    {"path": path, "sheet": sheet_name, "region": "Asia", "reader": "streaming"} for path in data_paths
 ]
+ingest_workers = None
+
+# 存储后端："memory" 把清洗后的数据和预聚合保存在内存中；"sqlite" 把数据写入本地 SQLite 文件，
+# 回调的筛选和聚合在索引上以 SQL 执行（适合超过内存的数据量；python sqlite_store.py <工作簿> 可对比两种后端）
+storage_backend = "memory"
+sqlite_path = None  # None 表示 .cache/production.sqlite
+
+# 图表/表格结果缓存上限（条目数、字节数）
+figure_cache_max_entries = 256
+figure_cache_max_bytes = 64 * 1024 * 1024
+
+# 表格每页行数（服务端分页）
+table_page_size = 50
+
+# 紧凑数据模型：电厂/设备分类编码、float32 数值列、整数日序号，多进程部署时显著降低内存
+# （python compact.py <工作簿> 可查看每列内存对比并检查图表数据一致性）
+compact_data = True
+
+# 增量数据接入：投递目录（None 表示只监视主工作簿）与轮询间隔（秒）
+drop_dir = None
+refresh_interval_s = 60
+
+# 回调埋点：/metrics 输出各回调分阶段耗时直方图；超过 slow_callback_ms 的回调写入慢日志（None 表示不记录）
+metrics_enabled = True
+slow_callback_ms = 1000
+
+# 客户端切换月份：选择电厂/年份时把全年日数据发送到浏览器一次，切换月份时图表 5 由浏览器直接更新
+clientside_month_switching = True
+
+# 传输优化：文本类响应不小于 compress_min_bytes 时压缩（安装了 brotli 时优先 brotli，否则 gzip）；
+# 带版本号的静态资源（组件包、assets）缓存 static_max_age_s 秒；
+# 回调响应带 ETag（数据版本 + 选择器取值），浏览器重复请求时返回 304；/transport-stats 输出各路由的原始/传输字节数
+compression_enabled = True
+compress_min_bytes = 1024
+static_max_age_s = 365 * 24 * 3600
+callback_etags = True
+
+# 数据加载方式："background" 服务立即启动，后台线程加载数据（页面显示加载状态，/readyz 在就绪前返回 503）；
+# "sync" 在 create_app 返回前加载完成；"deferred" 由调用方稍后执行 app.data_loader.start()（见 wsgi.py）
+load_mode = "background"
+# 数据加载期间页面轮询加载状态的间隔（毫秒）
+loading_poll_ms = 1000
+
+DEFAULT_CONFIG = {
+    "data_sources": data_sources,
+    "sheet_name": sheet_name,
+    "ingest_workers": ingest_workers,
+    "storage_backend": storage_backend,
+    "sqlite_path": sqlite_path,
+    "figure_cache_max_entries": figure_cache_max_entries,
+    "figure_cache_max_bytes": figure_cache_max_bytes,
+    "table_page_size": table_page_size,
+    "compact_data": compact_data,
+    "drop_dir": drop_dir,
+    "refresh_interval_s": refresh_interval_s,
+    "metrics_enabled": metrics_enabled,
+    "slow_callback_ms": slow_callback_ms,
+    "clientside_month_switching": clientside_month_switching,
+    "compression_enabled": compression_enabled,
+    "compress_min_bytes": compress_min_bytes,
+    "static_max_age_s": static_max_age_s,
+    "callback_etags": callback_etags,
+    "load_mode": load_mode,
+    "loading_poll_ms": loading_poll_ms,
+}
+
+
+# 2. 定义布局
+def build_layout(config):
+    # 下拉选项在数据加载完成后由 refresh_selector_options 填充
+    # 定义表格组件（移除 'style' 参数）
+    table_layout = dash_table.DataTable(
+        id="data-table",
+        style_table={
+            "maxHeight": "185px",  # 最大高度，出现滚动条
+            "width": "950px",  # 固定宽度
+            "overflowY": "auto",
+            "overflowX": "auto",
+        },
+        style_cell={
+            "textAlign": "center",
+            "fontFamily": "Calibri",
+            "fontSize": "12px",
+            "padding": "5px",
+        },
+        style_header={
+            "backgroundColor": "#0d3057",#"lightgrey",
+            "fontWeight": "bold",
+            "textAlign": "center",
+            "color": "white"  # 字体颜色为白色
+        },
+        fixed_rows={"headers": True},
+        # 服务端分页、排序、筛选：浏览器只接收当前页
+        page_action="custom",
+        page_current=0,
+        page_size=config["table_page_size"],
+        sort_action="custom",
+        sort_mode="multi",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        export_format="xlsx",
+    )
 
-# 转换为数值类型，遇到错误数据会变成 NaN，但不删除整行
-for col in columns_to_numeric:
-    df[col] = pd.to_numeric(df[col], errors="coerce")  # 仅将无法转换的值变为 NaN
-
-# 删除关键列中为 NaN 的数据，而不是整行
-df = df.dropna(subset=["Statistical time", "Power plant name"])  # 确保关键列没有 NaN
-
-# 3. 添加时间相关列（年、月、周等）
-df["Year"] = df["Statistical time"].dt.year
-df["Month"] = df["Statistical time"].dt.month
-df["Week"] = df["Statistical time"].dt.isocalendar().week
-df["Day"] = df["Statistical time"].dt.date
-
-# 获取所有可用年份和电厂
-available_years = sorted(df["Year"].unique(), reverse=True)
-available_projects = sorted(df["Power plant name"].unique())
-
-# 2. 初始化 Dash 应用
-app = dash.Dash(__name__)
-
-# 定义表格组件（移除 'style' 参数）
-table_layout = dash_table.DataTable(
-    id="data-table",
-    style_table={
-        "maxHeight": "185px",  # 最大高度，出现滚动条
-        "width": "950px",  # 固定宽度
-        "overflowY": "auto",
-        "overflowX": "auto",
-    },
-    style_cell={
-        "textAlign": "center",
-        "fontFamily": "Calibri",
-        "fontSize": "12px",
-        "padding": "5px",
-    },
-    style_header={
-        "backgroundColor": "#0d3057",#"lightgrey",
-        "fontWeight": "bold",
-        "textAlign": "center",
-        "color": "white"  # 字体颜色为白色
-    },
-    fixed_rows={"headers": True},
-    page_action="none",
-    export_format="xlsx",
-)
-
-# 3. 定义布局
-layout = html.Div("Asia Region Project Monthly Report")
-app.layout = html.Div(
-    style={
-        "width": "1600px",  # 设置仪表盘的宽度为 1600px
-        "height": "900px",  # 设置仪表盘的高度为 900px
-        "margin": "0 auto",  # 居中显示
-        "padding": "20px",  # 添加内边距
-        "boxSizing": "border-box",  # 包括内边距在内的总宽度
-        "overflow": "hidden",  # 防止超出内容显示滚动条
-    },
-    children=[
-        html.H1(
-            "Asia Region Project Monthly Report",
-            style={
-                "textAlign": "center",  # 文本居中
-                "height": "43px",  # 高度设置为 43px
-                "lineHeight": "43px",  # 行高设置为 43px，确保文本在垂直方向居中
-                "fontFamily": "Calibri",  # 字体设置为 Calibri
-                "fontSize": "22px",  # 字体大小设置为 22px
-                "fontWeight": "bold",  # 字体加粗
-                "color": "#0d3057",  # 字体颜色为深蓝色
-                "margin": "0" , # 移除默认的上下外边距
-            }
-        ),
-
-    # 筛选器
+    # 机队 KPI 视图：按所选 KPI 对全部电厂（或设备）排名，并按月显示热力图；年份/月份使用上方的筛选器
+    fleet_layout = html.Div([
         html.Div([
             html.Div([
-                html.Label("Year:"),
-                dcc.Dropdown(
-                    id="year-selector",
-                    options=[{"label": str(year), "value": year} for year in available_years],
-                    value=available_years[0],
-                    clearable=False
-                )
-            ], style={"marginLeft": "50px", "width": "200px", "display": "inline-block", "height": "35px",
-                      "font-size": "10px"}),
-
-            html.Div([
-                html.Label("Month:"),
-                dcc.Dropdown(
-                    id="month-selector",
-                    options=[{"label": month, "value": idx} for idx, month in enumerate(
-                        ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
-                         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)],
-                    value=1,
-                    clearable=False
-                )
-            ], style={"marginLeft": "100px", "width": "200px", "display": "inline-block", "height": "35px",
-                      "font-size": "10px"}),
-            html.Div([
-                html.Label("Project Name:"),
+                html.Label("KPI:"),
                 dcc.Dropdown(
-                    id="plant-selector",
-                    options=[{"label": plant, "value": plant} for plant in available_projects],
-                    value=available_projects[0],
+                    id="fleet-kpi-selector",
+                    options=[],
+                    value="availability",
                     clearable=False
                 )
-            ], style={"marginLeft": "100px", "width": "200px", "display": "inline-block", "height": "35px",
-                      "font-size": "10px"})
-        ], style={"textAlign": "left", "marginBottom": "30px"}),
-
-    #图表布局
-    html.Div(
-            style={"position": "relative", "width": "1600px", "height": "900px"},  # 设置整体容器的宽度和高度
-            children=[
-                html.Div(
-                    dcc.Graph(
-                    # 第一行三个图表
-                        id="monthly-wind-chart",
-                        style={"width": "550px", "height": "140px"},  # 修正宽和高
-                    ),
-                    style={"position": "absolute", "left": "10px", "top": "40px"},  # 设置位置
-                ),
-                html.Div(
-                    dcc.Graph(
-                    id="weekly-wind-chart",
-                    style={"width": "550px", "height": "216px"},  # 修正宽和高
-                    ),
-                    style={"position": "absolute", "left": "10px", "top": "200px"},  # 设置位置
-                ),
-                html.Div(
-                    dcc.Graph(
-                    id="annual-production-chart",
-                    style={"width": "550px", "height": "100px"},  # 修正宽和高
-                    ),
-                    style={"position": "absolute", "left": "10px", "top": "430px"},  # 设置位置
-                ),
-                html.Div(
-                    dcc.Graph(
-                    id="combined-chart",
-                    style={"width": "550px", "height": "225px"},  # 修正宽和高
-                    ),
-                    style={"position": "absolute", "left": "10px", "top": "550px"},  # 设置位置
-                ),
-                html.Div(
-                    dcc.Graph(
-                    id="combined-chart2",
-                    style={"width": "1020px", "height": "550px"},  # 修正宽和高
-                    ),
-                    style={"position": "absolute", "left": "570px", "top": "40px"},  # 设置位置
-                ),
-                html.Div(
-                    table_layout,
-                    style={"position": "absolute", "left": "590px", "top": "550px"},  # 修正宽和高
-                ),
-            ]
-        ),
-    ],
-)
-
-# 回调函数更新表格
-@app.callback(
-    Output("data-table", "data"),
-    Output("data-table", "columns"),
-    [
-        Input("year-selector", "value"),
-        Input("month-selector", "value"),
-        Input("plant-selector", "value")
-    ]
-)
-def update_table(selected_year, selected_month, selected_project):
-    # 筛选数据
-    filtered_df = df[
-        (df["Year"] == selected_year) &
-        (df["Month"] == selected_month) &
-        (df["Power plant name"] == selected_project)
-    ]
-
-    # 按 Device Name 和日期分组，统计变量的日数据
-    grouped_df = filtered_df.groupby(["Device Name", "Day"]).agg({
-        "Average ambient temperature (°C)": "mean",
-        "Active Energy Imported(kWh)": "sum",
-        "Active Energy Exported(kWh)": "sum",
-        "Energy production time (h)": "sum",
-        "Equivalent Utilization Hours (H)": "sum",
-        "Loss due to curtailment (kWh)": "sum",
-        "Curtailment duration (h)": "sum",
-        "Loss due to fault (kWh)": "sum",
-        "Fault duration (h)": "sum",
-        "Average wind speed (m/s)": "mean"
-    }).reset_index()
-
-    # 转换为适合 DataTable 的格式
-    data = grouped_df.to_dict("records")  # 转换为字典列表
-    columns = [{"name": col, "id": col} for col in grouped_df.columns]  # 列名和列 ID
-
-    return data, columns
-
-# 4. 定义回调函数
-@app.callback(
-    Output("monthly-wind-chart", "figure"),
-    Input("plant-selector", "value")
-)
-def update_chart(selected_project):
-    filtered_df = df[df["Power plant name"] == selected_project]
-    # 图表 1：仅使用 project 筛选
-    monthly_data = df[df["Power plant name"] == selected_project].groupby(["Year", "Month"]).agg({
-        "Average wind speed (m/s)": "mean"
-    }).reset_index()
-
-    # 2. 构造完整的月份数据框架，确保所有月份（1-12）都有记录
-    all_years = df["Year"].unique()
-    all_months = list(range(1, 13))  # 1 到 12 月
-    full_index = pd.MultiIndex.from_product([all_years, all_months], names=["Year", "Month"])
-    monthly_data = monthly_data.set_index(["Year", "Month"]).reindex(full_index).reset_index()
-
-    # 3. 将月份数字转换为英文名称的前三个字母
-    monthly_data["Month"] = monthly_data["Month"].apply(lambda x: pd.to_datetime(f"2024-{x}-01").strftime("%b"))
-
-    # 4. 固定月份顺序为 "Jan" 到 "Dec"
-    month_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    monthly_data["Month"] = pd.Categorical(monthly_data["Month"], categories=month_order, ordered=True)
-    # 5. 创建对比年份的折线图
-    monthly_wind_chart = go.Figure()
-    for year in monthly_data["Year"].unique():
-        yearly_data = monthly_data[monthly_data["Year"] == year]
-        monthly_wind_chart.add_trace(
-            go.Scatter(
-                x=yearly_data["Month"],
-                y=yearly_data["Average wind speed (m/s)"],
-                mode="lines+markers",
-                name=str(year),
-                line = dict(width=2)  # 设置线条宽度
-            )
-        )
-    #原先代码monthly_wind_chart.update_layout(title="Monthly Wind Speed", xaxis_title="Month", yaxis_title="Wind Speed (m/s)")
-    # 更新图表布局
-    monthly_wind_chart.update_layout(
-        title=dict(
-            text="Comparison of Annual Average Wind Speed",  # 标题文本
-            font=dict(
-                family="Arial",  # 字体
-                size=14,  # 字体大小
-                color="black"  # 字体颜色
+            ], style={"marginLeft": "50px", "width": "300px", "display": "inline-block", "font-size": "10px"}),
+            dcc.RadioItems(
+                id="fleet-level",
+                options=[{"label": "Plants", "value": "plant"}, {"label": "Devices", "value": "device"}],
+                value="plant",
+                inline=True,
+                style={"marginLeft": "100px", "display": "inline-block", "fontFamily": "Calibri", "fontSize": "12px"}
             ),
-            x=0.5,  # 标题水平居中
-            xanchor="center",  # 锚点设置为左侧
-            pad=dict(
-                t=30  # 标题和图表的间距
-            )
-        ),
-        xaxis=dict(
-            categoryorder="array",
-            categoryarray=month_order,  # 按固定顺序排列月份
-            showgrid = False  # 取消 X 轴网格线
+            dcc.RadioItems(
+                id="fleet-period",
+                options=[{"label": "Selected month", "value": "month"}, {"label": "Whole year", "value": "year"}],
+                value="month",
+                inline=True,
+                style={"marginLeft": "100px", "display": "inline-block", "fontFamily": "Calibri", "fontSize": "12px"}
+            ),
+        ], style={"marginBottom": "10px"}),
+        html.Div(
+            dash_table.DataTable(
+                id="fleet-table",
+                style_table={"maxHeight": "700px", "width": "700px", "overflowY": "auto"},
+                style_cell={"textAlign": "center", "fontFamily": "Calibri", "fontSize": "12px", "padding": "5px"},
+                style_header={"backgroundColor": "#0d3057", "fontWeight": "bold", "textAlign": "center",
+                              "color": "white"},
+                fixed_rows={"headers": True},
+                sort_action="native",
+                page_action="none",
+            ),
+            style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "10px"},
         ),
-        yaxis=dict(
-            showgrid=False  # 取消 Y 轴网格线
+        html.Div(
+            dcc.Graph(id="fleet-heatmap", style={"width": "850px", "height": "700px"}),
+            style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "20px"},
         ),
-        margin=dict(
-            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
-            b=10, # 图表下边距
-            l=10, # 设置左侧边距为 15px
-            r=10 # 图表右边距
+    ])
+
+    # 功率曲线视图：所选电厂各设备相对电厂参考曲线的出力偏差排名，勾选设备后叠加其实测曲线；电厂/年份/月份使用上方的筛选器
+    power_curve_layout = html.Div([
+        dcc.RadioItems(
+            id="power-curve-period",
+            options=[{"label": "Selected month", "value": "month"}, {"label": "Whole year", "value": "year"}],
+            value="month",
+            inline=True,
+            style={"marginLeft": "50px", "marginBottom": "10px", "fontFamily": "Calibri", "fontSize": "12px"}
         ),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-        plot_bgcolor = "white"  # 设置背景为白色
-        )
-
-    return monthly_wind_chart
-
-
-@app.callback(
-    Output("weekly-wind-chart", "figure"),
-      Input("plant-selector", "value")
-)
-def update_wind_speed_year_graph(selected_project):
-    # 筛选数据
-    filtered_df = df[df["Power plant name"] == selected_project]
-    # 图表 2：周风速变化区域图
-    # 1. 计算整个数据集的开始日期和结束日期（不受年份筛选器影响）
-    start_date = df["Statistical time"].min()  # 数据集的最早日期
-    end_date = df["Statistical time"].max()  # 数据集的最晚日期
-
-    # 2. 按每周分组，计算每周的平均风速
-    weekly_data = df[df["Power plant name"] == selected_project].resample("W-Mon", on="Statistical time").agg({
-        "Average wind speed (m/s)": "mean"
-    }).reset_index()
-
-    # 3. 创建完整的日期范围（从开始日期到结束日期，每周一为时间点）
-    full_date_range = pd.date_range(start=start_date, end=end_date, freq="W-Mon")
-
-    # 4. 将完整的日期范围与每周数据对齐
-    weekly_data = weekly_data.set_index("Statistical time").reindex(full_date_range).reset_index()
-    weekly_data.columns = ["Statistical time", "Average wind speed (m/s)"]
-
-    # 5. 绘制区域图
-    weekly_wind_chart = go.Figure(
-        data=go.Scatter(
-            x=weekly_data["Statistical time"],# X 轴为完整的每周时间点
-            y=weekly_data["Average wind speed (m/s)"],# Y 轴为每周的平均风速
-            mode="lines",# 显示线条模式
-            fill="tozeroy",# 填充区域到 Y=0
-            name="Weekly Average Wind Speed",
-            line = dict(color="#0d3057", width=2),  # 设置线条颜色
-            fillcolor = "#0d3057"  # 区域填充颜色
-
-        )
-    )
-    #原先代码weekly_wind_chart.update_layout(title="Weekly Wind Speed", xaxis_title="Week", yaxis_title="Wind Speed (m/s)")
-    # 6. 更新图表布局
-    weekly_wind_chart.update_layout(
-        title=dict(
-            text="Variation of Weekly Average Wind Speed",  # 标题文本
-            font=dict(
-                family="Arial",  # 字体
-                size=14,  # 字体大小
-                color="black"  # 字体颜色
+        html.Div(
+            dash_table.DataTable(
+                id="power-curve-table",
+                style_table={"maxHeight": "700px", "width": "700px", "overflowY": "auto"},
+                style_cell={"textAlign": "center", "fontFamily": "Calibri", "fontSize": "12px", "padding": "5px"},
+                style_header={"backgroundColor": "#0d3057", "fontWeight": "bold", "textAlign": "center",
+                              "color": "white"},
+                # 判定为出力偏低的设备标红
+                style_data_conditional=[{"if": {"filter_query": '{Underperforming} = "Yes"'}, "color": "#c0504d"}],
+                fixed_rows={"headers": True},
+                row_selectable="multi",
+                selected_row_ids=[],
+                sort_action="native",
+                page_action="none",
             ),
-            x=0.5,  # 标题水平居中
-            xanchor="center",
-            pad=dict(
-                t=1  # 标题和图表的间距
-            )
+            style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "10px"},
         ),
-        xaxis=dict(
-            showgrid=False,  # 不显示网格线
-            tickformat="%Y-%m-%d",  # 日期格式化为 年-月-日
+        html.Div(
+            dcc.Graph(id="power-curve-chart", style={"width": "850px", "height": "700px"}),
+            style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "20px"},
         ),
-        yaxis=dict(
-            showgrid=True  # 显示网格线
+    ])
+
+    # 风速分布视图：所选电厂的风速直方图和 Weibull 拟合、各月百分位数、各设备的分布统计；电厂/年份/月份使用上方的筛选器
+    wind_layout = html.Div([
+        dcc.RadioItems(
+            id="wind-period",
+            options=[{"label": "Selected month", "value": "month"}, {"label": "Whole year", "value": "year"}],
+            value="month",
+            inline=True,
+            style={"marginLeft": "50px", "marginBottom": "10px", "fontFamily": "Calibri", "fontSize": "12px"}
         ),
-        margin=dict(
-            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
-            b=10,
-            l=10,
-            r=10
+        html.Div(
+            dash_table.DataTable(
+                id="wind-device-table",
+                style_table={"maxHeight": "700px", "width": "700px", "overflowY": "auto"},
+                style_cell={"textAlign": "center", "fontFamily": "Calibri", "fontSize": "12px", "padding": "5px"},
+                style_header={"backgroundColor": "#0d3057", "fontWeight": "bold", "textAlign": "center",
+                              "color": "white"},
+                fixed_rows={"headers": True},
+                sort_action="native",
+                page_action="none",
+            ),
+            style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "10px"},
         ),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-        plot_bgcolor="white"  # 设置背景为白色
+        html.Div([
+            dcc.Graph(id="wind-distribution-chart", style={"width": "850px", "height": "345px"}),
+            dcc.Graph(id="wind-percentile-chart", style={"width": "850px", "height": "345px"}),
+        ], style={"display": "inline-block", "verticalAlign": "top", "marginLeft": "20px"}),
+    ])
+
+    # 视图切换标签样式
+    tab_style = {"height": "30px", "padding": "4px", "fontFamily": "Calibri", "fontSize": "12px"}
+    tab_selected_style = dict(tab_style, fontWeight="bold", borderTop="2px solid #0d3057")
+
+    return html.Div(
+        style={
+            "width": "1600px",  # 设置仪表盘的宽度为 1600px
+            "height": "900px",  # 设置仪表盘的高度为 900px
+            "margin": "0 auto",  # 居中显示
+            "padding": "20px",  # 添加内边距
+            "boxSizing": "border-box",  # 包括内边距在内的总宽度
+            "overflow": "hidden",  # 防止超出内容显示滚动条
+        },
+        children=[
+            html.H1(
+                "Asia Region Project Monthly Report",
+                style={
+                    "textAlign": "center",  # 文本居中
+                    "height": "43px",  # 高度设置为 43px
+                    "lineHeight": "43px",  # 行高设置为 43px，确保文本在垂直方向居中
+                    "fontFamily": "Calibri",  # 字体设置为 Calibri
+                    "fontSize": "22px",  # 字体大小设置为 22px
+                    "fontWeight": "bold",  # 字体加粗
+                    "color": "#0d3057",  # 字体颜色为深蓝色
+                    "margin": "0" , # 移除默认的上下外边距
+                }
+            ),
+
+        # 筛选器
+            html.Div([
+                html.Div([
+                    html.Label("Year:"),
+                    dcc.Dropdown(
+                        id="year-selector",
+                        options=[],
+                        clearable=False
+                    )
+                ], style={"marginLeft": "50px", "width": "200px", "display": "inline-block", "height": "35px",
+                          "font-size": "10px"}),
+
+                html.Div([
+                    html.Label("Month:"),
+                    dcc.Dropdown(
+                        id="month-selector",
+                        options=[{"label": month, "value": idx} for idx, month in enumerate(
+                            ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+                             "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], 1)],
+                        value=1,
+                        clearable=False
+                    )
+                ], style={"marginLeft": "100px", "width": "200px", "display": "inline-block", "height": "35px",
+                          "font-size": "10px"}),
+                html.Div([
+                    html.Label("Project Name:"),
+                    dcc.Dropdown(
+                        id="plant-selector",
+                        options=[],
+                        clearable=False
+                    )
+                ], style={"marginLeft": "100px", "width": "200px", "display": "inline-block", "height": "35px",
+                          "font-size": "10px"}),
+                # 日期区间：选定后日图表和表格显示该区间（代替所选月份），清除后恢复按月显示
+                html.Div([
+                    html.Label("Date range:"),
+                    dcc.DatePickerRange(
+                        id="date-range",
+                        display_format="YYYY-MM-DD",
+                        clearable=True,
+                        minimum_nights=0,
+                    )
+                ], style={"marginLeft": "50px", "display": "inline-block", "verticalAlign": "top",
+                          "font-size": "10px"}),
+                # 导出所选年份全部电厂的设备日数据
+                html.A("Export fleet year (CSV)", id="export-link", href="", target="_blank",
+                       style={"marginLeft": "100px", "fontFamily": "Calibri", "fontSize": "12px", "color": "#0d3057"}),
+                # 数据加载状态（加载完成后隐藏）
+                html.Span("Loading data…", id="load-status",
+                          style={"marginLeft": "50px", "fontFamily": "Calibri", "fontSize": "12px", "color": "#c0504d"})
+            ], style={"textAlign": "left", "marginBottom": "30px"}),
+
+        # 数据版本轮询：加载期间按 loading_poll_ms 检查是否就绪，之后按 refresh_interval_s 检查新快照
+        dcc.Interval(id="data-refresh", interval=config["loading_poll_ms"]),
+        dcc.Store(id="data-version"),
+        # 当前选择键（工作集保存在服务端）
+        dcc.Store(id="selection-key"),
+        dcc.Store(id="daily-year-payload"),
+        dcc.Store(id="daily-range-figure"),
+
+        # 四个视图：单个电厂的月报 / 电厂内设备的功率曲线偏差 / 风速分布 / 跨电厂的机队 KPI 排名
+        dcc.Tabs(id="view-tabs", value="project", style=tab_style, children=[
+        dcc.Tab(label="Project", value="project", style=tab_style, selected_style=tab_selected_style, children=[
+        #图表布局
+        html.Div(
+                style={"position": "relative", "width": "1600px", "height": "900px"},  # 设置整体容器的宽度和高度
+                children=[
+                    html.Div(
+                        dcc.Graph(
+                        # 第一行三个图表
+                            id="monthly-wind-chart",
+                            style={"width": "550px", "height": "140px"},  # 修正宽和高
+                        ),
+                        style={"position": "absolute", "left": "10px", "top": "40px"},  # 设置位置
+                    ),
+                    html.Div(
+                        dcc.Graph(
+                        id="weekly-wind-chart",
+                        style={"width": "550px", "height": "216px"},  # 修正宽和高
+                        ),
+                        style={"position": "absolute", "left": "10px", "top": "200px"},  # 设置位置
+                    ),
+                    html.Div(
+                        dcc.Graph(
+                        id="annual-production-chart",
+                        style={"width": "550px", "height": "100px"},  # 修正宽和高
+                        ),
+                        style={"position": "absolute", "left": "10px", "top": "430px"},  # 设置位置
+                    ),
+                    html.Div(
+                        dcc.Graph(
+                        id="combined-chart",
+                        style={"width": "550px", "height": "225px"},  # 修正宽和高
+                        ),
+                        style={"position": "absolute", "left": "10px", "top": "550px"},  # 设置位置
+                    ),
+                    html.Div(
+                        dcc.Graph(
+                        id="combined-chart2",
+                        style={"width": "1020px", "height": "550px"},  # 修正宽和高
+                        ),
+                        style={"position": "absolute", "left": "570px", "top": "40px"},  # 设置位置
+                    ),
+                    html.Div(
+                        table_layout,
+                        style={"position": "absolute", "left": "590px", "top": "550px"},  # 修正宽和高
+                    ),
+                    # 表格粒度：设备 × 日，或各设备在所选月份/日期区间的合计
+                    html.Div(
+                        dcc.RadioItems(
+                            id="table-granularity",
+                            options=[{"label": "Device × day", "value": "day"},
+                                     {"label": "Device totals", "value": "totals"}],
+                            value="day",
+                            inline=True,
+                            style={"fontFamily": "Calibri", "fontSize": "12px"}
+                        ),
+                        style={"position": "absolute", "left": "590px", "top": "760px"},
+                    ),
+                ]
+            ),
+        ]),
+        dcc.Tab(label="Power curve", value="power-curve", style=tab_style, selected_style=tab_selected_style,
+                children=[power_curve_layout]),
+        dcc.Tab(label="Wind resource", value="wind", style=tab_style, selected_style=tab_selected_style,
+                children=[wind_layout]),
+        dcc.Tab(label="Fleet KPIs", value="fleet", style=tab_style, selected_style=tab_selected_style,
+                children=[fleet_layout]),
+        ]),
+        ],
     )
 
-    return weekly_wind_chart
 
+# 3. 初始化 Dash 应用
+def create_app(config=None):
+    # config 中的键覆盖 DEFAULT_CONFIG；返回 Dash 应用（app.server 为 Flask 应用，app.data_loader 为数据加载状态）
+    config = dict(DEFAULT_CONFIG, **(config or {}))
+    app = dash.Dash(__name__)
+    server = app.server
+
+    # 数据快照：加载完成前为空；新数据到达时后台生成新快照并原子替换，回调每次只读取一个快照
+    snapshot_store = SnapshotStore()
+
+    # 压缩、静态资源缓存和回调 ETag（最先挂接：其响应钩子最后执行，埋点记录的是压缩前的大小）
+    transport = Transport(lambda: getattr(snapshot_store.current(), "version", None), config["compress_min_bytes"],
+                          config["static_max_age_s"], config["compression_enabled"], config["callback_etags"])
+    transport.register(server)  # /transport-stats
+
+    # 回调埋点（须在定义回调之前挂接）
+    if config["metrics_enabled"]:
+        callback_metrics = CallbackMetrics(config["slow_callback_ms"])
+        callback_metrics.instrument_callbacks(app)
+        callback_metrics.register(server)
 
-@app.callback(
-        Output("annual-production-chart", "figure"),
-        Input("plant-selector", "value")
+    data_loader = DataLoader(snapshot_store, config, IMPORT_STARTED)
+    data_loader.register(server)  # /healthz、/readyz
+
+    # 回调结果缓存：键为 (输出, 选择器取值, 数据版本)，数据重新加载时失效
+    figure_cache = FigureCache(config["figure_cache_max_entries"], config["figure_cache_max_bytes"])
+    snapshot_store.subscribe(lambda snapshot: figure_cache.set_data_version(snapshot.version))
+
+    # 共享选择阶段：每次选择只计算一次工作集，图表和表格回调通过选择键取用
+    selection_stage = SelectionStage(snapshot_store)
+
+    @server.route("/cache-stats")
+    def cache_stats():
+        # 缓存命中/未命中/淘汰计数，用于评估缓存容量
+        return figure_cache.stats()
+
+    # 设备日数据批量导出（流式 CSV.gz / xlsx）：/export/device-daily?format=csv&plant=...&start=2024-01&end=2024-12
+    @server.route("/export/device-daily")
+    def export_device_daily():
+        snapshot = snapshot_store.current()
+        if snapshot is None:
+            return {"status": data_loader.status}, 503
+        from export import export_device_daily
+
+        return export_device_daily(snapshot)
+
+    @server.route("/selection-stats")
+    def selection_stats():
+        # 选择阶段各步骤耗时
+        return selection_stage.stats()
+
+    app.layout = build_layout(config)
+    register_callbacks(app, config, snapshot_store, data_loader, figure_cache, selection_stage)
+
+    app.snapshot_store = snapshot_store
+    app.data_loader = data_loader
+    if config["load_mode"] == "background":
+        data_loader.start()
+    elif config["load_mode"] == "sync":
+        data_loader.run()
+    return app
+
+
+# 4. 定义回调函数
+def period_key(selection):
+    # 日图表和表格的缓存键：选择了日期区间时与年份、月份无关
+    if selection.get("start") is not None:
+        return selection["plant"], "range", selection["start"], selection["end"]
+    return selection["plant"], selection["year"], selection["month"]
+
+
+def register_callbacks(app, config, snapshot_store, data_loader, figure_cache, selection_stage):
+    # 数据加载完成或快照替换后更新年份、电厂和 KPI 下拉选项；当前选择在新数据中不存在时改为默认值
+    @app.callback(
+        Output("year-selector", "options"),
+        Output("year-selector", "value"),
+        Output("plant-selector", "options"),
+        Output("plant-selector", "value"),
+        Output("fleet-kpi-selector", "options"),
+        Output("date-range", "min_date_allowed"),
+        Output("date-range", "max_date_allowed"),
+        Output("data-version", "data"),
+        Output("data-refresh", "interval"),
+        Output("load-status", "children"),
+        Input("data-refresh", "n_intervals"),
+        State("data-version", "data"),
+        State("year-selector", "value"),
+        State("plant-selector", "value"),
     )
-def update_wind_speed_year_graph(selected_project):
-        # 筛选数据
-    filtered_df = df[df["Power plant name"] == selected_project]
-    # 图表 3：年度产量柱状图（纵坐标为年份，横坐标为年度产量）
-    annual_data = df[df["Power plant name"] == selected_project].groupby("Year").agg({
-        "Active Energy Exported(kWh)": "sum"
-    }).reset_index()
-
-    annual_production_chart = go.Figure(
-        data=go.Bar(
-            y=annual_data["Year"],  # 纵坐标为年份
-            x=annual_data["Active Energy Exported(kWh)"],  # 横坐标为年度产量
-            orientation="h",  # 将柱状图设置为水平
-            marker_color="#0d3057",  # 图形颜色与图表 2 一致
-            name="Annual Production (kWh)"
-        )
+    def refresh_selector_options(n_intervals, current_version, selected_year, selected_project):
+        snapshot = snapshot_store.current()
+        refresh_ms = config["refresh_interval_s"] * 1000
+        if snapshot is None:
+            if data_loader.status == "failed":
+                return (no_update,) * 8 + (refresh_ms, f"Data loading failed: {data_loader.error}")
+            raise PreventUpdate
+        if snapshot.version == current_version:
+            raise PreventUpdate
+        from kpi import KPIS
+
+        year_options = [{"label": str(year), "value": year} for year in snapshot.available_years]
+        plant_options = [{"label": plant, "value": plant} for plant in snapshot.available_projects]
+        kpi_options = [{"label": label, "value": name} for name, (label, _) in KPIS.items()]
+        if selected_year not in snapshot.available_years:
+            selected_year = snapshot.available_years[0]
+        if selected_project not in snapshot.available_projects:
+            selected_project = snapshot.available_projects[0]
+        # 日期区间的可选范围：数据的首日到末日
+        first_day, last_day = snapshot.index.start_time.date(), snapshot.index.end_time.date()
+        return (year_options, selected_year, plant_options, selected_project, kpi_options, first_day, last_day,
+                snapshot.version, refresh_ms, "")
+
+    # 选择阶段：下拉框变化时计算一次工作集，只把选择键写入 dcc.Store
+    @app.callback(
+        Output("selection-key", "data"),
+        [
+            Input("year-selector", "value"),
+            Input("month-selector", "value"),
+            Input("plant-selector", "value"),
+            Input("date-range", "start_date"),
+            Input("date-range", "end_date"),
+            Input("data-version", "data"),
+        ],
+        State("selection-key", "data"),
     )
-    #annual_production_chart.update_layout(title="Annual Production", xaxis_title="Year", yaxis_title="Production (kWh)")
-
-    annual_production_chart.update_layout(
-        title=dict(
-            text="Statistics of Annual Power Production",  # 标题文本
-            font=dict(
-                family="Arial",  # 字体
-                size=14,  # 字体大小
-                color="black"  # 字体颜色
-            ),
-            x=0.5,  # 标题水平居中
-            xanchor="center",
-            pad=dict(
-                t=10  # 标题和图表的间距
-            )
-        ),
-        yaxis=dict(
-            tickmode="linear",  # 仅显示整数年份
-            tick0=annual_data["Year"].min(),  # 起始年份
-            dtick=1  # 每次递增 1
-        ),
-        margin=dict(
-            t=30,  # 图表整体距离顶部的外边距（标题包含在此范围内）
-            b=10,
-            l=10,
-            r=10
-        ),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-        plot_bgcolor="white"  # 设置背景为白色
+    def update_selection(selected_year, selected_month, selected_project, start_date, end_date, data_version,
+                         previous):
+        if data_version is None or None in (selected_year, selected_month, selected_project):
+            raise PreventUpdate
+        return selection_stage.select(selected_project, selected_year, selected_month, previous, start_date, end_date)
+
+    # 导出链接：所选年份、全部电厂
+    @app.callback(
+        Output("export-link", "href"),
+        Input("year-selector", "value")
     )
-
-    return annual_production_chart
-
-
-@app.callback(
-    Output("combined-chart", "figure"),
-    [
-        Input("year-selector", "value"),
-        Input("plant-selector", "value")
-     ]
-)
-def update_monthly_energy_production_graph(selected_year, selected_project):
-    # 筛选数据
-    filtered_df = df[
-        (df["Year"] == selected_year) &
-        (df["Power plant name"] == selected_project)
-    ]
-    #图表4风速与功率双Y轴图表
-    # 按年份分组，计算每年的月度产量和平均风
-
-    monthly_data_combined = filtered_df.groupby("Month").agg({
-        "Active Energy Exported(kWh)": "sum",
-        "Average wind speed (m/s)": "mean"
-    }).reset_index()
-
-    # 将月份数字转换为英文的前三个字母
-    monthly_data_combined["Month"] = monthly_data_combined["Month"].apply(
-        lambda x: pd.to_datetime(f"2024-{x}-01").strftime("%b")  # 使用 2024 年的任意日期转换月份
+    def update_export_link(selected_year):
+        if selected_year is None:
+            raise PreventUpdate
+        return f"/export/device-daily?format=csv&start={selected_year}-01&end={selected_year}-12"
+
+    # 回调函数更新表格
+    @app.callback(
+        Output("data-table", "data"),
+        Output("data-table", "columns"),
+        Output("data-table", "page_count"),
+        [
+            Input("selection-key", "data"),
+            Input("data-table", "page_current"),
+            Input("data-table", "page_size"),
+            Input("data-table", "sort_by"),
+            Input("data-table", "filter_query"),
+            Input("table-granularity", "value"),
+        ]
     )
-
-    # 固定月份顺序为 "Jan" 到 "Dec"
-    month_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-    monthly_data_combined["Month"] = pd.Categorical(monthly_data_combined["Month"], categories=month_order,
-                                                    ordered=True)
-
-    # 绘制柱状图（年度产量）
-    bar_chart = go.Bar(
-        x=monthly_data_combined["Month"],# X 轴为月份
-        y=monthly_data_combined["Active Energy Exported(kWh)"],# Y 轴为年度产量
-        name="Production (kWh)",
-        yaxis="y1",
-        marker_color = "#0d3057",  # 柱体颜色为深蓝色
-        showlegend = False  # 隐藏图例
+    def update_table(selection, page_current, page_size, sort_by, filter_query, granularity):
+        if not selection:
+            raise PreventUpdate
+        # 排序条件转换为可哈希的元组，便于缓存
+        sort_key = tuple((item["column_id"], item["direction"]) for item in sort_by or [])
+        return table_page(selection, page_current or 0, page_size or config["table_page_size"], sort_key,
+                          filter_query or "", granularity == "totals")
+
+    @figure_cache.memoize("data-table", key=lambda selection, *args: period_key(selection) + args)
+    def table_page(selection, page_current, page_size, sort_key, filter_query, totals):
+        from figures import build_table_page
+
+        return build_table_page(selection_stage.working_set(selection), page_current, page_size, sort_key,
+                                filter_query, totals)
+
+    @app.callback(
+        Output("monthly-wind-chart", "figure"),
+        Input("selection-key", "data")
     )
+    @selection_stage.consumes("plant")
+    @figure_cache.memoize("monthly-wind-chart", key=lambda selection: selection["plant"])
+    def update_chart(selection):
+        from figures import build_monthly_wind_chart
+
+        return build_monthly_wind_chart(selection_stage.working_set(selection))
 
-    # 绘制折线图（平均风速）
-    line_chart = go.Scatter(
-        x=monthly_data_combined["Month"],# X 轴为月份
-        y=monthly_data_combined["Average wind speed (m/s)"],# Y 轴为平均风速
-        name="Average Wind Speed (m/s)",
-        yaxis="y2",
-        mode="lines+markers",
-        line = dict(color="red", width=2),  # 折线颜色为红色
-        showlegend = False  # 隐藏图例
+    @app.callback(
+        Output("weekly-wind-chart", "figure"),
+          Input("selection-key", "data")
     )
-    combined_chart = go.Figure(data=[bar_chart, line_chart])
-
-    combined_chart.update_layout(
-        title=dict(
-            text="Monthly Production and Wind Speed Variation",  # 标题文本
-            font=dict(
-                family="Arial",  # 字体
-                size=14,  # 字体大小
-                color="black"  # 字体颜色
-            ),
-            x=0.5,  # 标题水平居中
-            xanchor="center",
-            pad=dict(
-                t=30  # 标题和图表的间距
-            )
-        ),
-        xaxis=dict(
-            #title="Month",  # X 轴标题
-            categoryorder="array",  # 按固定顺序排列月份
-            categoryarray=month_order,
-            showgrid = False,  # 取消 X 轴网格线
+    @selection_stage.consumes("plant")
+    def update_wind_speed_year_graph(selection):
+        return figure_update(selection, weekly_wind_figure(selection))
 
-        ),
+    @figure_cache.memoize("weekly-wind-chart", key=lambda selection: selection["plant"])
+    def weekly_wind_figure(selection):
+        from figures import build_weekly_wind_chart
 
-        yaxis=dict(
-            # title="Production (kWh)",  # 左侧 Y 轴标题
-            titlefont=dict(color="#0d3057"),  # 左侧 Y 轴标题颜色
-            tickfont=dict(color="#0d3057"), # 左侧 Y 轴刻度颜色
-            showgrid = False  # 取消 Y 轴网格线
-        ),
-        yaxis2=dict(
-            # title="Wind Speed (m/s)",  # 右侧 Y 轴标题
-            titlefont=dict(color="red"),  # 右侧 Y 轴标题颜色
-            tickfont=dict(color="red"),  # 右侧 Y 轴刻度颜色
-            overlaying="y",  # 右侧 Y 轴与左侧 Y 轴重叠
-            side="right",  # 右侧显示
-            showgrid = False  # 取消 Y 轴网格线
-        ),
-        margin=dict(
-            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
-            b=10,
-            l=10,
-            r=10
-        ),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-        plot_bgcolor="white"  # 设置背景为白色
-    )
+        return build_weekly_wind_chart(selection_stage.working_set(selection))
 
-    return combined_chart
+    def figure_update(selection, figure):
+        # 数据版本未变时图表布局与浏览器中现有的相同，只发送曲线数据（部分更新）
+        if "version" in selection["changed"]:
+            return figure
+        from figures import trace_data_patch
 
+        return trace_data_patch(figure)
 
+    @app.callback(
+            Output("annual-production-chart", "figure"),
+            Input("selection-key", "data")
+        )
+    @selection_stage.consumes("plant")
+    @figure_cache.memoize("annual-production-chart", key=lambda selection: selection["plant"])
+    def update_annual_production_graph(selection):
+        from figures import build_annual_production_chart
 
+        return build_annual_production_chart(selection_stage.working_set(selection))
 
-# 图表 5：使用 project、year 和 month 筛选
-@app.callback(
-    Output("combined-chart2", "figure"),
-    [
-        Input("year-selector", "value"),
-        Input("month-selector", "value"),
-        Input("plant-selector", "value")
-    ]
-)
-def update_combined_chart2(selected_year, selected_month, selected_project):
-    # 筛选数据
-    filtered_df = df[
-        (df["Year"] == selected_year) &
-        (df["Month"] == selected_month) &
-        (df["Power plant name"] == selected_project)
+    @app.callback(
+        Output("combined-chart", "figure"),
+        Input("selection-key", "data")
+    )
+    @selection_stage.consumes("plant", "year")
+    @figure_cache.memoize("combined-chart", key=lambda selection: (selection["plant"], selection["year"]))
+    def update_monthly_energy_production_graph(selection):
+        from figures import build_monthly_production_chart
+
+        return build_monthly_production_chart(selection_stage.working_set(selection))
+
+    # 机队 KPI 视图
+    @app.callback(
+        Output("fleet-table", "data"),
+        Output("fleet-table", "columns"),
+        Output("fleet-heatmap", "figure"),
+        [
+            Input("fleet-kpi-selector", "value"),
+            Input("fleet-level", "value"),
+            Input("fleet-period", "value"),
+            Input("year-selector", "value"),
+            Input("month-selector", "value"),
+            Input("data-version", "data"),
         ]
-
-    # 生成当前月的完整日期范围
-    start_date = pd.Timestamp(year=selected_year, month=selected_month, day=1)
-    end_date = start_date + pd.offsets.MonthEnd(0)
-    date_range = pd.date_range(start=start_date, end=end_date, freq="D")
-
-    # 数据分组并重新索引至完整日期范围
-    daily_data = filtered_df.groupby("Statistical time").agg({
-        "Active Energy Exported(kWh)": "sum",
-        "Average wind speed (m/s)": "mean"
-    })
-
-    # 将日期设置为索引并重设索引为完整的日期范围
-    daily_data = daily_data.reindex(date_range).reset_index()
-    daily_data.rename(columns={"index": "Statistical time"}, inplace=True)
-
-    # 填充缺失值为 0
-    daily_data["Active Energy Exported(kWh)"] = daily_data["Active Energy Exported(kWh)"].fillna(0)
-    daily_data["Average wind speed (m/s)"] = daily_data["Average wind speed (m/s)"].fillna(0)
-
-    # 创建图表 5
-    daily_bar_chart = go.Bar(
-        x=daily_data["Statistical time"],  # X 轴为日期
-        y=daily_data["Active Energy Exported(kWh)"],
-        name="Production (kWh)",
-        yaxis="y1",
-        marker_color="#0d3057",  # 柱体颜色为深蓝色
-        showlegend=False  # 隐藏图例
     )
-    daily_line_chart = go.Scatter(
-        x=daily_data["Statistical time"],  # X 轴为日期
-        y=daily_data["Average wind speed (m/s)"],
-        name="Wind Speed",
-        yaxis="y2",
-        mode="lines+markers",
-        line=dict(color="red"),
-        showlegend=False  # 隐藏图例
+    @figure_cache.memoize("fleet-kpi")
+    def update_fleet_view(kpi, level, period, selected_year, selected_month, data_version):
+        if data_version is None or selected_year is None:
+            raise PreventUpdate
+        from figures import build_fleet_heatmap, build_fleet_table
+
+        kpis = snapshot_store.current().kpis
+        month = selected_month if period == "month" else None
+        data, columns = build_fleet_table(kpis, kpi, selected_year, month, level)
+        return data, columns, build_fleet_heatmap(kpis, kpi, selected_year, level)
+
+    # 功率曲线视图：偏差表（电厂、年份、月份或全年）和参考曲线 + 所选设备曲线
+    @app.callback(
+        Output("power-curve-table", "data"),
+        Output("power-curve-table", "columns"),
+        Output("power-curve-table", "selected_row_ids"),
+        Input("selection-key", "data"),
+        Input("power-curve-period", "value"),
     )
-    combined_chart2 = go.Figure(data=[daily_bar_chart, daily_line_chart])
-
-    combined_chart2.update_layout(
-        title=dict(
-            text="Daily Production and Wind Speed Variation",  # 标题文本
-            font=dict(
-                family="Arial",  # 字体
-                size=14,  # 字体大小
-                color="black"  # 字体颜色
-            ),
-            x=0.5,  # 标题水平居中
-            xanchor="center",
-            pad=dict(
-                t=30  # 标题和图表的间距
-            )
-        ),
-        xaxis=dict(
-            #title="",  # 可根据需要添加 X 轴标题
-            showgrid=False,  # 取消 X 轴网格线
-            tickformat="%d",  # 显示日期为日数字
-            dtick="D1",  # 每天一个刻度
-            tickangle=-45  # 旋转刻度标签，以防止重叠
-        ),
-        yaxis=dict(
-            #title="Production (kWh)",
-            titlefont=dict(color="#0d3057"),  # 左侧 Y 轴标题颜色
-            tickfont=dict(color="#0d3057"),  # 左侧 Y 轴刻度颜色
-            showgrid=False  # 取消 Y 轴网格线
-        ),
-        yaxis2=dict(
-            #title="Wind Speed (m/s)",  # 右侧 Y 轴标题
-            titlefont=dict(color="red"),  # 右侧 Y 轴标题颜色
-            tickfont=dict(color="red"),  # 右侧 Y 轴刻度颜色
-            overlaying="y",  # 右侧 Y 轴与左侧 Y 轴重叠
-            side="right",  # 右侧显示
-            showgrid=False  # 取消 Y 轴网格线
-        ),
-        margin=dict(
-            t=50,  # 图表整体距离顶部的外边距（标题包含在此范围内）
-            b=80,
-            l=60,
-            r=60
-        ),
-        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
-        plot_bgcolor="white"  # 设置背景为白色
+    def update_power_curve_table(selection, period):
+        if not selection:
+            raise PreventUpdate
+        month = selection["month"] if period == "month" else None
+        data, columns = power_curve_table(selection["plant"], selection["year"], month)
+        # 切换电厂后清空勾选的设备
+        plant_changed = dash.ctx.triggered_id == "selection-key" and "plant" in selection["changed"]
+        return data, columns, [] if plant_changed else no_update
+
+    @figure_cache.memoize("power-curve-table")
+    def power_curve_table(plant, year, month):
+        from figures import build_power_curve_table
+
+        return build_power_curve_table(snapshot_store.current().power_curves, plant, year, month)
+
+    @app.callback(
+        Output("power-curve-chart", "figure"),
+        Input("selection-key", "data"),
+        Input("power-curve-period", "value"),
+        Input("power-curve-table", "selected_row_ids"),
     )
+    def update_power_curve_chart(selection, period, devices):
+        if not selection:
+            raise PreventUpdate
+        month = selection["month"] if period == "month" else None
+        return power_curve_chart(selection["plant"], selection["year"], month, tuple(sorted(devices or ())))
+
+    @figure_cache.memoize("power-curve-chart")
+    def power_curve_chart(plant, year, month, devices):
+        from figures import build_power_curve_chart
+
+        return build_power_curve_chart(snapshot_store.current().power_curves, plant, year, month, devices)
+
+    # 风速分布：由预先分箱的直方图相加得到，不读取原始行
+    @app.callback(
+        Output("wind-device-table", "data"),
+        Output("wind-device-table", "columns"),
+        Output("wind-distribution-chart", "figure"),
+        Input("selection-key", "data"),
+        Input("wind-period", "value"),
+    )
+    def update_wind_distribution(selection, period):
+        if not selection:
+            raise PreventUpdate
+        month = selection["month"] if period == "month" else None
+        return wind_distribution(selection["plant"], selection["year"], month)
+
+    @figure_cache.memoize("wind-distribution")
+    def wind_distribution(plant, year, month):
+        from figures import build_wind_device_table, build_wind_distribution_chart
+
+        histograms = snapshot_store.current().wind_histograms
+        data, columns = build_wind_device_table(histograms, plant, year, month)
+        return data, columns, build_wind_distribution_chart(histograms, plant, year, month)
+
+    @app.callback(
+        Output("wind-percentile-chart", "figure"),
+        Input("selection-key", "data")
+    )
+    @selection_stage.consumes("plant", "year")
+    @figure_cache.memoize("wind-percentile-chart", key=lambda selection: (selection["plant"], selection["year"]))
+    def update_wind_percentile_chart(selection):
+        from figures import build_wind_percentile_chart
+
+        return build_wind_percentile_chart(snapshot_store.current().wind_histograms, selection["plant"],
+                                           selection["year"])
+
+    # 图表 5：使用 project、year 和 month 筛选
+    if config["clientside_month_switching"]:
+        # 服务端只在电厂/年份变化时发送全年日数据，月份切换由 assets/daily_chart.js 处理
+        @app.callback(
+            Output("daily-year-payload", "data"),
+            Input("selection-key", "data")
+        )
+        @selection_stage.consumes("plant", "year")
+        @figure_cache.memoize("daily-year-payload", key=lambda selection: (selection["plant"], selection["year"]))
+        def update_daily_year_payload(selection):
+            from figures import build_daily_year_payload
+
+            # 月份模板与日期区间无关
+            return build_daily_year_payload(selection_stage.working_set(dict(selection, start=None, end=None)))
+
+        # 选择了日期区间时由服务端生成区间图表，浏览器优先显示该图表；清除区间后为 None，恢复按月切换
+        @app.callback(
+            Output("daily-range-figure", "data"),
+            Input("selection-key", "data")
+        )
+        @selection_stage.consumes("plant", "start", "end")
+        def update_daily_range_figure(selection):
+            if selection["start"] is None:
+                return None
+            return daily_production_figure(selection)
+
+        app.clientside_callback(
+            ClientsideFunction(namespace="daily", function_name="monthFigure"),
+            Output("combined-chart2", "figure"),
+            Input("month-selector", "value"),
+            Input("daily-year-payload", "data"),
+            Input("daily-range-figure", "data"),
+        )
+    else:
+        @app.callback(
+            Output("combined-chart2", "figure"),
+            Input("selection-key", "data")
+        )
+        @selection_stage.consumes("plant", "year", "month", "start", "end")
+        def update_combined_chart2(selection):
+            figure = daily_production_figure(selection)
+            if selection["start"] is not None or {"start", "end"}.intersection(selection["changed"]):
+                return figure  # 日期区间的标题和刻度随选择变化，发送完整图表
+            return figure_update(selection, figure)
+
+    @figure_cache.memoize("combined-chart2", key=period_key)
+    def daily_production_figure(selection):
+        from figures import build_daily_production_chart
+
+        return build_daily_production_chart(selection_stage.working_set(selection))
 
-    # 返回图表
-    return combined_chart2
 
 if __name__ == "__main__":
-    app.run_server(debug=True, port=8051)
\ No newline at end of file
+    # 开发模式（单进程）：python PPT1.py [<工作簿> ...]；生产部署使用 gunicorn -c gunicorn.conf.py wsgi:application
+    # 服务立即启动，数据在后台加载，加载完成后监视工作簿/投递目录，新数据到达时替换快照
+    overrides = {}
+    if len(sys.argv) > 1:
+        overrides["data_sources"] = [dict(data_sources[0], path=path) for path in sys.argv[1:]]
+    app = create_app(dict(overrides, load_mode="deferred"))
+    app.data_loader.start(watch=True)
+    # 调试重载器会再启动一个进程并重复加载数据，因此关闭重载
+    app.run_server(debug=True, port=8051, use_reloader=False)
@@ -0,0 +1,29 @@
+// 图表 5 的客户端月份切换：从当前年份的日数据中截取所选月份填入图表模板，不请求服务端
+// 选择了日期区间时显示服务端生成的区间图表（rangeFigure），清除区间后恢复按月显示
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    daily: {
+        monthFigure: function (month, payload, rangeFigure) {
+            if (rangeFigure) {
+                return rangeFigure;
+            }
+            if (!payload || !month) {
+                return window.dash_clientside.no_update;
+            }
+            var prefix = payload.year + "-" + String(month).padStart(2, "0");
+            var x = [];
+            var series = payload.series.map(function () { return []; });
+            for (var i = 0; i < payload.x.length; i++) {
+                if (payload.x[i].slice(0, 7) === prefix) {
+                    x.push(payload.x[i]);
+                    for (var k = 0; k < series.length; k++) {
+                        series[k].push(payload.series[k][i]);
+                    }
+                }
+            }
+            var data = payload.figure.data.map(function (trace, k) {
+                return Object.assign({}, trace, {x: x, y: series[k]});
+            });
+            return {data: data, layout: payload.figure.layout};
+        }
+    }
+});
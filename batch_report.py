@@ -0,0 +1,227 @@
+# 离线批量报告：与仪表盘共用 figures.py 的作图逻辑，为每个 (电厂, 年, 月) 生成一个独立的静态 HTML 报告
+# 多个报告在进程池中并行渲染；输入数据（工作集）未变化的报告直接跳过
+# 用法：python batch_report.py --source "D:/data/*.xlsx" --out reports [--plant A] [--year 2024] [--month 3]
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd  # 数据处理
+import plotly.io as pio
+
+from data_loader import load_sources
+from figures import (FIGURE_SIZES, build_table_page, build_monthly_wind_chart, build_weekly_wind_chart,
+                     build_annual_production_chart, build_monthly_production_chart, build_daily_production_chart)
+from loader import SnapshotStore
+from selection import MONTH_STEPS, PLANT_STEPS, YEAR_STEPS, SelectionStage
+from snapshot import DataSnapshot
+
+# 报告模板版本：修改报告内容或样式后加一，使已有报告全部重新生成
+REPORT_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+# 报告中的图表，按仪表盘中的排列顺序
+REPORT_FIGURES = [
+    ("monthly-wind-chart", build_monthly_wind_chart),
+    ("weekly-wind-chart", build_weekly_wind_chart),
+    ("annual-production-chart", build_annual_production_chart),
+    ("combined-chart", build_monthly_production_chart),
+    ("combined-chart2", build_daily_production_chart),
+]
+
+# 工作进程中的选择阶段：fork 启动时继承父进程已加载的数据，spawn 启动时在初始化函数中加载
+_stage = None
+
+
+def load_stage(sources, max_workers=None, compact=True):
+    df, failures = load_sources(sources, max_workers)
+    for path, error in failures:
+        print(f"skipped source {path}: {error}", file=sys.stderr)
+    return SelectionStage(SnapshotStore(DataSnapshot.from_frame(df, df.attrs["data_version"], compact)))
+
+
+def _init_worker(sources, compact):
+    # 数据源已有 parquet 缓存，子进程重新加载只需读取缓存
+    global _stage
+    if _stage is None:
+        _stage = load_stage(sources, max_workers=1, compact=compact)
+
+
+def report_version(working_set, include_plotlyjs):
+    # 报告的输入版本：报告用到的所有工作集数据 + 图表补齐用的全局范围 + 模板版本
+    digest = hashlib.sha1(f"{REPORT_FORMAT_VERSION}|{include_plotlyjs}".encode("utf-8"))
+    digest.update(repr((list(working_set.all_years), str(working_set.start_time),
+                        str(working_set.end_time))).encode("utf-8"))
+    for name in list(PLANT_STEPS) + list(YEAR_STEPS) + list(MONTH_STEPS):
+        frame = pd.DataFrame(getattr(working_set, name))
+        digest.update(name.encode("utf-8"))
+        digest.update(repr(list(frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def report_path(plant, year, month):
+    # 电厂名中不能用于文件名的字符替换为下划线
+    folder = re.sub(r"[^\w.-]+", "_", str(plant)).strip("_") or "plant"
+    return os.path.join(folder, f"{year}-{month:02d}.html")
+
+
+def render_report(working_set, include_plotlyjs="inline"):
+    # 生成一个自包含的 HTML 页面：五个图表（与仪表盘相同尺寸）+ 设备日数据表
+    sections = []
+    for position, (name, build) in enumerate(REPORT_FIGURES):
+        width, height = FIGURE_SIZES[name]
+        if include_plotlyjs == "cdn":
+            plotlyjs = "cdn" if position == 0 else False
+        else:
+            plotlyjs = position == 0  # plotly.js 只内联一次
+        sections.append(pio.to_html(build(working_set), full_html=False, include_plotlyjs=plotlyjs,
+                                    default_width=f"{width}px", default_height=f"{height}px"))
+    rows = max(1, len(working_set.device_table))
+    data, columns, _ = build_table_page(working_set, 0, rows, (), "")
+    table = pd.DataFrame(data, columns=[column["id"] for column in columns])
+    title = html.escape(f"{working_set.plant} {working_set.year}-{working_set.month:02d}")
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: Arial, sans-serif; margin: 20px; }}
+.charts {{ display: flex; flex-wrap: wrap; gap: 10px; }}
+table {{ border-collapse: collapse; font-size: 12px; margin-top: 20px; }}
+th, td {{ border: 1px solid #ccc; padding: 2px 6px; text-align: right; }}
+</style>
+</head>
+<body>
+<h2>{title}</h2>
+<div class="charts">
+{"".join(f"<div>{section}</div>" for section in sections)}
+</div>
+{table.to_html(index=False, na_rep="", float_format=lambda value: f"{value:.2f}")}
+</body>
+</html>
+"""
+
+
+def write_report(selection, path, version, data_version, include_plotlyjs):
+    # 工作进程中执行：渲染并原子写入一个报告
+    snapshot_version = _stage.store.current().version
+    if snapshot_version != data_version:
+        raise RuntimeError(f"worker loaded data version {snapshot_version}, expected {data_version}")
+    start = time.perf_counter()
+    page = render_report(_stage.working_set(selection), include_plotlyjs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(page)
+    os.replace(tmp_path, path)
+    return version, time.perf_counter() - start
+
+
+def _read_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def _write_index(out_dir, manifest):
+    links = "\n".join(f'<li><a href="{html.escape(path)}">{html.escape(path)}</a></li>'
+                      for path in sorted(manifest))
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Reports</title></head>'
+                f"<body><ul>\n{links}\n</ul></body></html>\n")
+
+
+def select_reports(snapshot, plants=None, years=None, months=None):
+    # 所有有数据的 (电厂, 年, 月)，可按电厂/年/月筛选
+    return [
+        (plant, year, month) for plant, year, month in snapshot.index.month_spans
+        if (not plants or plant in plants) and (not years or year in years) and (not months or month in months)
+    ]
+
+
+def run_batch(stage, sources, out_dir, reports, workers=None, force=False, include_plotlyjs="inline",
+              compact=True):
+    # 返回 (生成数, 跳过数, [(报告, 错误信息), ...])
+    global _stage
+    _stage = stage
+    snapshot = stage.store.current()
+    manifest = _read_manifest(out_dir)
+    pending = []
+    skipped = 0
+    for plant, year, month in reports:
+        selection = {"plant": plant, "year": year, "month": month}
+        relpath = report_path(plant, year, month)
+        version = report_version(stage.working_set(selection), include_plotlyjs)
+        path = os.path.join(out_dir, relpath)
+        if not force and manifest.get(relpath) == version and os.path.exists(path):
+            skipped += 1
+            continue
+        pending.append((selection, relpath, path, version))
+
+    failures = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(sources, compact)) as pool:
+            futures = {
+                pool.submit(write_report, selection, path, version, snapshot.version, include_plotlyjs): relpath
+                for selection, relpath, path, version in pending
+            }
+            for future in as_completed(futures):
+                relpath = futures[future]
+                try:
+                    manifest[relpath], _ = future.result()
+                except Exception as exc:  # 单个报告失败只记录不中断其余报告
+                    manifest.pop(relpath, None)
+                    failures.append((relpath, f"{type(exc).__name__}: {exc}"))
+    os.makedirs(out_dir, exist_ok=True)
+    _write_manifest(out_dir, manifest)
+    _write_index(out_dir, manifest)
+    return len(pending) - len(failures), skipped, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render static HTML reports per plant and month.")
+    parser.add_argument("--source", action="append", required=True,
+                        help="workbook path or glob pattern (repeatable)")
+    parser.add_argument("--sheet", default="Production statistics")
+    parser.add_argument("--reader", default="pandas", choices=["pandas", "streaming"])
+    parser.add_argument("--out", default="reports")
+    parser.add_argument("--plant", action="append", help="only these plants (repeatable)")
+    parser.add_argument("--year", action="append", type=int, help="only these years (repeatable)")
+    parser.add_argument("--month", action="append", type=int, help="only these months (repeatable)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--force", action="store_true", help="re-render reports even if inputs are unchanged")
+    parser.add_argument("--plotlyjs", default="inline", choices=["inline", "cdn"],
+                        help="embed plotly.js in each report (inline) or load it from the CDN")
+    args = parser.parse_args(argv)
+
+    sources = [{"path": path, "sheet": args.sheet, "reader": args.reader} for path in args.source]
+    start = time.perf_counter()
+    stage = load_stage(sources, args.workers)
+    reports = select_reports(stage.store.current(), args.plant, args.year, args.month)
+    rendered, skipped, failures = run_batch(stage, sources, args.out, reports, args.workers, args.force,
+                                            args.plotlyjs)
+    for relpath, error in failures:
+        print(f"failed {relpath}: {error}", file=sys.stderr)
+    print(f"{rendered} rendered, {skipped} unchanged, {len(failures)} failed "
+          f"in {time.perf_counter() - start:.1f}s -> {os.path.abspath(args.out)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
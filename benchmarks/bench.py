@@ -0,0 +1,220 @@
+# 基准测试：在不同数据规模下测量加载/清洗流程、工作集计算和各回调（图表、表格）的延迟、峰值内存和返回数据大小，
+# 并与保存的基线比较，超出容差时以非零状态退出
+# 用法：
+#   python benchmarks/bench.py                       # 1x、10x，对比 benchmarks/baseline.json
+#   python benchmarks/bench.py --scales 1x 10x 100x --save-baseline
+import argparse
+import datetime
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import clean_production_statistics, load_production_statistics, parse_production_statistics  # noqa: E402
+from figures import (build_table_page, build_monthly_wind_chart, build_weekly_wind_chart,  # noqa: E402
+                     build_annual_production_chart, build_monthly_production_chart, build_daily_production_chart,
+                     build_power_curve_table, build_power_curve_chart, build_wind_device_table,
+                     build_wind_distribution_chart, build_wind_percentile_chart)
+from loader import SnapshotStore  # noqa: E402
+from selection import SelectionStage  # noqa: E402
+from snapshot import DataSnapshot  # noqa: E402
+from synthetic import EXCEL_MAX_ROWS, SCALES, generate_frame, write_workbook  # noqa: E402
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+# 生成的工作簿缓存在此目录，重复运行时不再重新生成
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+# 回归判定：相对容差 + 绝对下限（避免毫秒级步骤的计时噪声被判为回归）
+LATENCY_TOLERANCE = 0.5
+LATENCY_FLOOR_MS = 5.0
+MEMORY_TOLERANCE = 0.25
+MEMORY_FLOOR_MB = 1.0
+PAYLOAD_TOLERANCE = 0.01
+# 表格回调每页行数（与仪表盘 table_page_size 一致）
+TABLE_PAGE_SIZE = 50
+
+# 回调步骤：(名称, 以工作集为输入的函数)
+CALLBACKS = [
+    ("callback.monthly_wind", build_monthly_wind_chart),
+    ("callback.weekly_wind", build_weekly_wind_chart),
+    ("callback.annual_production", build_annual_production_chart),
+    ("callback.monthly_production", build_monthly_production_chart),
+    ("callback.daily_production", build_daily_production_chart),
+    ("callback.table", lambda working_set: build_table_page(working_set, 0, TABLE_PAGE_SIZE, (), "")),
+    ("callback.power_curve_table", lambda working_set: build_power_curve_table(
+        working_set.snapshot.power_curves, working_set.plant, working_set.year, working_set.month)),
+    ("callback.power_curve_chart", lambda working_set: build_power_curve_chart(
+        working_set.snapshot.power_curves, working_set.plant, working_set.year, working_set.month)),
+    ("callback.wind_device_table", lambda working_set: build_wind_device_table(
+        working_set.snapshot.wind_histograms, working_set.plant, working_set.year, working_set.month)),
+    ("callback.wind_distribution", lambda working_set: build_wind_distribution_chart(
+        working_set.snapshot.wind_histograms, working_set.plant, working_set.year, working_set.month)),
+    ("callback.wind_percentiles", lambda working_set: build_wind_percentile_chart(
+        working_set.snapshot.wind_histograms, working_set.plant, working_set.year)),
+]
+# 日期区间（所选月份之前的 RANGE_DAYS 天）的回调步骤
+RANGE_DAYS = 90
+RANGE_CALLBACKS = [
+    ("callback.daily_production_range", build_daily_production_chart),
+    ("callback.table_range", lambda working_set: build_table_page(working_set, 0, TABLE_PAGE_SIZE, (), "")),
+    ("callback.table_range_totals", lambda working_set: build_table_page(working_set, 0, TABLE_PAGE_SIZE, (), "",
+                                                                         totals=True)),
+]
+
+
+def payload_size(result):
+    # 回调返回给浏览器的 JSON 大小（字节）
+    if isinstance(result, tuple):
+        return len(json.dumps(result[:2], default=str).encode("utf-8"))
+    return len(pio.to_json(result, validate=False).encode("utf-8"))
+
+
+def measure(func, repeat=5, memory=True):
+    # 先计时 repeat 次（不开启 tracemalloc），再单独运行一次测量峰值内存；返回 (指标, 最后一次结果)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(1000 * (time.perf_counter() - start))
+    metrics = {"median_ms": statistics.median(times), "min_ms": min(times)}
+    if memory:
+        tracemalloc.start()
+        try:
+            func()
+            metrics["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return metrics, result
+
+
+def workbook_for(scale, seed=0):
+    # 指定规模的合成工作簿（已生成时直接复用）
+    path = os.path.join(DATA_DIR, f"production_{scale}_seed{seed}.xlsx")
+    if not os.path.exists(path):
+        write_workbook(generate_frame(seed=seed, **SCALES[scale]), path)
+    return path
+
+
+def run_scale(scale, repeat=5, load_repeat=1, workbook=True, memory=True, seed=0):
+    results = {}
+
+    def record(step, func, times=repeat):
+        metrics, result = measure(func, times, memory)
+        results[step] = metrics
+        print(f"  {step:<30} {metrics['median_ms']:>10.1f} ms"
+              + (f" {metrics['peak_mb']:>9.1f} MB" if "peak_mb" in metrics else ""), flush=True)
+        return result
+
+    raw = generate_frame(seed=seed, **SCALES[scale])
+    print(f"{scale}: {len(raw)} rows", flush=True)
+
+    # 加载：Excel 解析（两种读取方式）和 parquet 缓存命中
+    if workbook and len(raw) <= EXCEL_MAX_ROWS:
+        path = workbook_for(scale, seed)
+        record("load.workbook.pandas", lambda: parse_production_statistics(path, reader="pandas"), load_repeat)
+        record("load.workbook.streaming", lambda: parse_production_statistics(path, reader="streaming"),
+               load_repeat)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            load_production_statistics(path, cache_dir=cache_dir)  # 写入缓存
+            record("load.cache", lambda: load_production_statistics(path, cache_dir=cache_dir), load_repeat)
+
+    df = record("clean", lambda: clean_production_statistics(raw.copy()), load_repeat)
+    snapshot = record("snapshot", lambda: DataSnapshot.from_frame(df, "bench", compact=True), load_repeat)
+    raw = df = None  # 释放原始数据，后续步骤的内存只包含快照
+
+    # 选择：第一个电厂的最近一个月（冷启动，每次使用新的选择阶段）
+    store = SnapshotStore(snapshot)
+    plant = snapshot.available_projects[0]
+    year, month = max((y, m) for p, y, m in snapshot.index.month_spans if p == plant)
+    selection = {"plant": plant, "year": year, "month": month}
+    working_set = record("working_set", lambda: SelectionStage(store).working_set(selection))
+
+    for step, build in CALLBACKS:
+        result = record(step, lambda: build(working_set))
+        results[step]["payload_kb"] = payload_size(result) / 1024
+
+    # 日期区间：与月份视图相同的步骤，数据由前缀和查得
+    end = datetime.date(year, month, 1) - datetime.timedelta(days=1)
+    range_selection = dict(selection, start=(end - datetime.timedelta(days=RANGE_DAYS - 1)).isoformat(),
+                           end=end.isoformat())
+    range_set = record("working_set.range", lambda: SelectionStage(store).working_set(range_selection))
+    for step, build in RANGE_CALLBACKS:
+        result = record(step, lambda: build(range_set))
+        results[step]["payload_kb"] = payload_size(result) / 1024
+    return results
+
+
+def compare(results, baseline):
+    # 返回 [(规模, 步骤, 指标, 基线值, 当前值)]
+    regressions = []
+    for scale, steps in results.items():
+        for step, metrics in steps.items():
+            base = baseline.get(scale, {}).get(step)
+            if base is None:
+                continue
+            checks = [
+                ("median_ms", LATENCY_TOLERANCE, LATENCY_FLOOR_MS),
+                ("peak_mb", MEMORY_TOLERANCE, MEMORY_FLOOR_MB),
+                ("payload_kb", PAYLOAD_TOLERANCE, 0.0),
+            ]
+            for metric, tolerance, floor in checks:
+                if metric not in metrics or metric not in base:
+                    continue
+                if metrics[metric] > base[metric] * (1 + tolerance) and metrics[metric] - base[metric] > floor:
+                    regressions.append((scale, step, metric, base[metric], metrics[metric]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark loading and callbacks on synthetic data.")
+    parser.add_argument("--scales", nargs="+", default=["1x", "10x"], choices=sorted(SCALES))
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per callback step")
+    parser.add_argument("--load-repeat", type=int, default=1, help="timed runs per load/clean step")
+    parser.add_argument("--workbook-scales", nargs="*", default=["1x"], choices=sorted(SCALES),
+                        help="scales that also benchmark Excel parsing (slow; 100x exceeds the sheet limit)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc peak-memory pass")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = {
+        scale: run_scale(scale, args.repeat, args.load_repeat, scale in args.workbook_scales, not args.no_memory,
+                         args.seed)
+        for scale in args.scales
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+
+    try:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"baseline saved -> {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    for scale, step, metric, before, after in regressions:
+        print(f"REGRESSION {scale} {step} {metric}: {before:.1f} -> {after:.1f}")
+    if not baseline:
+        print(f"no baseline at {args.baseline}; run with --save-baseline")
+    elif not regressions:
+        print("no regressions against baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
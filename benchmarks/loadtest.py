@@ -0,0 +1,426 @@
+# 并发负载测试：多个模拟用户同时在合成数据集上切换电厂/年份/月份，按 Dash 前端的方式向 /_dash-update-component 发送回调请求，
+# 统计吞吐量、各回调输出的 p50/p95/p99 延迟和错误率，对比服务方式（开发服务器 / gunicorn）和工作进程数
+# 每个模拟用户：打开页面（布局、回调依赖、初始回调），之后循环执行 选择 → 等待所有回调完成 → 思考时间
+# 回调链按 /_dash-dependencies 逐轮执行：输入变化的服务端回调在上游回调完成后发出，同一轮的请求并行（浏览器同时最多 6 个连接）；
+# 与浏览器一致，请求接受 gzip，并缓存带 ETag 的回调响应用于条件请求（--no-etags 关闭）
+# 每个服务先以最大并发预热 --warmup 秒（不计入结果），各工作进程的工作集和图表缓存已填充；
+# 负载生成器与服务在同一台机器上运行时会争用 CPU，工作进程数超过空闲核心数后结果不再代表服务端的扩展能力
+# 用法：
+#   python benchmarks/loadtest.py                                   # 1x 数据，开发服务器和 gunicorn 1/2/4 个工作进程
+#   python benchmarks/loadtest.py --modes gunicorn --workers 4 8 --users 10 50 100 --duration 60
+#   python benchmarks/loadtest.py --url http://127.0.0.1:8051 --users 20   # 对已运行的服务测试
+import argparse
+import gzip
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench import workbook_for  # noqa: E402
+from startup import REPO_DIR, POLL_S, TIMEOUT_S, free_port, status  # noqa: E402
+from synthetic import SCALES  # noqa: E402
+
+UPDATE_PATH = "/_dash-update-component"
+# 服务进程：开发服务器（单进程多线程）在返回前同步加载数据；gunicorn 使用 gunicorn.conf.py（预加载后 fork）
+DEV_SERVER_CODE = ("import sys; from PPT1 import create_app; "
+                   "create_app({'load_mode': 'sync'}).run(port=int(sys.argv[1]), threaded=True)")
+# 模拟用户的操作及其权重：多数操作是切换月份
+ACTIONS = {"month-selector": 0.6, "year-selector": 0.25, "plant-selector": 0.15}
+# 浏览器对同一主机的并发连接数
+BROWSER_CONNECTIONS = 6
+REQUEST_TIMEOUT_S = 60
+# 一次选择最多执行的回调轮数（防止回调链循环）
+MAX_WAVES = 20
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, q):
+    # 最近秩百分位数
+    if not values:
+        return None
+    values = sorted(values)
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def output_name(output):
+    # 回调输出键 → 第一个输出的 "组件.属性"（多输出回调加 "+"），例如 "data-table.data+"
+    if output.startswith(".."):
+        return output.strip(".").split("...")[0] + "+"
+    return output
+
+
+def parse_outputs(output):
+    items = output.strip(".").split("...") if output.startswith("..") else [output]
+    return [tuple(item.rsplit(".", 1)) for item in items]
+
+
+def layout_values(layout):
+    # 布局树中所有带 id 的组件属性：{"组件.属性": 值}
+    values = {}
+    stack = [layout]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+        elif isinstance(node, dict):
+            props = node.get("props")
+            if isinstance(props, dict):
+                if isinstance(props.get("id"), str):
+                    for prop, value in props.items():
+                        values[f"{props['id']}.{prop}"] = value
+                stack.extend(props.values())
+    return values
+
+
+class Callback:
+    # /_dash-dependencies 中的一个服务端回调
+    def __init__(self, dependency):
+        self.output = dependency["output"]
+        self.name = output_name(self.output)
+        self.outputs = parse_outputs(self.output)
+        self.produces = {f"{component}.{prop}" for component, prop in self.outputs}
+        self.inputs = [f"{item['id']}.{item['property']}" for item in dependency["inputs"]]
+        self.state = [f"{item['id']}.{item['property']}" for item in dependency["state"]]
+        self.dependency = dependency
+        self.prevent_initial_call = dependency.get("prevent_initial_call", False)
+
+    def body(self, values, changed):
+        def fill(items):
+            return [dict(item, value=values.get(f"{item['id']}.{item['property']}")) for item in items]
+
+        outputs = [{"id": component, "property": prop} for component, prop in self.outputs]
+        return json.dumps({
+            "output": self.output,
+            "outputs": outputs if self.output.startswith("..") else outputs[0],
+            "inputs": fill(self.dependency["inputs"]),
+            "state": fill(self.dependency["state"]),
+            "changedPropIds": sorted(changed),
+        }).encode("utf-8")
+
+
+class Recorder:
+    # 线程安全地收集每个请求和每次操作的结果
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = defaultdict(list)  # 回调输出 -> [(秒, 状态码, 传输字节)]
+        self.actions = defaultdict(list)  # 操作 -> [(秒, 是否有错误)]
+
+    def request(self, name, seconds, code, size):
+        with self._lock:
+            self.requests[name].append((seconds, code, size))
+
+    def action(self, name, seconds, failed):
+        with self._lock:
+            self.actions[name].append((seconds, failed))
+
+
+class SimulatedUser:
+    def __init__(self, base_url, callbacks, recorder, think_s, etags, rng):
+        self.url = urllib.parse.urlsplit(base_url)
+        self.callbacks = callbacks
+        self.recorder = recorder
+        self.think_s = think_s
+        self.etags = etags
+        self.rng = rng
+        self.values = {}
+        self.cache = {}  # 请求体 -> (ETag, 响应内容)，与 assets/callback_cache.js 相同
+        self._local = threading.local()
+        self._pool = ThreadPoolExecutor(BROWSER_CONNECTIONS)
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.url.hostname, self.url.port, timeout=REQUEST_TIMEOUT_S)
+        return connection
+
+    def _send(self, method, path, body=None, headers=None):
+        # 返回 (状态码, 解压后的内容, 传输字节, 响应头)；连接被服务端关闭时重新连接一次
+        headers = dict(headers or {}, **{"Accept-Encoding": "gzip"})
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+        size = len(data)
+        if response.getheader("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return response.status, data, size, response
+
+    def open_page(self):
+        # 页面加载：首页、布局、回调依赖，然后执行初始回调链
+        self._send("GET", "/")
+        self._send("GET", "/_dash-dependencies")
+        _, layout, _, _ = self._send("GET", "/_dash-layout")
+        self.values = layout_values(json.loads(layout))
+        initial = [callback for callback in self.callbacks if not callback.prevent_initial_call]
+        return self.run_chain(initial, set())
+
+    def call(self, callback, changed):
+        # 发送一个回调请求并更新本地的组件属性；返回 (发生变化的属性, 是否失败)
+        body = callback.body(self.values, changed)
+        cached = self.cache.get(body) if self.etags else None
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        start = time.perf_counter()
+        try:
+            code, data, size, response = self._send("POST", UPDATE_PATH, body, headers)
+        except (OSError, http.client.HTTPException):
+            self.recorder.request(callback.name, time.perf_counter() - start, None, 0)
+            return set(), True
+        self.recorder.request(callback.name, time.perf_counter() - start, code, size)
+        if code == 304 and cached:
+            data = cached[1]
+        elif code == 200 and self.etags and response.getheader("ETag"):
+            self.cache[body] = (response.getheader("ETag"), data)
+        elif code != 200:
+            return set(), code != 204  # 204：回调未更新（PreventUpdate）
+        changed = set()
+        for component, props in json.loads(data).get("response", {}).items():
+            for prop, value in props.items():
+                # Patch 只描述对图表的增量修改；负载测试不需要图表内容，保留原值
+                if not (isinstance(value, dict) and "__dash_patch_update" in value):
+                    self.values[f"{component}.{prop}"] = value
+                changed.add(f"{component}.{prop}")
+        return changed, False
+
+    def run_chain(self, pending, changed):
+        # 逐轮执行回调：上游回调（输出是本回调的输入）仍待执行时本回调推迟到下一轮；返回是否有请求失败
+        triggers = {callback.output: set(changed) & set(callback.inputs) for callback in pending}
+        pending = {callback.output: callback for callback in pending}
+        failed = False
+        for _ in range(MAX_WAVES):
+            if not pending:
+                break
+            ready = [callback for callback in pending.values()
+                     if not any(set(callback.inputs) & other.produces for other in pending.values()
+                                if other is not callback)] or list(pending.values())
+            for callback in ready:
+                del pending[callback.output]
+            results = list(self._pool.map(lambda callback: self.call(callback, triggers.pop(callback.output, set())),
+                                          ready))
+            updated = set().union(*(result[0] for result in results))
+            failed = failed or any(result[1] for result in results)
+            for callback in self.callbacks:
+                fired = updated & set(callback.inputs)
+                if fired:
+                    pending[callback.output] = callback
+                    triggers.setdefault(callback.output, set()).update(fired)
+        return failed
+
+    def select(self):
+        # 随机选择一个下拉框并改为另一个可选值，执行由此触发的回调链
+        component = self.rng.choices(list(ACTIONS), weights=list(ACTIONS.values()))[0]
+        options = [option["value"] for option in self.values.get(f"{component}.options") or []]
+        current = self.values.get(f"{component}.value")
+        choices = [value for value in options if value != current] or options
+        if not choices:
+            return component, False
+        self.values[f"{component}.value"] = self.rng.choice(choices)
+        prop = f"{component}.value"
+        return component, self.run_chain([callback for callback in self.callbacks if prop in callback.inputs], {prop})
+
+    def run(self, deadline):
+        start = time.perf_counter()
+        try:
+            failed = self.open_page()
+        except (OSError, http.client.HTTPException, ValueError):
+            failed = True
+        self.recorder.action("page-load", time.perf_counter() - start, failed)
+        while time.perf_counter() < deadline:
+            time.sleep(min(self.rng.expovariate(1 / self.think_s) if self.think_s > 0 else 0,
+                           max(0.0, deadline - time.perf_counter())))
+            if time.perf_counter() >= deadline:
+                break
+            start = time.perf_counter()
+            try:
+                component, failed = self.select()
+            except (OSError, http.client.HTTPException, ValueError):
+                component, failed = "error", True
+            self.recorder.action(component, time.perf_counter() - start, failed)
+        self._pool.shutdown()
+
+
+def load_callbacks(base_url):
+    # 服务端回调（客户端回调在浏览器中执行，不产生请求）
+    url = urllib.parse.urlsplit(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port, timeout=REQUEST_TIMEOUT_S)
+    connection.request("GET", "/_dash-dependencies")
+    dependencies = json.loads(connection.getresponse().read())
+    connection.close()
+    return [Callback(dependency) for dependency in dependencies if not dependency.get("clientside_function")]
+
+
+def run_step(base_url, users, duration, think_s, etags, seed):
+    # users 个模拟用户并发运行 duration 秒；返回汇总结果
+    callbacks = load_callbacks(base_url)
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=SimulatedUser(base_url, callbacks, recorder, think_s, etags,
+                                                     random.Random(seed * 100003 + i)).run, args=(deadline,))
+               for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(recorder, time.perf_counter() - start)
+
+
+def latency_summary(seconds):
+    return {f"p{q}_ms": round(1000 * percentile(seconds, q), 1) if seconds else None for q in PERCENTILES}
+
+
+def summarize(recorder, elapsed):
+    outputs = {}
+    all_seconds, total, errors = [], 0, 0
+    for name, records in sorted(recorder.requests.items()):
+        seconds = [record[0] for record in records]
+        failed = sum(1 for _, code, _ in records if code not in (200, 204, 304))
+        outputs[name] = {"requests": len(records), "errors": failed,
+                         "not_modified": sum(1 for _, code, _ in records if code == 304),
+                         "wire_kb": round(sum(record[2] for record in records) / 1024, 1), **latency_summary(seconds)}
+        all_seconds += seconds
+        total += len(records)
+        errors += failed
+    actions = {name: {"count": len(records), "errors": sum(1 for _, failed in records if failed),
+                      **latency_summary([seconds for seconds, _ in records])}
+               for name, records in sorted(recorder.actions.items())}
+    selections = [seconds for name, records in recorder.actions.items() if name != "page-load"
+                  for seconds, _ in records]
+    return {"elapsed_s": round(elapsed, 2), "requests": total, "errors": errors,
+            "error_rate": round(errors / total, 4) if total else None,
+            "requests_per_s": round(total / elapsed, 1), "selections_per_s": round(len(selections) / elapsed, 2),
+            "request_latency": latency_summary(all_seconds), "selection_latency": latency_summary(selections),
+            "outputs": outputs, "actions": actions}
+
+
+def start_server(mode, workers, threads, workbook):
+    # 启动服务进程并等待 /readyz 返回 200；返回 (进程, 地址)
+    port = free_port()
+    env = dict(os.environ, DASH_DATA_PATH=workbook)
+    if mode == "dev":
+        command = [sys.executable, "-c", DEV_SERVER_CODE, str(port)]
+    else:
+        env.update(DASH_BIND=f"127.0.0.1:{port}", DASH_WORKERS=str(workers), DASH_THREADS=str(threads))
+        command = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"]
+    process = subprocess.Popen(command, cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    while time.perf_counter() - start < TIMEOUT_S and process.poll() is None:
+        if status(f"{base_url}/readyz")[0] == 200:
+            return process, base_url
+        time.sleep(POLL_S * 10)
+    stop_server(process)
+    raise RuntimeError(f"{mode} server did not become ready")
+
+
+def stop_server(process):
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def format_ms(value):
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_summary(label, users, result):
+    request, selection = result["request_latency"], result["selection_latency"]
+    print(f"{label:<14} {users:>5} {result['requests_per_s']:>8} {result['selections_per_s']:>7} "
+          f"{100 * (result['error_rate'] or 0):>6.2f}% "
+          + " ".join(f"{format_ms(request[f'p{q}_ms']):>8}" for q in PERCENTILES) + " "
+          + " ".join(f"{format_ms(selection[f'p{q}_ms']):>8}" for q in PERCENTILES), flush=True)
+
+
+def print_outputs(result):
+    print(f"    {'output':<36} {'reqs':>6} {'errors':>6} {'304':>5} {'wire KB':>9} "
+          + " ".join(f"{'p' + str(q) + ' ms':>8}" for q in PERCENTILES))
+    for name, stats in result["outputs"].items():
+        print(f"    {name[:36]:<36} {stats['requests']:>6} {stats['errors']:>6} {stats['not_modified']:>5} "
+              f"{stats['wire_kb']:>9} " + " ".join(f"{format_ms(stats[f'p{q}_ms']):>8}" for q in PERCENTILES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent load test of the dashboard callbacks.")
+    parser.add_argument("--scale", default="1x", choices=sorted(SCALES))
+    parser.add_argument("--modes", nargs="+", default=["dev", "gunicorn"], choices=["dev", "gunicorn"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4], help="gunicorn worker counts")
+    parser.add_argument("--threads", type=int, default=4, help="threads per gunicorn worker")
+    parser.add_argument("--users", nargs="+", type=int, default=[1, 10, 25], help="concurrent users per step")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per step")
+    parser.add_argument("--warmup", type=float, default=5, help="unrecorded seconds before the first step")
+    parser.add_argument("--think-ms", type=float, default=1000, help="mean think time between selections")
+    parser.add_argument("--no-etags", action="store_true", help="do not revalidate cached callback responses")
+    parser.add_argument("--url", help="test an already running server instead of starting one")
+    parser.add_argument("--detail", action="store_true", help="print per-output latency for every step")
+    parser.add_argument("--json", help="write all results to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.url:
+        configs = [("external", None)]
+    else:
+        configs = [(mode, workers) for mode in args.modes for workers in (args.workers if mode == "gunicorn" else [1])]
+        workbook = workbook_for(args.scale, args.seed)
+
+    print(f"{'server':<14} {'users':>5} {'req/s':>8} {'sel/s':>7} {'errors':>7} "
+          + " ".join(f"{'req p' + str(q):>8}" for q in PERCENTILES) + " "
+          + " ".join(f"{'sel p' + str(q):>8}" for q in PERCENTILES) + "   (ms)")
+    results = []
+    for mode, workers in configs:
+        label = mode if workers is None or mode == "dev" else f"{mode} x{workers}"
+        process = None
+        try:
+            if args.url:
+                base_url = args.url.rstrip("/")
+            else:
+                process, base_url = start_server(mode, workers, args.threads, workbook)
+            if args.warmup > 0:
+                run_step(base_url, max(args.users), args.warmup, args.think_ms / 1000, not args.no_etags, args.seed + 1)
+            for users in args.users:
+                result = run_step(base_url, users, args.duration, args.think_ms / 1000, not args.no_etags, args.seed)
+                print_summary(label, users, result)
+                if args.detail:
+                    print_outputs(result)
+                results.append(dict(result, server=mode, workers=workers, users=users))
+        except RuntimeError as exc:
+            print(f"{label:<14} {exc}")
+        finally:
+            if process is not None:
+                stop_server(process)
+    if results and not args.detail:
+        # 最后一步（通常并发最高）的各回调输出延迟
+        print(f"\nper output: {results[-1]['server']} workers={results[-1]['workers']} users={results[-1]['users']}")
+        print_outputs(results[-1])
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"scale": args.scale, "think_ms": args.think_ms, "duration_s": args.duration,
+                       "results": results}, f, indent=2)
+    return 1 if any(result["errors"] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# 启动耗时：从启动服务进程到第一个响应（首字节）和到数据就绪（/readyz 返回 200）的时间，
+# 对比后台加载（服务立即启动）和同步加载（数据加载完成后才开始服务）两种方式
+# 用法：python benchmarks/startup.py [--scales 1x 10x] [--repeat 3]
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bench import workbook_for  # noqa: E402
+from synthetic import EXCEL_MAX_ROWS, SCALES  # noqa: E402
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 服务进程：create_app 后直接运行开发服务器（不启动调试重载）
+SERVER_CODE = ("import sys; from PPT1 import create_app; "
+               "create_app({'load_mode': sys.argv[1]}).run(port=int(sys.argv[2]))")
+POLL_S = 0.01
+TIMEOUT_S = 600
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def status(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, exc.read()
+    except OSError:
+        return None, None
+
+
+def measure_startup(workbook, load_mode):
+    # 返回 (首字节秒数, 就绪秒数, 服务端报告的 /readyz 内容)
+    port = free_port()
+    env = dict(os.environ, DASH_DATA_PATH=workbook)
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-c", SERVER_CODE, load_mode, str(port)], cwd=REPO_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_byte = ready = report = None
+    try:
+        while time.perf_counter() - start < TIMEOUT_S and process.poll() is None:
+            code, body = status(f"http://127.0.0.1:{port}/readyz")
+            now = time.perf_counter() - start
+            if code is not None and first_byte is None:
+                first_byte = now
+            if code == 200:
+                ready, report = now, json.loads(body)
+                break
+            time.sleep(POLL_S)
+    finally:
+        process.terminate()
+        process.wait()
+    return first_byte, ready, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure process start to first byte and to data ready.")
+    parser.add_argument("--scales", nargs="+", default=["1x"], choices=sorted(SCALES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'scale':<6} {'load mode':<12} {'first byte s':>12} {'ready s':>9} {'server import->ready s':>24}")
+    for scale in args.scales:
+        params = SCALES[scale]
+        if params["plants"] * params["turbines"] * params["years"] * 365 > EXCEL_MAX_ROWS:
+            print(f"{scale:<6} skipped (exceeds the Excel sheet limit)")
+            continue
+        workbook = workbook_for(scale, args.seed)
+        measure_startup(workbook, "sync")  # 预热：首次加载写入列式缓存，不计入结果
+        for load_mode in ("background", "sync"):
+            runs = [measure_startup(workbook, load_mode) for _ in range(args.repeat)]
+            if any(ready is None for _, ready, _ in runs):
+                print(f"{scale:<6} {load_mode:<12} failed to become ready")
+                continue
+            print(f"{scale:<6} {load_mode:<12} {statistics.median(run[0] for run in runs):>12.2f} "
+                  f"{statistics.median(run[1] for run in runs):>9.2f} "
+                  f"{statistics.median(run[2]['import_to_ready_s'] for run in runs):>24.2f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
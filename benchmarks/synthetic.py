@@ -0,0 +1,116 @@
+# 合成 "Production statistics" 数据：与真实工作簿相同的列结构（时间、电厂、设备 + columns_to_numeric），
+# 电厂数、每厂风机数、年数以及缺失值/错误值比例可配置，用于基准测试和无法共享真实数据时的调试
+# 用法：python benchmarks/synthetic.py out.xlsx [--plants 3] [--turbines 20] [--years 2] [--nan-rate 0.01]
+import argparse
+import os
+import sys
+
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_loader import columns_to_numeric  # noqa: E402
+
+# Excel 工作表的最大行数（含表头），超过时只能生成数据框
+EXCEL_MAX_ROWS = 1_048_575
+# 错误值：导出系统中常见的非数值内容
+GARBAGE_VALUES = np.array(["--", "N/A", "#VALUE!", "error", ""], dtype=object)
+# 基准测试的数据规模：1x 约为一个中型风电场集群两年的日数据
+SCALES = {
+    "1x": {"plants": 3, "turbines": 20, "years": 2},
+    "10x": {"plants": 6, "turbines": 100, "years": 2},
+    "100x": {"plants": 12, "turbines": 250, "years": 4},
+}
+
+
+def generate_frame(plants=3, turbines=20, years=2, start="2023-01-01", nan_rate=0.01, garbage_rate=0.005,
+                   seed=0):
+    # 返回与 pd.read_excel 读取结果相同形式的原始数据框（时间为文本，数值列含缺失值和错误值，尚未清洗）
+    rng = np.random.default_rng(seed)
+    days = pd.date_range(start, periods=365 * years, freq="D")
+    plant_names = np.array([f"Plant {i + 1:02d}" for i in range(plants)], dtype=object)
+    device_names = np.array([f"WTG{i + 1:03d}" for i in range(turbines)], dtype=object)
+    n_days, n_devices = len(days), plants * turbines
+    n = n_days * n_devices
+
+    # 行顺序：设备在外层、日期在内层（与场站导出报表一致）
+    plant_of_row = np.repeat(np.repeat(np.arange(plants), turbines), n_days)
+    device_of_row = np.repeat(np.tile(np.arange(turbines), plants), n_days)
+    day_of_row = np.tile(np.arange(n_days), n_devices)
+    times = days[day_of_row]
+
+    # 风速：Weibull 分布，叠加电厂差异和季节变化；发电量按简化功率曲线计算
+    season = 1 + 0.25 * np.cos(2 * np.pi * (times.dayofyear.to_numpy() - 15) / 365)
+    plant_factor = 0.8 + 0.4 * rng.random(plants)[plant_of_row]
+    wind = 7.0 * plant_factor * season * rng.weibull(2.0, n)
+    power = np.clip((wind - 3.0) / 9.0, 0, 1) ** 3 * (wind < 25)  # 切入 3 m/s、额定 12 m/s、切出 25 m/s
+    production_hours = np.round(24 * np.clip(power * 3, 0, 1) * rng.uniform(0.85, 1.0, n), 2)
+    fault_hours = np.round(np.where(rng.random(n) < 0.03, rng.uniform(0, 24, n), 0.0), 2)
+    curtail_hours = np.round(np.where(rng.random(n) < 0.05, rng.uniform(0, 12, n), 0.0), 2)
+    capacity_kwh = 2500 * 24
+    exported = np.round(capacity_kwh * power * (1 - (fault_hours + curtail_hours) / 48), 2)
+    values = {
+        "Average ambient temperature (°C)": np.round(27 + 4 * np.sin(2 * np.pi * times.dayofyear.to_numpy() / 365)
+                                                     + rng.normal(0, 1.5, n), 2),
+        "Active Energy Imported(kWh)": np.round(rng.gamma(2.0, 15.0, n), 2),
+        "Active Energy Exported(kWh)": exported,
+        "Energy production time (h)": production_hours,
+        "Equivalent Utilization Hours (H)": np.round(exported / 2500, 2),
+        "Loss due to curtailment (kWh)": np.round(curtail_hours * 2500 * power, 2),
+        "Curtailment duration (h)": curtail_hours,
+        "Loss due to fault (kWh)": np.round(fault_hours * 2500 * power, 2),
+        "Fault duration (h)": fault_hours,
+        "Average wind speed (m/s)": np.round(wind, 2),
+    }
+
+    df = pd.DataFrame({
+        "Statistical time": times.strftime("%Y-%m-%d").to_numpy(dtype=object),
+        "Power plant name": plant_names[plant_of_row],
+        "Device Name": device_names[device_of_row],
+    })
+    for col in columns_to_numeric:
+        column = values[col].astype(object)
+        column[rng.random(n) < nan_rate] = np.nan
+        garbage = rng.random(n) < garbage_rate
+        column[garbage] = rng.choice(GARBAGE_VALUES, garbage.sum())
+        df[col] = column
+
+    # 关键列中的错误：无法解析的时间、缺失的电厂名（清洗时这些行会被丢弃）
+    df.loc[rng.random(n) < garbage_rate / 5, "Statistical time"] = "invalid"
+    df.loc[rng.random(n) < garbage_rate / 5, "Power plant name"] = None
+    return df
+
+
+def write_workbook(df, path, sheet_name="Production statistics"):
+    # 写入 Excel 工作簿（pd.read_excel 读回的内容与 df 相同）
+    if len(df) > EXCEL_MAX_ROWS:
+        raise ValueError(f"{len(df)} rows exceed the Excel sheet limit of {EXCEL_MAX_ROWS}")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    df.to_excel(path, sheet_name=sheet_name, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Production statistics workbook.")
+    parser.add_argument("out")
+    parser.add_argument("--scale", choices=sorted(SCALES), help="preset size (overrides plants/turbines/years)")
+    parser.add_argument("--plants", type=int, default=3)
+    parser.add_argument("--turbines", type=int, default=20, help="turbines per plant")
+    parser.add_argument("--years", type=int, default=2)
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--nan-rate", type=float, default=0.01)
+    parser.add_argument("--garbage-rate", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sheet", default="Production statistics")
+    args = parser.parse_args(argv)
+
+    size = SCALES[args.scale] if args.scale else {"plants": args.plants, "turbines": args.turbines,
+                                                  "years": args.years}
+    df = generate_frame(start=args.start, nan_rate=args.nan_rate, garbage_rate=args.garbage_rate,
+                        seed=args.seed, **size)
+    write_workbook(df, args.out, args.sheet)
+    print(f"{len(df)} rows -> {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
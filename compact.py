@@ -0,0 +1,134 @@
+# 紧凑数据模型：电厂/设备用分类编码，数值列在精度允许时用 float32，日期用整数日序号，年/月/周用小整数
+import sys
+
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+from data_loader import columns_to_numeric
+
+# 分类编码的字符串列
+CATEGORY_COLUMNS = ["Power plant name", "Device Name", "Region", "Country"]
+# float32 保留的有效数字位数
+FLOAT32_DIGITS = 7
+
+
+def widen_float32(values):
+    # float32 -> float64 时按 7 位有效数字取整，还原原始的十进制数值（如 12.34 而不是 12.340000152587891）
+    values = values.astype("float64")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+    scale = 10.0 ** (FLOAT32_DIGITS - 1 - np.where(np.isfinite(magnitude), magnitude, 0))
+    return np.round(values * scale) / scale
+
+
+def _float32_if_exact(values):
+    # 仅当 float32 往返后数值完全不变时才降精度
+    narrow = values.astype("float32")
+    if np.array_equal(widen_float32(narrow), values, equal_nan=True):
+        return narrow
+    return values
+
+
+def compact_frame(df):
+    # 返回紧凑表示的新数据框（可重复调用；追加数据后再次调用即可恢复分类编码）
+    df = df.copy()
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    for col in columns_to_numeric:
+        if col in df.columns and df[col].dtype == "float64":
+            df[col] = _float32_if_exact(df[col].to_numpy())
+    # 日期：自 1970-01-01 起的天数（替代每行一个 Python date 对象）
+    df["Day"] = df["Statistical time"].to_numpy().astype("datetime64[D]").astype("int32")
+    df["Year"] = df["Year"].astype("int16")
+    df["Month"] = df["Month"].astype("int8")
+    df["Week"] = df["Week"].astype("uint8")
+    return df
+
+
+def measure_values(df, col):
+    # 读取数值列为 float64（float32 列按有效数字还原）
+    values = df[col].to_numpy()
+    if values.dtype == np.float32:
+        return widen_float32(values)
+    return values.astype("float64")
+
+
+def memory_report(before, after):
+    # 每列内存占用（字节）对比
+    report = pd.DataFrame({
+        "before": before.memory_usage(deep=True, index=False),
+        "after": after.memory_usage(deep=True, index=False),
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+    })
+    report.loc["TOTAL", ["before", "after"]] = report[["before", "after"]].sum()
+    report["ratio"] = report["after"] / report["before"]
+    return report
+
+
+def compare_snapshots(reference, candidate, rtol=1e-6):
+    # 两个快照（不同数据表示或存储后端）的所有图表/表格数据在容差内一致，返回不一致的项目列表
+    mismatches = []
+
+    def compare(label, a, b):
+        try:
+            pd.testing.assert_frame_equal(
+                pd.DataFrame(a).reset_index(), pd.DataFrame(b).reset_index(),  # 索引（日期、周）一并比较
+                check_dtype=False, check_categorical=False, check_exact=False, rtol=rtol,
+            )
+        except AssertionError as exc:
+            mismatches.append((label, str(exc).splitlines()[0]))
+
+    for plant in reference.available_projects:
+        compare(("weekly", plant), reference.rollups.weekly_wind(plant), candidate.rollups.weekly_wind(plant))
+        compare(("monthly", plant), reference.rollups.monthly_summary(plant), candidate.rollups.monthly_summary(plant))
+        compare(("annual", plant), reference.rollups.annual_production(plant),
+                candidate.rollups.annual_production(plant))
+    for plant, year, month in reference.index.month_spans:
+        compare(("table", plant, year, month), reference.rollups.device_table(plant, year, month),
+                candidate.rollups.device_table(plant, year, month))
+        compare(("daily", plant, year, month), reference.rollups.daily(plant, year, month),
+                candidate.rollups.daily(plant, year, month))
+    # 任意日期区间：全部数据和一个跨月窗口
+    first, last = reference.index.start_time, reference.index.end_time
+    windows = [] if pd.isna(first) else [(first, last), (first + pd.Timedelta(days=45), first + pd.Timedelta(days=136))]
+    for plant in reference.available_projects:
+        for start, end in windows:
+            start, end = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+            for method in ("daily_range", "device_table_range", "device_range_totals", "range_totals"):
+                compare((method, plant, start, end), getattr(reference.rollups, method)(plant, start, end),
+                        getattr(candidate.rollups, method)(plant, start, end))
+    for year in reference.available_years:
+        for level in ("plant", "device"):
+            compare(("kpi", level, year), reference.kpis.table(year, None, level),
+                    candidate.kpis.table(year, None, level))
+        for plant in reference.available_projects:
+            compare(("power_curve", plant, year), reference.power_curves.scores(plant, year),
+                    candidate.power_curves.scores(plant, year))
+            compare(("wind_devices", plant, year), reference.wind_histograms.device_summary(plant, year),
+                    candidate.wind_histograms.device_summary(plant, year))
+            compare(("wind_monthly", plant, year), reference.wind_histograms.monthly_summary(plant, year),
+                    candidate.wind_histograms.monthly_summary(plant, year))
+    return mismatches
+
+
+def check_equivalence(df, rtol=1e-6):
+    # 回归检查：紧凑表示与原始表示下所有图表/表格的数据在容差内一致，返回不一致的项目列表
+    from snapshot import DataSnapshot
+
+    full = DataSnapshot.from_frame(df, "full")
+    lean = DataSnapshot.from_frame(df, "compact", compact=True)
+    return compare_snapshots(full, lean, rtol)
+
+
+if __name__ == "__main__":
+    # 用法：python compact.py <工作簿路径> [工作表名]
+    from data_loader import load_production_statistics
+
+    source = load_production_statistics(sys.argv[1], *(sys.argv[2:3] or ["Production statistics"]))
+    with pd.option_context("display.width", 200, "display.max_columns", 10):
+        print(memory_report(source, compact_frame(source)))
+    problems = check_equivalence(source)
+    print("equivalence:", "OK" if not problems else problems[:20])
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,64 @@
+# 分区索引：按 (电厂, 年, 月) 排序后记录连续行区间，回调直接切片而不是整表布尔筛选
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+# 排序键：电厂、年、月，组内再按时间排序
+PARTITION_KEYS = ["Power plant name", "Year", "Month"]
+
+
+def partition_spans(columns, n):
+    # 排序后的键列发生变化的位置即分区起点
+    change = np.zeros(n, dtype=bool)
+    if n:
+        change[0] = True
+    for values in columns:
+        change[1:] |= values[1:] != values[:-1]
+    starts = np.flatnonzero(change)
+    stops = np.append(starts[1:], n)
+    keys = zip(*(values[starts].tolist() for values in columns))
+    return {key if len(key) > 1 else key[0]: slice(start, stop)
+            for key, start, stop in zip(keys, starts.tolist(), stops.tolist())}
+
+
+class PartitionIndex:
+    def __init__(self, df, presorted=False):
+        # 全量年份和时间范围（保持原始数据中的出现顺序，供图表补齐使用）
+        self.all_years = df["Year"].unique()
+        self.start_time = df["Statistical time"].min()
+        self.end_time = df["Statistical time"].max()
+
+        # 稳定排序，保证同一分区内的行顺序与原数据一致
+        if not presorted:
+            df = df.sort_values(PARTITION_KEYS + ["Statistical time"], kind="mergesort").reset_index(drop=True)
+        self.df = df
+
+        plants = self.df["Power plant name"].to_numpy()
+        years = self.df["Year"].to_numpy()
+        months = self.df["Month"].to_numpy()
+        n = len(self.df)
+        self.plant_spans = partition_spans([plants], n)
+        self.year_spans = partition_spans([plants, years], n)
+        self.month_spans = partition_spans([plants, years, months], n)
+
+    def extend(self, new_rows):
+        # 追加的行晚于同一电厂的现有数据：逐电厂拼接 [旧区间, 新区间] 仍然有序，无需全量重新排序
+        added = PartitionIndex(new_rows)
+        pieces = []
+        for plant in sorted(set(self.plant_spans) | set(added.plant_spans)):
+            pieces.append(self.rows(plant))
+            pieces.append(added.rows(plant))
+        index = PartitionIndex(pd.concat(pieces, ignore_index=True), presorted=True)
+        index.all_years = pd.unique(np.concatenate([self.all_years, added.all_years]))
+        return index
+
+    def span(self, plant, year=None, month=None):
+        # 返回 (电厂[, 年[, 月]]) 对应的行区间，不存在时返回空区间
+        if year is None:
+            return self.plant_spans.get(plant, slice(0, 0))
+        if month is None:
+            return self.year_spans.get((plant, year), slice(0, 0))
+        return self.month_spans.get((plant, year, month), slice(0, 0))
+
+    def rows(self, plant, year=None, month=None):
+        # O(1) 获取子集（连续切片，不分配布尔掩码）
+        return self.df.iloc[self.span(plant, year, month)]
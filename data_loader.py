@@ -0,0 +1,254 @@
+# 数据加载与清洗："Production statistics" 工作表读取、清洗以及列式磁盘缓存
+import glob
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+from openpyxl import load_workbook  # 用于流式读取 Excel 文件
+
+# 列式缓存依赖 pyarrow，未安装时直接读取 Excel
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+logger = logging.getLogger(__name__)
+
+# 清洗逻辑变化时递增，旧缓存自动失效
+CACHE_VERSION = 2
+# 默认缓存目录（与脚本同级）
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# 需要转换为数值类型的变量列
+columns_to_numeric = [
+    "Average ambient temperature (°C)",
+    "Active Energy Imported(kWh)",
+    "Active Energy Exported(kWh)",
+    "Energy production time (h)",
+    "Equivalent Utilization Hours (H)",
+    "Loss due to curtailment (kWh)",
+    "Curtailment duration (h)",
+    "Loss due to fault (kWh)",
+    "Fault duration (h)",
+    "Average wind speed (m/s)"
+]
+# 关键列：时间、电厂、设备
+key_columns = ["Statistical time", "Power plant name", "Device Name"]
+# 流式读取每批处理的行数
+DEFAULT_CHUNK_ROWS = 50_000
+
+
+def read_production_statistics(file_path, sheet_name="Production statistics"):
+    # 读取 Excel 文件
+    return pd.read_excel(file_path, sheet_name=sheet_name)
+
+
+def clean_production_statistics(df):
+    # 1. 转换日期格式
+    df["Statistical time"] = pd.to_datetime(df["Statistical time"], errors="coerce")
+
+    # 2. 转换为数值类型，遇到错误数据会变成 NaN，但不删除整行
+    for col in columns_to_numeric:
+        df[col] = pd.to_numeric(df[col], errors="coerce")  # 仅将无法转换的值变为 NaN
+
+    # 删除关键列中为 NaN 的数据，而不是整行
+    df = df.dropna(subset=["Statistical time", "Power plant name"])  # 确保关键列没有 NaN
+    return add_time_columns(df)
+
+
+def add_time_columns(df):
+    # 3. 添加时间相关列（年、月、周等）
+    df["Year"] = df["Statistical time"].dt.year
+    df["Month"] = df["Statistical time"].dt.month
+    df["Week"] = df["Statistical time"].dt.isocalendar().week
+    df["Day"] = df["Statistical time"].dt.date
+    return df
+
+
+def _column_values(block, position):
+    # 只读模式下行尾的空单元格可能被省略
+    return pd.Series([row[position] if position < len(row) else None for row in block], dtype=object)
+
+
+def read_production_statistics_streaming(file_path, sheet_name="Production statistics", chunk_size=DEFAULT_CHUNK_ROWS):
+    # openpyxl 只读模式逐行读取，每 chunk_size 行直接转换为定长 NumPy 数组：
+    # 无法转换的数值记为 NaN，缺少时间或电厂的行在读取时即丢弃，峰值内存只比最终数据多一个批次
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, ())
+        positions = {name: i for i, name in enumerate(header) if name is not None}
+        missing = [col for col in key_columns + columns_to_numeric if col not in positions]
+        if missing:
+            raise ValueError(f"{file_path} [{sheet_name}] is missing columns: {missing}")
+
+        chunks = {col: [] for col in key_columns + columns_to_numeric}
+        while True:
+            block = list(islice(rows, chunk_size))
+            if not block:
+                break
+            times = pd.to_datetime(_column_values(block, positions["Statistical time"]), errors="coerce").to_numpy()
+            plants = _column_values(block, positions["Power plant name"]).to_numpy()
+            keep = ~np.isnat(times) & pd.notna(plants)
+            chunks["Statistical time"].append(times[keep])
+            chunks["Power plant name"].append(plants[keep])
+            chunks["Device Name"].append(_column_values(block, positions["Device Name"]).to_numpy()[keep])
+            for col in columns_to_numeric:
+                values = pd.to_numeric(_column_values(block, positions[col]), errors="coerce")
+                chunks[col].append(values.to_numpy(dtype="float64")[keep])
+    finally:
+        workbook.close()
+
+    df = pd.DataFrame({
+        col: np.concatenate(parts) if parts else np.array([], dtype="datetime64[ns]" if col == "Statistical time" else object)
+        for col, parts in chunks.items()
+    })
+    return add_time_columns(df)
+
+
+def parse_production_statistics(file_path, sheet_name="Production statistics", reader="pandas"):
+    # reader: "pandas"（pd.read_excel 读取全部列）或 "streaming"（只读取关键列和数值列，内存有界）
+    if reader == "streaming":
+        return read_production_statistics_streaming(file_path, sheet_name)
+    return clean_production_statistics(read_production_statistics(file_path, sheet_name))
+
+
+def file_fingerprint(file_path, sheet_name, reader="pandas"):
+    # 缓存键：路径、大小、修改时间和内容哈希（以及读取方式，两种方式保留的列不同）
+    stat = os.stat(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {
+        "version": CACHE_VERSION,
+        "path": os.path.abspath(file_path),
+        "sheet": sheet_name,
+        "reader": reader,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime_ns,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def _cache_paths(file_path, sheet_name, reader, cache_dir):
+    # 每个 (工作簿, 工作表, 读取方式) 对应一个 parquet 文件和一个键文件
+    name = hashlib.sha1(f"{os.path.abspath(file_path)}|{sheet_name}|{reader}".encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(cache_dir, f"production_{name}")
+    return base + ".parquet", base + ".json"
+
+
+def _read_cache(data_path, key_path, key):
+    try:
+        with open(key_path, encoding="utf-8") as f:
+            if json.load(f) != key:
+                return None
+        return pd.read_parquet(data_path)
+    except (OSError, ValueError):  # 缓存缺失或损坏时重新构建
+        return None
+
+
+def _write_cache(df, data_path, key_path, key):
+    # 先写临时文件再替换，避免并发启动读到半个文件
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    df.to_parquet(data_path + ".tmp", index=False)
+    os.replace(data_path + ".tmp", data_path)
+    with open(key_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(key, f)
+    os.replace(key_path + ".tmp", key_path)
+
+
+def load_production_statistics(file_path, sheet_name="Production statistics", cache_dir=DEFAULT_CACHE_DIR,
+                               reader="pandas"):
+    # 工作簿未变化时直接读取列式缓存，否则重新解析 Excel 并写入缓存
+    # 内容哈希同时作为数据版本号写入 df.attrs["data_version"]
+    key = file_fingerprint(file_path, sheet_name, reader)
+    df = None
+    if HAS_PYARROW and cache_dir is not None:
+        data_path, key_path = _cache_paths(file_path, sheet_name, reader, cache_dir)
+        df = _read_cache(data_path, key_path, key)
+        if df is None:
+            df = parse_production_statistics(file_path, sheet_name, reader)
+            try:
+                _write_cache(df, data_path, key_path, key)
+            except (OSError, ValueError, TypeError):  # 混合类型列无法写入 parquet 时仅跳过缓存
+                pass
+    if df is None:
+        df = parse_production_statistics(file_path, sheet_name, reader)
+    df.attrs["data_version"] = key["sha256"][:16]
+    return df
+
+
+# 多工作簿 / 多区域并行加载
+def _country_from_path(path):
+    # "Vietnam Data-20241118.xlsx" -> "Vietnam"
+    return re.split(r"[ _\-.]", os.path.basename(path))[0]
+
+
+def expand_sources(sources, sheet_name="Production statistics"):
+    # 数据源配置：路径/通配符字符串，或 {"path", "sheet", "country", "region", "reader"} 字典
+    expanded = []
+    for source in sources:
+        if isinstance(source, str):
+            source = {"path": source}
+        pattern = source["path"]
+        paths = sorted(glob.glob(pattern)) if any(ch in pattern for ch in "*?[") else [pattern]
+        for path in paths:
+            expanded.append({
+                "path": path,
+                "sheet": source.get("sheet", sheet_name),
+                "country": source.get("country") or _country_from_path(path),
+                "region": source.get("region", "Asia"),
+                "reader": source.get("reader", "pandas"),
+            })
+    return expanded
+
+
+def load_source(source, cache_dir=DEFAULT_CACHE_DIR):
+    # 加载单个数据源并添加 Region / Country 维度（在工作进程中执行）
+    df = load_production_statistics(source["path"], source["sheet"], cache_dir, source.get("reader", "pandas"))
+    df["Region"] = source["region"]
+    df["Country"] = source["country"]
+    return df
+
+
+def load_sources(sources, max_workers=None, cache_dir=DEFAULT_CACHE_DIR):
+    # 多个工作簿在进程池中并行解析和清洗，单个文件失败只记录不中断整体加载
+    # 返回 (合并后的数据, [(路径, 错误信息), ...])
+    sources = expand_sources(sources)
+    results = []
+    if len(sources) <= 1 or max_workers == 1:
+        for source in sources:
+            try:
+                results.append((source, load_source(source, cache_dir)))
+            except Exception as exc:  # 与并行路径保持一致：记录失败并继续
+                results.append((source, exc))
+    else:
+        workers = min(max_workers or os.cpu_count() or 1, len(sources))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(source, pool.submit(load_source, source, cache_dir)) for source in sources]
+            for source, future in futures:
+                try:
+                    results.append((source, future.result()))
+                except Exception as exc:
+                    results.append((source, exc))
+
+    frames, failures, versions = [], [], []
+    for source, result in results:
+        if isinstance(result, Exception):
+            logger.warning("Failed to load %s: %s", source["path"], result)
+            failures.append((source["path"], f"{type(result).__name__}: {result}"))
+            continue
+        versions.append(result.attrs.get("data_version", ""))
+        frames.append(result)
+    if not frames:
+        raise RuntimeError(f"No production statistics could be loaded: {failures}")
+
+    df = pd.concat(frames, ignore_index=True)
+    # 数据版本号由各工作簿的内容哈希组合而成
+    df.attrs["data_version"] = hashlib.sha1("|".join(versions).encode("utf-8")).hexdigest()[:16]
+    return df, failures
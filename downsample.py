@@ -0,0 +1,44 @@
+# 长时间序列保形降采样（Largest-Triangle-Three-Buckets）：按点数预算抽取数据点，保留峰谷形状和缺口
+import numpy as np  # 数值计算
+
+
+def lttb_indices(x, y, n_out):
+    # x、y 为等长且不含 NaN 的 float 数组（x 递增）；返回保留点的下标，首尾两点总是保留
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # n_out - 2 个内部桶：edges[i]..edges[i+1]
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        # 下一个桶的平均点（最后一个桶之后为终点）
+        next_start, next_stop = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        # 与上一个选中点、下一桶平均点构成的三角形面积最大的点
+        area = np.abs((x[selected] - avg_x) * (y[start:stop] - y[selected])
+                      - (x[selected] - x[start:stop]) * (avg_y - y[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    return indices
+
+
+def downsample_indices(x, y, max_points):
+    # 返回保留点的位置；点数不超过预算时返回 None（不需要降采样）
+    # 缺失值（NaN）每段只保留第一个点，使折线在缺口处仍然断开
+    y = np.asarray(y, dtype="float64")
+    if len(y) <= max_points:
+        return None
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype("datetime64[ns]").astype("int64")
+    x = x.astype("float64")
+    finite = np.isfinite(y)
+    gap_starts = np.flatnonzero(~finite & np.concatenate(([True], finite[:-1])))
+    valid = np.flatnonzero(finite)
+    budget = max(3, max_points - len(gap_starts))
+    keep = valid[lttb_indices(x[valid], y[valid], budget)]
+    return np.sort(np.concatenate([keep, gap_starts]))
@@ -0,0 +1,117 @@
+# 服务端批量导出：按电厂、年月范围逐行流式输出设备 × 日汇总数据（CSV 边写边 gzip 压缩，或 xlsx）
+import csv
+import io
+import os
+import tempfile
+import zlib
+
+from flask import Response, request, stream_with_context
+from openpyxl import Workbook
+
+from data_loader import columns_to_numeric
+
+EXPORT_COLUMNS = ["Power plant name", "Device Name", "Day"] + columns_to_numeric
+# 流式输出时每次发送的数据块大小
+CHUNK_BYTES = 64 * 1024
+# 单次导出最多包含的月数（start 到 end，含两端）
+MAX_EXPORT_MONTHS = 240
+
+
+def _parse_month(text, default):
+    # "2024-03" -> (2024, 3)；月份不在 1–12 时抛出 ValueError
+    if not text:
+        return default
+    year, _, month = text.partition("-")
+    year, month = int(year), int(month or 1)
+    if not 1 <= month <= 12:
+        raise ValueError(f"month out of range: {text}")
+    return year, month
+
+
+def month_count(start, end):
+    # [start, end] 包含的月数
+    return (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+
+
+def iter_months(start, end):
+    (year, month), (end_year, end_month) = start, end
+    while (year, month) <= (end_year, end_month):
+        yield year, month
+        year, month = (year + 1, 1) if month >= 12 else (year, month + 1)
+
+
+def iter_device_rows(snapshot, plants, start, end):
+    # 逐个 (电厂, 月) 从预聚合结果中取出设备日数据，内存中始终只保留一个电厂月
+    for plant in plants:
+        for year, month in iter_months(start, end):
+            table = snapshot.rollups.device_table(plant, year, month)
+            if table.empty:
+                continue
+            table.insert(0, "Power plant name", plant)
+            table["Day"] = table["Day"].astype(str)
+            table = table[EXPORT_COLUMNS].astype(object)
+            table = table.where(table.notna(), None)  # 缺失值输出为空单元格
+            yield from table.itertuples(index=False, name=None)
+
+
+def stream_csv_gzip(rows):
+    # CSV 按块写入并立即 gzip 压缩输出
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_BYTES:
+            yield compressor.compress(buffer.getvalue().encode("utf-8"))
+            buffer.seek(0)
+            buffer.truncate()
+    yield compressor.compress(buffer.getvalue().encode("utf-8"))
+    yield compressor.flush()
+
+
+def stream_xlsx(rows):
+    # openpyxl 只写模式逐行写入临时文件，保存后分块输出（xlsx 本身即为 zip 压缩）
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Device daily")
+    sheet.append(EXPORT_COLUMNS)
+    for row in rows:
+        sheet.append(row)
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+                yield block
+    finally:
+        os.remove(path)
+
+
+def export_device_daily(snapshot):
+    # GET /export/device-daily?format=csv|xlsx&plant=A&plant=B&start=2024-01&end=2024-12
+    # 不指定 plant 时导出所有电厂，不指定 start/end 时导出全部时间范围
+    plants = request.args.getlist("plant") or snapshot.available_projects
+    first, last = snapshot.index.start_time, snapshot.max_time
+    try:
+        start = _parse_month(request.args.get("start"), (first.year, first.month))
+        end = _parse_month(request.args.get("end"), (last.year, last.month))
+    except ValueError:
+        return Response("start/end must be YYYY-MM", status=400)
+    if start > end:
+        return Response("start/end must be YYYY-MM", status=400)
+    if month_count(start, end) > MAX_EXPORT_MONTHS:
+        return Response(f"start/end must span at most {MAX_EXPORT_MONTHS} months", status=400)
+    rows = iter_device_rows(snapshot, plants, start, end)
+    name = f"device_daily_{start[0]}{start[1]:02d}_{end[0]}{end[1]:02d}"
+
+    if request.args.get("format", "csv") == "xlsx":
+        body = stream_xlsx(rows)
+        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        filename = name + ".xlsx"
+    else:
+        body = stream_csv_gzip(rows)
+        mimetype = "application/gzip"
+        filename = name + ".csv.gz"
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={"Content-Disposition": f'attachment; filename="{filename}"'})
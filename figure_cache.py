@@ -0,0 +1,102 @@
+# 图表/表格结果缓存：按 (回调, 选择器取值, 数据版本) 缓存渲染结果，按条目数和字节数做 LRU 淘汰
+import functools
+import json
+import threading
+from collections import OrderedDict
+
+from metrics import cache_result, checkpoint
+
+
+def payload_bytes(value):
+    # 估算结果序列化后的大小（图表使用 Plotly 自带的 to_json）
+    if isinstance(value, (tuple, list)) and value and not isinstance(value[0], dict):
+        return sum(payload_bytes(item) for item in value)
+    if hasattr(value, "to_json"):
+        return len(value.to_json())
+    return len(json.dumps(value, default=str))
+
+
+class FigureCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, data_version=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.data_version = data_version
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes):
+        with self._lock:
+            if nbytes > self.max_bytes:  # 单个结果超过上限时不缓存
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            # 按最近最少使用顺序淘汰
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_bytes) = self._entries.popitem(last=False)
+                self._bytes -= evicted_bytes
+                self.evictions += 1
+
+    def set_data_version(self, data_version):
+        # 数据重新加载后更换版本号并清空缓存
+        with self._lock:
+            if data_version == self.data_version:
+                return
+            self.data_version = data_version
+            self._entries.clear()
+            self._bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "data_version": self.data_version,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+    def memoize(self, name, key=None):
+        # 装饰回调函数：默认以参数（选择器取值）作为键，也可传入 key 函数只取与结果相关的部分；数据版本一并作为键
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args):
+                version = self.data_version
+                cache_key = (name, args if key is None else key(*args), version)
+                value = self.get(cache_key)
+                cache_result(value is not None)
+                checkpoint("cache")
+                if value is None:
+                    value = func(*args)
+                    if version == self.data_version:  # 计算期间数据已重新加载时不写入旧版本结果
+                        self.put(cache_key, value, payload_bytes(value))
+                        checkpoint("cache_put")
+                return value
+            return wrapper
+        return decorator
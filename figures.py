@@ -0,0 +1,667 @@
+# 图表与表格构建：输入为选择阶段的工作集，Dash 回调和离线批量报告共用同一套作图逻辑
+import pandas as pd  # 数据处理
+import plotly.graph_objects as go  # Plotly 图表
+from dash import Patch
+from dash.dash_table import FormatTemplate
+
+from downsample import downsample_indices
+from kpi import KPIS
+from metrics import add_rows, checkpoint
+from power_curve import WIND, bin_centers
+from table_query import apply_filter, apply_sort, page_of
+from wind_distribution import PERCENTILES, SUMMARY_COLUMNS, summarize, weibull_bin_probabilities
+
+# 仪表盘中各图表的尺寸（宽, 高），离线报告按相同尺寸输出
+FIGURE_SIZES = {
+    "monthly-wind-chart": (550, 140),
+    "weekly-wind-chart": (550, 216),
+    "annual-production-chart": (550, 100),
+    "combined-chart": (550, 225),
+    "combined-chart2": (1020, 550),
+}
+# 长时间序列每像素宽度最多保留的数据点数，超过时保形降采样
+POINTS_PER_PIXEL = 1
+
+
+def point_budget(name):
+    return int(FIGURE_SIZES[name][0] * POINTS_PER_PIXEL)
+
+
+def trace_data_patch(figure, fields=("x", "y")):
+    # 只更新各曲线的数据：布局和曲线样式不变时（如同一电厂同一年切换月份），浏览器保留现有图表只重绘数据
+    patch = Patch()
+    for position, trace in enumerate(figure.data):
+        for field in fields:
+            patch["data"][position][field] = trace[field]
+    return patch
+
+
+def build_table_page(working_set, page_current, page_size, sort_key, filter_query, totals=False):
+    # 按 Device Name 和日期汇总的日数据（工作集中的预聚合结果）；totals=True 时为各设备在所选月份/日期区间的合计
+    grouped_df = working_set.device_totals if totals else working_set.device_table
+
+    # 在预聚合数据上筛选、排序，只返回当前页
+    add_rows(len(grouped_df))
+    view = apply_filter(grouped_df, filter_query)
+    checkpoint("filter")
+    view = apply_sort(view, [{"column_id": column, "direction": direction} for column, direction in sort_key])
+    checkpoint("sort")
+    page, page_count = page_of(view, page_current, page_size)
+
+    # 转换为适合 DataTable 的格式
+    data = page.to_dict("records")  # 转换为字典列表
+    columns = [{"name": col, "id": col} for col in grouped_df.columns]  # 列名和列 ID
+    if totals:  # 区间合计保留两位小数
+        for column in columns[2:]:
+            column.update(type="numeric", format={"specifier": ".2f"})
+    checkpoint("page")
+
+    return data, columns, page_count
+
+
+def build_monthly_wind_chart(working_set):
+    # 图表 1：仅使用 project 筛选（月平均风速查表）
+    monthly_data = working_set.monthly[["Year", "Month", "Average wind speed (m/s)"]]
+
+    # 2. 构造完整的月份数据框架，确保所有月份（1-12）都有记录
+    all_years = working_set.all_years
+    all_months = list(range(1, 13))  # 1 到 12 月
+    full_index = pd.MultiIndex.from_product([all_years, all_months], names=["Year", "Month"])
+    monthly_data = monthly_data.set_index(["Year", "Month"]).reindex(full_index).reset_index()
+
+    # 3. 将月份数字转换为英文名称的前三个字母
+    monthly_data["Month"] = monthly_data["Month"].apply(lambda x: pd.to_datetime(f"2024-{x}-01").strftime("%b"))
+
+    # 4. 固定月份顺序为 "Jan" 到 "Dec"
+    month_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    monthly_data["Month"] = pd.Categorical(monthly_data["Month"], categories=month_order, ordered=True)
+    # 5. 创建对比年份的折线图
+    checkpoint("prepare")  # 取数、补齐（reindex）和格式转换
+    monthly_wind_chart = go.Figure()
+    for year in monthly_data["Year"].unique():
+        yearly_data = monthly_data[monthly_data["Year"] == year]
+        monthly_wind_chart.add_trace(
+            go.Scatter(
+                x=yearly_data["Month"],
+                y=yearly_data["Average wind speed (m/s)"],
+                mode="lines+markers",
+                name=str(year),
+                line = dict(width=2)  # 设置线条宽度
+            )
+        )
+    #原先代码monthly_wind_chart.update_layout(title="Monthly Wind Speed", xaxis_title="Month", yaxis_title="Wind Speed (m/s)")
+    # 更新图表布局
+    monthly_wind_chart.update_layout(
+        title=dict(
+            text="Comparison of Annual Average Wind Speed",  # 标题文本
+            font=dict(
+                family="Arial",  # 字体
+                size=14,  # 字体大小
+                color="black"  # 字体颜色
+            ),
+            x=0.5,  # 标题水平居中
+            xanchor="center",  # 锚点设置为左侧
+            pad=dict(
+                t=30  # 标题和图表的间距
+            )
+        ),
+        xaxis=dict(
+            categoryorder="array",
+            categoryarray=month_order,  # 按固定顺序排列月份
+            showgrid = False  # 取消 X 轴网格线
+        ),
+        yaxis=dict(
+            showgrid=False  # 取消 Y 轴网格线
+        ),
+        margin=dict(
+            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
+            b=10, # 图表下边距
+            l=10, # 设置左侧边距为 15px
+            r=10 # 图表右边距
+        ),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor = "white"  # 设置背景为白色
+        )
+
+    checkpoint("figure")
+    return monthly_wind_chart
+
+
+def build_weekly_wind_chart(working_set):
+    # 图表 2：周风速变化区域图
+    # 1. 计算整个数据集的开始日期和结束日期（不受年份筛选器影响）
+    start_date = working_set.start_time  # 数据集的最早日期
+    end_date = working_set.end_time  # 数据集的最晚日期
+
+    # 2. 每周的平均风速（预聚合查表）
+    weekly_data = working_set.weekly
+
+    # 3. 创建完整的日期范围（从开始日期到结束日期，每周一为时间点）
+    full_date_range = pd.date_range(start=start_date, end=end_date, freq="W-Mon")
+
+    # 4. 将完整的日期范围与每周数据对齐
+    weekly_data = weekly_data.reindex(full_date_range).reset_index()
+    weekly_data.columns = ["Statistical time", "Average wind speed (m/s)"]
+
+    # 时间跨度很长（点数超过图表宽度对应的预算）时保形降采样
+    keep = downsample_indices(weekly_data["Statistical time"], weekly_data["Average wind speed (m/s)"],
+                              point_budget("weekly-wind-chart"))
+    if keep is not None:
+        weekly_data = weekly_data.iloc[keep]
+
+    # 5. 绘制区域图
+    checkpoint("prepare")
+    weekly_wind_chart = go.Figure(
+        data=go.Scatter(
+            x=weekly_data["Statistical time"],# X 轴为完整的每周时间点
+            y=weekly_data["Average wind speed (m/s)"],# Y 轴为每周的平均风速
+            mode="lines",# 显示线条模式
+            fill="tozeroy",# 填充区域到 Y=0
+            name="Weekly Average Wind Speed",
+            line = dict(color="#0d3057", width=2),  # 设置线条颜色
+            fillcolor = "#0d3057"  # 区域填充颜色
+
+        )
+    )
+    #原先代码weekly_wind_chart.update_layout(title="Weekly Wind Speed", xaxis_title="Week", yaxis_title="Wind Speed (m/s)")
+    # 6. 更新图表布局
+    weekly_wind_chart.update_layout(
+        title=dict(
+            text="Variation of Weekly Average Wind Speed",  # 标题文本
+            font=dict(
+                family="Arial",  # 字体
+                size=14,  # 字体大小
+                color="black"  # 字体颜色
+            ),
+            x=0.5,  # 标题水平居中
+            xanchor="center",
+            pad=dict(
+                t=1  # 标题和图表的间距
+            )
+        ),
+        xaxis=dict(
+            showgrid=False,  # 不显示网格线
+            tickformat="%Y-%m-%d",  # 日期格式化为 年-月-日
+        ),
+        yaxis=dict(
+            showgrid=True  # 显示网格线
+        ),
+        margin=dict(
+            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
+            b=10,
+            l=10,
+            r=10
+        ),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white"  # 设置背景为白色
+    )
+
+    checkpoint("figure")
+    return weekly_wind_chart
+
+
+def build_annual_production_chart(working_set):
+    # 图表 3：年度产量柱状图（纵坐标为年份，横坐标为年度产量）
+    annual_data = working_set.annual
+
+    checkpoint("prepare")
+    annual_production_chart = go.Figure(
+        data=go.Bar(
+            y=annual_data["Year"],  # 纵坐标为年份
+            x=annual_data["Active Energy Exported(kWh)"],  # 横坐标为年度产量
+            orientation="h",  # 将柱状图设置为水平
+            marker_color="#0d3057",  # 图形颜色与图表 2 一致
+            name="Annual Production (kWh)"
+        )
+    )
+    #annual_production_chart.update_layout(title="Annual Production", xaxis_title="Year", yaxis_title="Production (kWh)")
+
+    annual_production_chart.update_layout(
+        title=dict(
+            text="Statistics of Annual Power Production",  # 标题文本
+            font=dict(
+                family="Arial",  # 字体
+                size=14,  # 字体大小
+                color="black"  # 字体颜色
+            ),
+            x=0.5,  # 标题水平居中
+            xanchor="center",
+            pad=dict(
+                t=10  # 标题和图表的间距
+            )
+        ),
+        yaxis=dict(
+            tickmode="linear",  # 仅显示整数年份
+            tick0=annual_data["Year"].min(),  # 起始年份
+            dtick=1  # 每次递增 1
+        ),
+        margin=dict(
+            t=30,  # 图表整体距离顶部的外边距（标题包含在此范围内）
+            b=10,
+            l=10,
+            r=10
+        ),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white"  # 设置背景为白色
+    )
+
+    checkpoint("figure")
+    return annual_production_chart
+
+
+def build_monthly_production_chart(working_set):
+    #图表4风速与功率双Y轴图表
+    # 所选年份的月度产量和平均风速（预聚合查表）
+    monthly_data_combined = working_set.year_monthly[
+        ["Month", "Active Energy Exported(kWh)", "Average wind speed (m/s)"]
+    ].copy()  # 工作集被多个回调共享，复制后再修改
+
+    # 将月份数字转换为英文的前三个字母
+    monthly_data_combined["Month"] = monthly_data_combined["Month"].apply(
+        lambda x: pd.to_datetime(f"2024-{x}-01").strftime("%b")  # 使用 2024 年的任意日期转换月份
+    )
+
+    # 固定月份顺序为 "Jan" 到 "Dec"
+    month_order = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    monthly_data_combined["Month"] = pd.Categorical(monthly_data_combined["Month"], categories=month_order,
+                                                    ordered=True)
+
+    # 绘制柱状图（年度产量）
+    bar_chart = go.Bar(
+        x=monthly_data_combined["Month"],# X 轴为月份
+        y=monthly_data_combined["Active Energy Exported(kWh)"],# Y 轴为年度产量
+        name="Production (kWh)",
+        yaxis="y1",
+        marker_color = "#0d3057",  # 柱体颜色为深蓝色
+        showlegend = False  # 隐藏图例
+    )
+
+    # 绘制折线图（平均风速）
+    line_chart = go.Scatter(
+        x=monthly_data_combined["Month"],# X 轴为月份
+        y=monthly_data_combined["Average wind speed (m/s)"],# Y 轴为平均风速
+        name="Average Wind Speed (m/s)",
+        yaxis="y2",
+        mode="lines+markers",
+        line = dict(color="red", width=2),  # 折线颜色为红色
+        showlegend = False  # 隐藏图例
+    )
+    checkpoint("prepare")
+    combined_chart = go.Figure(data=[bar_chart, line_chart])
+
+    combined_chart.update_layout(
+        title=dict(
+            text="Monthly Production and Wind Speed Variation",  # 标题文本
+            font=dict(
+                family="Arial",  # 字体
+                size=14,  # 字体大小
+                color="black"  # 字体颜色
+            ),
+            x=0.5,  # 标题水平居中
+            xanchor="center",
+            pad=dict(
+                t=30  # 标题和图表的间距
+            )
+        ),
+        xaxis=dict(
+            #title="Month",  # X 轴标题
+            categoryorder="array",  # 按固定顺序排列月份
+            categoryarray=month_order,
+            showgrid = False,  # 取消 X 轴网格线
+
+        ),
+
+        yaxis=dict(
+            # title="Production (kWh)",  # 左侧 Y 轴标题
+            titlefont=dict(color="#0d3057"),  # 左侧 Y 轴标题颜色
+            tickfont=dict(color="#0d3057"), # 左侧 Y 轴刻度颜色
+            showgrid = False  # 取消 Y 轴网格线
+        ),
+        yaxis2=dict(
+            # title="Wind Speed (m/s)",  # 右侧 Y 轴标题
+            titlefont=dict(color="red"),  # 右侧 Y 轴标题颜色
+            tickfont=dict(color="red"),  # 右侧 Y 轴刻度颜色
+            overlaying="y",  # 右侧 Y 轴与左侧 Y 轴重叠
+            side="right",  # 右侧显示
+            showgrid = False  # 取消 Y 轴网格线
+        ),
+        margin=dict(
+            t=20,  # 图表整体距离顶部的外边距（标题包含在此范围内）
+            b=10,
+            l=10,
+            r=10
+        ),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white"  # 设置背景为白色
+    )
+
+    checkpoint("figure")
+    return combined_chart
+
+
+def build_daily_production_chart(working_set):
+    selected_year, selected_month = working_set.year, working_set.month
+    title = "Daily Production and Wind Speed Variation"
+    xaxis = dict(tickformat="%d", dtick="D1")  # 显示日期为日数字，每天一个刻度
+    if working_set.start is not None:
+        # 选择了日期区间：补齐区间内的每一天，标题显示区间合计（前缀和查得）
+        date_range = pd.date_range(start=working_set.start, end=working_set.end, freq="D")
+        totals = working_set.range_totals
+        title += (f" ({working_set.start} – {working_set.end}: "
+                  f"{totals['Active Energy Exported(kWh)']:,.0f} kWh, {totals['Average wind speed (m/s)']:.1f} m/s)")
+        if len(date_range) > 31:  # 较长区间由 Plotly 自动选择刻度
+            xaxis = dict(tickformat="%Y-%m-%d")
+    else:
+        # 生成当前月的完整日期范围
+        start_date = pd.Timestamp(year=selected_year, month=selected_month, day=1)
+        end_date = start_date + pd.offsets.MonthEnd(0)
+        date_range = pd.date_range(start=start_date, end=end_date, freq="D")
+
+    # 电厂日汇总（预聚合查表），随后重新索引至完整日期范围
+    daily_data = working_set.daily[
+        ["Active Energy Exported(kWh)", "Average wind speed (m/s)"]
+    ]
+
+    # 将日期设置为索引并重设索引为完整的日期范围
+    daily_data = daily_data.reindex(date_range).reset_index()
+    daily_data.rename(columns={"index": "Statistical time"}, inplace=True)
+
+    # 填充缺失值为 0
+    daily_data["Active Energy Exported(kWh)"] = daily_data["Active Energy Exported(kWh)"].fillna(0)
+    daily_data["Average wind speed (m/s)"] = daily_data["Average wind speed (m/s)"].fillna(0)
+
+    # 创建图表 5
+    daily_bar_chart = go.Bar(
+        x=daily_data["Statistical time"],  # X 轴为日期
+        y=daily_data["Active Energy Exported(kWh)"],
+        name="Production (kWh)",
+        yaxis="y1",
+        marker_color="#0d3057",  # 柱体颜色为深蓝色
+        showlegend=False  # 隐藏图例
+    )
+    daily_line_chart = go.Scatter(
+        x=daily_data["Statistical time"],  # X 轴为日期
+        y=daily_data["Average wind speed (m/s)"],
+        name="Wind Speed",
+        yaxis="y2",
+        mode="lines+markers",
+        line=dict(color="red"),
+        showlegend=False  # 隐藏图例
+    )
+    checkpoint("prepare")
+    combined_chart2 = go.Figure(data=[daily_bar_chart, daily_line_chart])
+
+    combined_chart2.update_layout(
+        title=dict(
+            text=title,  # 标题文本
+            font=dict(
+                family="Arial",  # 字体
+                size=14,  # 字体大小
+                color="black"  # 字体颜色
+            ),
+            x=0.5,  # 标题水平居中
+            xanchor="center",
+            pad=dict(
+                t=30  # 标题和图表的间距
+            )
+        ),
+        xaxis=dict(
+            #title="",  # 可根据需要添加 X 轴标题
+            showgrid=False,  # 取消 X 轴网格线
+            tickangle=-45,  # 旋转刻度标签，以防止重叠
+            **xaxis
+        ),
+        yaxis=dict(
+            #title="Production (kWh)",
+            titlefont=dict(color="#0d3057"),  # 左侧 Y 轴标题颜色
+            tickfont=dict(color="#0d3057"),  # 左侧 Y 轴刻度颜色
+            showgrid=False  # 取消 Y 轴网格线
+        ),
+        yaxis2=dict(
+            #title="Wind Speed (m/s)",  # 右侧 Y 轴标题
+            titlefont=dict(color="red"),  # 右侧 Y 轴标题颜色
+            tickfont=dict(color="red"),  # 右侧 Y 轴刻度颜色
+            overlaying="y",  # 右侧 Y 轴与左侧 Y 轴重叠
+            side="right",  # 右侧显示
+            showgrid=False  # 取消 Y 轴网格线
+        ),
+        margin=dict(
+            t=50,  # 图表整体距离顶部的外边距（标题包含在此范围内）
+            b=80,
+            l=60,
+            r=60
+        ),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white"  # 设置背景为白色
+    )
+
+    # 返回图表
+    checkpoint("figure")
+    return combined_chart2
+
+
+def build_daily_year_payload(working_set):
+    # 客户端切换月份用：所选年份每天的发电量和风速（与图表 5 相同，补齐日期、缺失为 0）+ 不含数据的图表模板，
+    # 浏览器按月份截取后填入模板（见 assets/daily_chart.js）
+    year = working_set.year
+    date_range = pd.date_range(start=f"{year}-01-01", end=f"{year}-12-31", freq="D")
+    columns = ["Active Energy Exported(kWh)", "Average wind speed (m/s)"]
+    daily_data = working_set.year_daily[columns].reindex(date_range).fillna(0)
+
+    template = build_daily_production_chart(working_set)
+    template.update_traces(x=[], y=[])
+    return {
+        "year": int(year),
+        "x": date_range.strftime("%Y-%m-%d").tolist(),
+        "series": [daily_data[col].tolist() for col in columns],  # 与模板中的曲线顺序一致
+        "figure": template.to_plotly_json(),
+    }
+
+
+# 机队 KPI 热力图最多显示的行数（按排名取前若干个电厂/设备）
+FLEET_HEATMAP_ROWS = 30
+
+
+def build_fleet_table(kpis, kpi, year, month=None, level="plant"):
+    # 机队排名表：按所选 KPI 排名，比例类 KPI 以百分比显示
+    ranked = kpis.ranked(kpi, year, month, level)
+    columns = [{"name": col, "id": col} for col in ranked.columns if col not in KPIS]
+    for name, (label, _) in KPIS.items():
+        column = {"name": label, "id": name, "type": "numeric"}
+        column["format"] = FormatTemplate.percentage(2) if name.endswith("ratio") or name == "availability" \
+            else {"specifier": ".1f"}
+        columns.append(column)
+    return ranked.to_dict("records"), columns
+
+
+def build_fleet_heatmap(kpis, kpi, year, level="plant"):
+    # 电厂（或设备）× 月份的 KPI 热力图，行按全年排名排序
+    matrix, labels = kpis.monthly_matrix(kpi, year, level)
+    ranked = kpis.ranked(kpi, year, None, level).head(FLEET_HEATMAP_ROWS)
+    if level == "device":
+        order = (ranked["Power plant name"].astype(str) + " / " + ranked["Device Name"].astype(str)).tolist()
+    else:
+        order = ranked["Power plant name"].tolist()
+    positions = pd.Index(labels).get_indexer(order)
+    label, higher_is_better = KPIS[kpi]
+
+    heatmap = go.Figure(
+        data=go.Heatmap(
+            z=matrix[positions],
+            x=["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+            y=order,
+            colorscale="RdYlGn",
+            reversescale=not higher_is_better,  # 绿色始终表示较好
+            hoverongaps=False,
+        )
+    )
+    heatmap.update_layout(
+        title=dict(
+            text=f"{label} by Month ({year})",
+            font=dict(family="Arial", size=14, color="black"),
+            x=0.5,
+            xanchor="center",
+        ),
+        yaxis=dict(autorange="reversed"),  # 排名第一的在最上方
+        margin=dict(t=40, b=20, l=10, r=10),
+        plot_bgcolor="white",
+    )
+    return heatmap
+
+
+# 功率曲线图中默认叠加的设备数（表格中未勾选设备时取出力最低的几台）
+POWER_CURVE_DEFAULT_DEVICES = 3
+
+
+def build_power_curve_table(curves, plant, year, month=None):
+    # 设备功率曲线偏差表：出力最低的在前，判定为出力偏低的行标红；行 id 为设备名（供勾选后作图）
+    scores = curves.scores(plant, year, month)
+    add_rows(len(scores))
+    scores.insert(0, "Rank", range(1, len(scores) + 1))
+    scores["id"] = scores["Device Name"]
+    scores["Underperforming"] = scores["Underperforming"].map({True: "Yes", False: ""})
+    columns = [
+        {"name": "Rank", "id": "Rank"},
+        {"name": "Device Name", "id": "Device Name"},
+        {"name": "Days", "id": "Days", "type": "numeric"},
+        {"name": "Actual power (kW)", "id": "Actual power (kW)", "type": "numeric", "format": {"specifier": ".1f"}},
+        {"name": "Expected power (kW)", "id": "Expected power (kW)", "type": "numeric",
+         "format": {"specifier": ".1f"}},
+        {"name": "Deviation", "id": "Deviation", "type": "numeric", "format": FormatTemplate.percentage(1)},
+        {"name": "Underperforming", "id": "Underperforming"},
+    ]
+    checkpoint("prepare")
+    return scores.to_dict("records"), columns
+
+
+def build_power_curve_chart(curves, plant, year, month=None, devices=()):
+    # 电厂参考曲线 + 所选设备在时段内的实测曲线（各风速区间的平均功率）
+    reference = curves.reference_curve(plant)
+    if not devices:
+        scores = curves.scores(plant, year, month)
+        devices = scores["Device Name"].head(POWER_CURVE_DEFAULT_DEVICES).tolist()
+    device_curves = curves.device_curves(plant, list(devices), year, month)
+    checkpoint("prepare")
+
+    chart = go.Figure()
+    chart.add_trace(
+        go.Scatter(
+            x=reference[WIND],
+            y=reference["Reference power (kW)"],
+            mode="lines",
+            name=f"{plant} reference",
+            line=dict(color="#0d3057", width=3),
+            connectgaps=False,
+        )
+    )
+    for device, power in device_curves.items():
+        chart.add_trace(
+            go.Scatter(
+                x=bin_centers(),
+                y=power,
+                mode="lines+markers",
+                name=str(device),
+                line=dict(width=1.5),
+                marker=dict(size=4),
+            )
+        )
+    period = f"{year}-{month:02d}" if month is not None else str(year)
+    chart.update_layout(
+        title=dict(
+            text=f"Power Curve vs. Plant Reference ({period})",
+            font=dict(family="Arial", size=14, color="black"),
+            x=0.5,
+            xanchor="center",
+        ),
+        xaxis=dict(title="Wind speed (m/s)", showgrid=False),
+        yaxis=dict(title="Average power (kW)", showgrid=False),
+        margin=dict(t=40, b=20, l=10, r=10),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.15),
+        plot_bgcolor="white",
+    )
+    checkpoint("figure")
+    return chart
+
+
+def build_wind_device_table(histograms, plant, year, month=None):
+    # 设备风速分布表：每台设备的样本数、均值、P10/P50/P90 和 Weibull 参数
+    summary = histograms.device_summary(plant, year, month)
+    add_rows(len(summary))
+    columns = [{"name": "Device Name", "id": "Device Name"}, {"name": "Samples", "id": "Samples", "type": "numeric"}]
+    columns += [{"name": col, "id": col, "type": "numeric", "format": {"specifier": ".2f"}}
+                for col in SUMMARY_COLUMNS[1:]]
+    checkpoint("prepare")
+    return summary.to_dict("records"), columns
+
+
+def build_wind_distribution_chart(histograms, plant, year, month=None):
+    # 电厂风速分布：各区间的样本占比 + 拟合的 Weibull 分布
+    counts = histograms.histogram(plant, year, month)
+    stats = summarize(counts).iloc[0]
+    total = counts.sum()
+    frequency = counts / total * 100 if total else counts
+    weibull = weibull_bin_probabilities(stats["Weibull k"], stats["Weibull c (m/s)"]) * 100
+    centers = bin_centers()
+    checkpoint("prepare")
+
+    chart = go.Figure()
+    chart.add_trace(go.Bar(x=centers, y=frequency, name="Observed", marker_color="#0d3057"))
+    chart.add_trace(
+        go.Scatter(
+            x=centers,
+            y=weibull,
+            mode="lines",
+            name=f"Weibull k={stats['Weibull k']:.2f}, c={stats['Weibull c (m/s)']:.2f} m/s",
+            line=dict(color="red"),
+        )
+    )
+    period = f"{year}-{month:02d}" if month is not None else str(year)
+    percentiles = ", ".join(f"P{q} {stats[f'P{q} (m/s)']:.1f}" for q in PERCENTILES)
+    chart.update_layout(
+        title=dict(
+            text=f"Wind Speed Distribution ({period}): {percentiles} m/s",
+            font=dict(family="Arial", size=14, color="black"),
+            x=0.5,
+            xanchor="center",
+        ),
+        xaxis=dict(title="Wind speed (m/s)", showgrid=False),
+        yaxis=dict(title="Frequency (%)", showgrid=False),
+        bargap=0.05,
+        margin=dict(t=40, b=20, l=10, r=10),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white",
+    )
+    checkpoint("figure")
+    return chart
+
+
+def build_wind_percentile_chart(histograms, plant, year):
+    # 所选年份各月的 P10–P90 区间、P50 和平均风速
+    monthly = histograms.monthly_summary(plant, year)
+    months = pd.date_range(f"{year}-01-01", periods=12, freq="MS")
+    checkpoint("prepare")
+
+    chart = go.Figure()
+    chart.add_trace(go.Scatter(x=months, y=monthly["P90 (m/s)"], mode="lines", name="P90",
+                               line=dict(color="#9dc3e6", width=1)))
+    chart.add_trace(go.Scatter(x=months, y=monthly["P10 (m/s)"], mode="lines", name="P10",
+                               line=dict(color="#9dc3e6", width=1), fill="tonexty", fillcolor="rgba(157,195,230,0.3)"))
+    chart.add_trace(go.Scatter(x=months, y=monthly["P50 (m/s)"], mode="lines+markers", name="P50",
+                               line=dict(color="#0d3057")))
+    chart.add_trace(go.Scatter(x=months, y=monthly["Mean (m/s)"], mode="lines", name="Mean",
+                               line=dict(color="red", dash="dot")))
+    chart.update_layout(
+        title=dict(
+            text=f"Monthly Wind Speed Percentiles ({year})",
+            font=dict(family="Arial", size=14, color="black"),
+            x=0.5,
+            xanchor="center",
+        ),
+        xaxis=dict(showgrid=False, tickformat="%b", dtick="M1"),
+        yaxis=dict(title="Wind speed (m/s)", showgrid=False),
+        margin=dict(t=40, b=20, l=10, r=10),
+        legend=dict(orientation="h", x=0.5, xanchor="center", y=-0.2),
+        plot_bgcolor="white",
+    )
+    checkpoint("figure")
+    return chart
@@ -0,0 +1,18 @@
+# gunicorn 配置：gunicorn -c gunicorn.conf.py wsgi:application
+# 工作进程数和线程数可通过环境变量调整（gunicorn 依赖 fork，仅支持 Linux/macOS）
+import os
+
+bind = os.environ.get("DASH_BIND", "0.0.0.0:8051")
+workers = int(os.environ.get("DASH_WORKERS", os.cpu_count() or 1))
+threads = int(os.environ.get("DASH_THREADS", 4))
+worker_class = "gthread"
+# 在主进程中加载应用（和数据），工作进程 fork 后共享（DASH_BACKGROUND_LOAD=1 时数据改为在各工作进程中加载）
+preload_app = True
+# 首次请求可能需要计算工作集和图表
+timeout = 120
+
+
+def post_fork(server, worker):
+    import wsgi
+
+    wsgi.start_worker()
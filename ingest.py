@@ -0,0 +1,94 @@
+# 增量数据接入：后台线程监视工作簿和投递目录，只把新数据追加到快照并原子替换，无需重启服务
+import glob
+import logging
+import os
+import threading
+
+import pandas as pd  # 数据处理
+
+from data_loader import clean_production_statistics, expand_sources, load_source
+
+logger = logging.getLogger(__name__)
+
+# 投递目录中可识别的文件类型
+DROP_PATTERNS = ("*.xlsx", "*.csv")
+
+
+def read_drop_file(path, sheet_name="Production statistics"):
+    # 投递文件：与主工作簿相同的列结构（Excel 或 CSV）
+    if path.lower().endswith(".csv"):
+        raw = pd.read_csv(path)
+    else:
+        raw = pd.read_excel(path, sheet_name=sheet_name)
+    return clean_production_statistics(raw)
+
+
+class WorkbookWatcher(threading.Thread):
+    def __init__(self, store, sources, drop_dir=None, interval=60, sheet_name="Production statistics"):
+        super().__init__(name="workbook-watcher", daemon=True)
+        self.store = store
+        self.sources = sources  # 与启动加载相同的数据源配置（通配符每次轮询重新展开）
+        self.sheet_name = sheet_name
+        self.drop_dir = drop_dir
+        self.interval = interval
+        self._stop_event = threading.Event()
+        # 文件 -> (大小, 修改时间)；启动时已加载的工作簿不再重复读取
+        self._seen = {}
+        for source in expand_sources(sources, sheet_name):
+            if os.path.exists(source["path"]):
+                self._seen[source["path"]] = self._stat(source["path"])
+
+    @staticmethod
+    def _stat(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _changed_files(self):
+        # 返回 [(路径, 数据源配置或 None（投递文件）, 文件状态)]
+        candidates = [(source["path"], source) for source in expand_sources(self.sources, self.sheet_name)]
+        if self.drop_dir:
+            for pattern in DROP_PATTERNS:
+                candidates.extend((path, None) for path in sorted(glob.glob(os.path.join(self.drop_dir, pattern))))
+        changed = []
+        for path, source in candidates:
+            try:
+                stat = self._stat(path)
+            except OSError:
+                continue
+            if self._seen.get(path) != stat:
+                changed.append((path, source, stat))
+        return changed
+
+    def poll(self):
+        # 检查一次变化；返回是否替换了快照
+        # 变化的工作簿整体重新哈希和解析（与启动加载相同），旧行在快照的 append 中过滤
+        batches = []
+        for path, source, stat in self._changed_files():
+            try:
+                if source is not None:
+                    batches.append((load_source(source), source))
+                else:
+                    batches.append((read_drop_file(path, self.sheet_name), None))
+            except Exception:  # 单个文件读取失败不影响服务，下次轮询重试
+                logger.exception("Failed to ingest %s", path)
+                continue
+            self._seen[path] = stat
+        if not batches:
+            return False
+
+        # 逐个文件追加（SQLite 后端按工作簿记录新行的来源和工作簿版本），全部追加后替换一次快照
+        current = snapshot = self.store.current()
+        for new_rows, source in batches:
+            snapshot = snapshot.append(new_rows, source)
+        if snapshot is current:
+            return False
+        self.store.swap(snapshot)
+        logger.info("Data snapshot %s -> %s (max time %s)", current.version, snapshot.version, snapshot.max_time)
+        return True
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop_event.set()
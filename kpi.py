@@ -0,0 +1,115 @@
+# 机队 KPI：从设备日汇总一次分组得到 (电厂, 年, 月, 设备) 的可加量，
+# 任意时段、电厂级或设备级的 KPI 都由这些求和结果向量化计算（无逐电厂循环）
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+# KPI：名称 -> (显示名称, 数值越大越好)
+KPIS = {
+    "curtailment_loss_ratio": ("Curtailment loss ratio", False),
+    "fault_loss_ratio": ("Fault loss ratio", False),
+    "availability": ("Time-based availability", True),
+    "utilization_hours": ("Equivalent utilization hours (h)", True),
+}
+# 计算 KPI 所需的可加量
+KPI_INPUTS = {
+    "exported": "Active Energy Exported(kWh)",
+    "curtailment_loss": "Loss due to curtailment (kWh)",
+    "fault_loss": "Loss due to fault (kWh)",
+    "production_time": "Energy production time (h)",
+    "fault_time": "Fault duration (h)",
+    "utilization": "Equivalent Utilization Hours (H)",
+}
+MONTHS = 12
+
+
+def compute_kpis(sums, devices):
+    # sums：KPI_INPUTS 各量的求和数组（任意形状）；devices：对应的设备数（利用小时按台平均）
+    with np.errstate(invalid="ignore", divide="ignore"):
+        potential = sums["exported"] + sums["curtailment_loss"] + sums["fault_loss"]
+        return {
+            # 损失占理论发电量（实发 + 限电损失 + 故障损失）的比例
+            "curtailment_loss_ratio": sums["curtailment_loss"] / potential,
+            "fault_loss_ratio": sums["fault_loss"] / potential,
+            # 时间可利用率：发电时间 / (发电时间 + 故障时间)
+            "availability": sums["production_time"] / (sums["production_time"] + sums["fault_time"]),
+            "utilization_hours": sums["utilization"] / devices,
+        }
+
+
+class FleetKpis:
+    def __init__(self, rollups):
+        # 设备月可加量由存储后端提供（内存预聚合或 SQLite 聚合查询）
+        (self.plant, year, month, self.device), sums = rollups.device_month_sums()
+        self.year = np.asarray(year).astype(np.int64)
+        self.month = np.asarray(month).astype(np.int64)
+        self.sums = {name: np.asarray(sums[col], dtype=np.float64) for name, col in KPI_INPUTS.items()}
+        # 实体编码：电厂，以及 (电厂, 设备)；无设备名的行只计入电厂（设备编码为 -1）
+        self.has_device = pd.notna(self.device)
+        self.plant_codes, self.plant_labels = pd.factorize(self.plant)
+        self.device_codes = np.full(len(self.plant), -1, dtype=np.int64)
+        codes, labels = pd.factorize(pd.MultiIndex.from_arrays([self.plant[self.has_device],
+                                                                 self.device[self.has_device]]))
+        self.device_codes[self.has_device] = codes
+        self.device_labels = labels.to_frame(index=False, name=["Power plant name", "Device Name"])
+        # 每台设备所属电厂的编码
+        self.device_plant = pd.Index(self.plant_labels).get_indexer(self.device_labels["Power plant name"])
+
+    def _entities(self, level):
+        if level == "device":
+            return self.device_codes, len(self.device_labels), self.has_device
+        return self.plant_codes, len(self.plant_labels), np.ones(len(self.plant), dtype=bool)
+
+    def _grouped(self, mask, codes, size, level):
+        # 按实体编码求和，并统计每个实体的设备数（利用小时按台平均）
+        sums = {name: np.bincount(codes[mask], weights=values[mask], minlength=size)
+                for name, values in self.sums.items()}
+        rows = np.bincount(codes[mask], minlength=size)
+        if level == "device":
+            devices = (rows > 0).astype(np.float64)
+        else:
+            devices = np.bincount(self.device_plant[np.unique(self.device_codes[mask & self.has_device])],
+                                  minlength=size).astype(np.float64)
+        return sums, devices, rows
+
+    def table(self, year, month=None, level="plant"):
+        # 时段内每个电厂（或设备）的 KPI；month=None 表示全年
+        codes, size, valid = self._entities(level)
+        mask = valid & (self.year == year)
+        if month is not None:
+            mask &= self.month == month
+        sums, devices, rows = self._grouped(mask, codes, size, level)
+        if level == "device":
+            frame = self.device_labels.copy()
+        else:
+            frame = pd.DataFrame({"Power plant name": self.plant_labels})
+        for name, values in compute_kpis(sums, devices).items():
+            frame[name] = values
+        return frame[rows > 0].reset_index(drop=True)
+
+    def ranked(self, kpi, year, month=None, level="plant"):
+        # 按 KPI 排名（1 为最好），缺失值排在最后
+        frame = self.table(year, month, level)
+        higher_is_better = KPIS[kpi][1]
+        frame = frame.sort_values(kpi, ascending=not higher_is_better, kind="mergesort", na_position="last")
+        frame.insert(0, "Rank", np.arange(1, len(frame) + 1))
+        return frame.reset_index(drop=True)
+
+    def monthly_matrix(self, kpi, year, level="plant"):
+        # 热力图：实体 × 12 个月的 KPI 矩阵（无数据的月份为 NaN），返回 (矩阵, 实体标签)
+        codes, size, valid = self._entities(level)
+        mask = valid & (self.year == year)
+        cells = codes[mask] * MONTHS + (self.month[mask] - 1)
+        sums = {name: np.bincount(cells, weights=values[mask], minlength=size * MONTHS).reshape(size, MONTHS)
+                for name, values in self.sums.items()}
+        # 每个设备月一行，单元格内有设备名的行数即设备数
+        rows = np.bincount(cells, minlength=size * MONTHS).reshape(size, MONTHS)
+        devices = np.bincount(cells, weights=self.has_device[mask], minlength=size * MONTHS).reshape(size, MONTHS)
+        matrix = compute_kpis(sums, devices)[kpi]
+        matrix[rows == 0] = np.nan
+        present = rows.sum(axis=1) > 0
+        if level == "device":
+            labels = (self.device_labels["Power plant name"].astype(str) + " / "
+                      + self.device_labels["Device Name"].astype(str)).to_numpy()
+        else:
+            labels = np.asarray(self.plant_labels, dtype=object)
+        return matrix[present], labels[present]
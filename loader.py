@@ -0,0 +1,138 @@
+# 数据加载状态：快照容器 + 后台加载线程 + 启动耗时统计
+# 本模块只依赖标准库和 Flask：服务先启动并响应请求，pandas 等重量级模块在加载线程中才导入
+import importlib
+import logging
+import threading
+import time
+
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    def __init__(self, snapshot=None):
+        self._snapshot = snapshot
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def current(self):
+        # 读取无需加锁：引用赋值是原子的，读者要么拿到旧快照要么拿到新快照；数据加载完成前为 None
+        return self._snapshot
+
+    def swap(self, snapshot):
+        with self._lock:
+            self._snapshot = snapshot
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(snapshot)
+
+    def subscribe(self, listener):
+        # 快照替换后的通知（例如清空图表缓存）
+        with self._lock:
+            self._listeners.append(listener)
+
+
+def build_snapshot(config):
+    # 按配置加载数据并构建快照，返回 (快照, 失败列表)
+    if config["storage_backend"] == "sqlite":
+        from sqlite_store import open_sqlite_snapshot
+
+        # 只写入新增或变化的工作簿；快照的查询直接在数据库上执行
+        return open_sqlite_snapshot(config["data_sources"], config["sqlite_path"])
+
+    from data_loader import load_sources
+    from snapshot import DataSnapshot
+
+    # 读取 Excel 文件并清洗（工作簿未变化时直接读取列式缓存；多个工作簿并行加载）
+    df, failures = load_sources(config["data_sources"], config["ingest_workers"])
+    # 按 (电厂, 年, 月) 的分区索引 + 一次性预聚合（设备日、电厂日、周、月、年）
+    return DataSnapshot.from_frame(df, df.attrs["data_version"], config["compact_data"]), failures
+
+
+class DataLoader:
+    # 加载数据并放入 SnapshotStore；start() 在后台线程中加载，run() 在当前线程中加载
+    def __init__(self, store, config, started=None):
+        self.store = store
+        self.config = config
+        self.started = time.perf_counter() if started is None else started  # 导入开始时刻
+        self.status = "pending"  # pending -> loading -> ready / failed
+        self.error = None
+        self.load_failures = []
+        self.load_seconds = None
+        self.ready_after = None  # 导入开始到数据就绪（秒）
+        self.first_byte_after = None  # 导入开始到第一个响应（秒）
+        self._thread = None
+
+    def start(self, watch=False):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.run, args=(watch,), name="data-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def run(self, watch=False):
+        self.status = "loading"
+        start = time.perf_counter()
+        try:
+            snapshot, self.load_failures = build_snapshot(self.config)
+            # 图表模块（plotly）在此预先导入，第一个回调不再承担导入耗时
+            importlib.import_module("figures")
+        except Exception as exc:  # 加载失败时服务保持运行，/readyz 和页面显示错误
+            logger.exception("Data loading failed")
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.status = "failed"
+            return
+        self.store.swap(snapshot)
+        now = time.perf_counter()
+        self.load_seconds = now - start
+        self.ready_after = now - self.started
+        self.status = "ready"
+        logger.info("Data snapshot %s ready in %.1f s (%.1f s after import)", snapshot.version,
+                    self.load_seconds, self.ready_after)
+        if watch:
+            self.start_watcher()
+
+    def start_watcher(self):
+        # 后台监视工作簿/投递目录，新数据到达时替换快照
+        config = self.config
+        if config["refresh_interval_s"]:
+            from ingest import WorkbookWatcher
+
+            WorkbookWatcher(self.store, config["data_sources"], config["drop_dir"], config["refresh_interval_s"],
+                            config["sheet_name"]).start()
+
+    @property
+    def ready(self):
+        return self.status == "ready"
+
+    def report(self):
+        snapshot = self.store.current()
+        return {
+            "status": self.status,
+            "error": self.error,
+            "data_version": snapshot.version if snapshot is not None else None,
+            "load_failures": [{"path": path, "error": error} for path, error in self.load_failures],
+            "load_s": self.load_seconds,
+            "import_to_ready_s": self.ready_after,
+            "import_to_first_byte_s": self.first_byte_after,
+        }
+
+    def _after_request(self, response):
+        if self.first_byte_after is None:
+            self.first_byte_after = time.perf_counter() - self.started
+            logger.info("First response %.3f s after import", self.first_byte_after)
+        return response
+
+    def register(self, server):
+        # /healthz：进程存活即返回 200；/readyz：数据就绪返回 200，加载中或失败返回 503
+        server.after_request(self._after_request)
+
+        @server.route("/healthz")
+        def healthz():
+            return {"status": "ok"}
+
+        @server.route("/readyz")
+        def readyz():
+            return jsonify(self.report()), 200 if self.ready else 503
+
+        return healthz, readyz
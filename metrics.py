@@ -0,0 +1,211 @@
+# 回调埋点：每个 Dash 回调的分阶段耗时、扫描行数、返回数据大小和缓存命中，汇总为延迟直方图，
+# 通过 /metrics 以 Prometheus 文本格式输出；可选记录超过阈值的慢回调
+# 多进程部署时每个工作进程各自统计（/metrics 返回处理该请求的进程的数据）
+import bisect
+import functools
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from dash.dependencies import Output
+from dash.exceptions import PreventUpdate
+from flask import Response, g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# 直方图分桶：耗时（秒）和数据大小（字节）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PAYLOAD_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Dash 回调请求的路径后缀
+DASH_UPDATE_PATH = "_dash-update-component"
+
+_local = threading.local()
+
+
+class _CallbackContext:
+    # 一次回调调用中的计时状态（线程本地）
+    def __init__(self, name):
+        self.name = name
+        self.start = self.last = time.perf_counter()
+        self.stages = []  # [(阶段, 秒)]
+        self.rows = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.elapsed = 0.0
+
+
+def checkpoint(stage):
+    # 记录从回调开始（或上一个阶段结束）到现在的耗时，归入 stage；不在回调中时不做任何事
+    context = getattr(_local, "context", None)
+    if context is not None:
+        now = time.perf_counter()
+        context.stages.append((stage, now - context.last))
+        context.last = now
+
+
+def add_rows(count):
+    # 当前回调扫描的行数
+    context = getattr(_local, "context", None)
+    if context is not None:
+        context.rows += count
+
+
+def cache_result(hit):
+    # 当前回调的结果缓存是否命中
+    context = getattr(_local, "context", None)
+    if context is not None:
+        if hit:
+            context.cache_hits += 1
+        else:
+            context.cache_misses += 1
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最后一个为 +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+def _labels(pairs):
+    return ",".join(f'{name}="{str(value)}"' for name, value in pairs)
+
+
+def callback_name(args):
+    # 回调名称取第一个输出，例如 "monthly-wind-chart.figure"
+    for arg in args:
+        for item in arg if isinstance(arg, (list, tuple)) else [arg]:
+            if isinstance(item, Output):
+                return f"{item.component_id}.{item.component_property}"
+    return "unknown"
+
+
+class CallbackMetrics:
+    def __init__(self, slow_ms=None):
+        self.slow_ms = slow_ms  # 超过该耗时（含序列化）的回调写入慢日志；None 表示不记录
+        self._lock = threading.Lock()
+        self._histograms = {}  # (指标名, 标签) -> Histogram
+        self._counters = defaultdict(float)  # (指标名, 标签) -> 计数
+
+    def _observe(self, metric, labels, value, buckets=LATENCY_BUCKETS):
+        histogram = self._histograms.get((metric, labels))
+        if histogram is None:
+            histogram = self._histograms.setdefault((metric, labels), Histogram(buckets))
+        histogram.observe(value)
+
+    def _finish(self, context, outcome):
+        callback = (("callback", context.name),)
+        with self._lock:
+            self._counters[("dash_callback_calls_total", callback + (("outcome", outcome),))] += 1
+            self._observe("dash_callback_duration_seconds", callback, context.elapsed)
+            for stage, seconds in context.stages:
+                self._observe("dash_callback_stage_duration_seconds", callback + (("stage", stage),), seconds)
+            self._counters[("dash_callback_rows_scanned_total", callback)] += context.rows
+            if context.cache_hits:
+                self._counters[("dash_callback_cache_total", callback + (("result", "hit"),))] += context.cache_hits
+            if context.cache_misses:
+                self._counters[("dash_callback_cache_total", callback + (("result", "miss"),))] += \
+                    context.cache_misses
+
+    def instrument(self, name):
+        # 装饰回调函数：记录总耗时和各阶段耗时；请求结束时再补充序列化耗时和返回大小
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                context = _CallbackContext(name)
+                outer, _local.context = getattr(_local, "context", None), context
+                outcome = "ok"
+                try:
+                    return func(*args, **kwargs)
+                except PreventUpdate:
+                    outcome = "prevented"
+                    raise
+                except Exception:
+                    outcome = "error"
+                    raise
+                finally:
+                    _local.context = outer
+                    context.elapsed = time.perf_counter() - context.start
+                    if context.last < context.start + context.elapsed:
+                        context.stages.append(("other", context.start + context.elapsed - context.last))
+                    self._finish(context, outcome)
+                    if has_request_context():
+                        g.dash_callback_context = context
+            return wrapper
+        return decorator
+
+    def instrument_callbacks(self, app):
+        # 替换 app.callback：之后注册的所有回调自动埋点（需在定义回调之前调用）
+        register = app.callback
+
+        def callback(*args, **kwargs):
+            decorator = register(*args, **kwargs)
+            name = callback_name(list(args) + list(kwargs.values()))
+            return lambda func: decorator(self.instrument(name)(func))
+
+        app.callback = callback
+
+    def _before_request(self):
+        if request.path.endswith(DASH_UPDATE_PATH):
+            g.dash_request_start = time.perf_counter()
+
+    def _after_request(self, response):
+        start = g.pop("dash_request_start", None)
+        context = g.pop("dash_callback_context", None)
+        if start is None or context is None:
+            return response
+        total = time.perf_counter() - start
+        payload = 0 if response.is_streamed else len(response.get_data())
+        callback = (("callback", context.name),)
+        # 请求总耗时减去回调耗时：请求解析 + 结果 JSON 序列化
+        serialize = max(0.0, total - context.elapsed)
+        with self._lock:
+            self._observe("dash_request_duration_seconds", callback, total)
+            self._observe("dash_callback_stage_duration_seconds", callback + (("stage", "serialize"),), serialize)
+            self._observe("dash_callback_payload_bytes", callback, payload, PAYLOAD_BUCKETS)
+        if self.slow_ms is not None and 1000 * total >= self.slow_ms:
+            stages = ", ".join(f"{stage}={1000 * seconds:.1f}ms"
+                               for stage, seconds in context.stages + [("serialize", serialize)])
+            logger.warning("slow callback %s: %.1f ms (%s) rows=%d payload=%d bytes cache_hits=%d",
+                           context.name, 1000 * total, stages, context.rows, payload, context.cache_hits)
+        return response
+
+    def render(self):
+        # Prometheus 文本格式
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+        current = None
+        for (metric, labels), histogram in histograms:
+            if metric != current:
+                lines.append(f"# TYPE {metric} histogram")
+                current = metric
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                cumulative += count
+                lines.append(f"{metric}_bucket{{{_labels(labels + (('le', bound),))}}} {cumulative}")
+            lines.append(f"{metric}_sum{{{_labels(labels)}}} {histogram.sum}")
+            lines.append(f"{metric}_count{{{_labels(labels)}}} {cumulative}")
+        for (metric, labels), value in counters:
+            if metric != current:
+                lines.append(f"# TYPE {metric} counter")
+                current = metric
+            lines.append(f"{metric}{{{_labels(labels)}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def register(self, server):
+        # 在 Flask 服务上挂接请求钩子和 /metrics 端点
+        server.before_request(self._before_request)
+        server.after_request(self._after_request)
+
+        @server.route("/metrics")
+        def metrics():
+            return Response(self.render(), mimetype="text/plain; version=0.0.4")
+
+        return metrics
@@ -0,0 +1,177 @@
+# 功率曲线：设备日平均功率（上网电量 / 发电时间，kW）按日平均风速分箱，
+# 汇总为 (设备, 年月, 风速区间) 的样本数和功率和；电厂参考曲线 = 该电厂全部设备在各区间的平均功率，
+# 设备某时段的偏差 = 实际平均功率 / 按其风速分布在参考曲线上的期望功率 - 1（负值表示出力偏低）
+# 所有设备在一次分组求和（np.unique + bincount）中完成，新数据到达时只汇总新增的设备日再与现有结果合并
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+WIND, EXPORTED, PRODUCTION_TIME = "Average wind speed (m/s)", "Active Energy Exported(kWh)", "Energy production time (h)"
+# 风速分箱：0.5 m/s 一档（IEC 61400-12 的常用宽度），超出 MAX_WIND 的样本不参与统计
+BIN_WIDTH = 0.5
+MAX_WIND = 30.0
+N_BINS = int(MAX_WIND / BIN_WIDTH)
+# 参考曲线中样本少于该数的区间视为无参考值，落在这些区间的样本不参与评分
+MIN_BIN_SAMPLES = 10
+# 有效天数不少于 MIN_DAYS 且偏差低于阈值的设备时段判定为出力偏低
+MIN_DAYS = 5
+UNDERPERFORMANCE_THRESHOLD = -0.1
+# 组合键的位宽：设备编码 | 年月序号 | 风速区间
+PERIOD_BITS, BIN_BITS = 24, 8
+
+
+def bin_edges():
+    return np.arange(N_BINS + 1) * BIN_WIDTH
+
+
+def bin_centers():
+    return (np.arange(N_BINS) + 0.5) * BIN_WIDTH
+
+
+def wind_bins(wind):
+    # 风速 → 区间编号；负值、缺失值和不低于 MAX_WIND 的风速返回 -1（功率曲线和风速分布都不计入这些样本）
+    wind = np.asarray(wind, dtype=np.float64)
+    bins = np.full(len(wind), -1, dtype=np.int64)
+    valid = (wind >= 0) & (wind < MAX_WIND)
+    bins[valid] = np.minimum((wind[valid] / BIN_WIDTH).astype(np.int64), N_BINS - 1)
+    return bins
+
+
+def encode_devices(plant, device, plants=None, devices=None):
+    # (电厂, 设备) 标签 → 设备编码，返回 (电厂, 设备, 编码)；沿用已有标签，新设备追加在后面（已有编码不变）
+    pairs = pd.MultiIndex.from_arrays([plant, device], names=["Power plant name", "Device Name"])
+    if devices is None:
+        # 由两级的分类编码组合为整数后去重（避免逐行构造元组）
+        width = len(pairs.levels[1])
+        unique, codes = np.unique(pairs.codes[0].astype(np.int64) * width + pairs.codes[1], return_inverse=True)
+        devices = pd.MultiIndex.from_arrays([pairs.levels[0][unique // width], pairs.levels[1][unique % width]],
+                                            names=pairs.names)
+    else:
+        new = pairs.unique().difference(devices, sort=False)
+        devices = devices.append(new) if len(new) else devices
+        codes = devices.get_indexer(pairs)
+    device_plants = pd.Index(pd.unique(devices.get_level_values(0)))
+    plants = device_plants if plants is None else plants.append(device_plants.difference(plants, sort=False))
+    return plants, devices, codes
+
+
+def _period(year, month):
+    return np.asarray(year, dtype=np.int64) * 12 + np.asarray(month, dtype=np.int64) - 1
+
+
+class PowerCurves:
+    # 状态只有设备标签和 (设备, 年月, 区间) 三元组的样本数、功率和，可直接相加合并；参考曲线和评分由三元组计算
+    def __init__(self, plants, devices, keys, counts, power):
+        self.plants = plants  # pd.Index：电厂
+        self.devices = devices  # pd.MultiIndex：(电厂, 设备)
+        self.device_plant = plants.get_indexer(devices.get_level_values(0))
+        self.keys, self.counts, self.power = keys, counts, power  # 按组合键排序
+        self.device = keys >> (PERIOD_BITS + BIN_BITS)
+        self.period = (keys >> BIN_BITS) & ((1 << PERIOD_BITS) - 1)
+        self.bin = keys & ((1 << BIN_BITS) - 1)
+        self.plant = self.device_plant[self.device]
+
+        # 电厂参考曲线：电厂 × 区间的平均功率
+        cells = self.plant * N_BINS + self.bin
+        size = len(plants) * N_BINS
+        self.reference_samples = np.bincount(cells, weights=counts, minlength=size).reshape(len(plants), N_BINS)
+        reference_power = np.bincount(cells, weights=power, minlength=size).reshape(len(plants), N_BINS)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.reference = np.where(self.reference_samples >= MIN_BIN_SAMPLES,
+                                      reference_power / self.reference_samples, np.nan)
+
+        # 每个三元组按参考曲线的期望功率和；无参考值的区间不计入实际值和期望值
+        expected = counts * self.reference[self.plant, self.bin]
+        scored = np.isfinite(expected)
+        self.scored_counts = np.where(scored, counts, 0.0)
+        self.scored_power = np.where(scored, power, 0.0)
+        self.expected = np.where(scored, expected, 0.0)
+
+    @classmethod
+    def from_days(cls, days, plants=None, devices=None):
+        # days：设备日数组 {"Power plant name", "Year", "Month", "Device Name", 风速, 上网电量, 发电时间}
+        plant, device = np.asarray(days["Power plant name"], dtype=object), np.asarray(days["Device Name"], dtype=object)
+        bins = wind_bins(days[WIND])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            power = np.asarray(days[EXPORTED], dtype=np.float64) / np.asarray(days[PRODUCTION_TIME], dtype=np.float64)
+        # 有效样本：有设备名、风速在范围内、发电时间大于 0（停机日的出力问题由可利用率反映）
+        valid = pd.notna(device) & (bins >= 0) & np.isfinite(power)
+        plant, device, bins, power = plant[valid], device[valid], bins[valid], power[valid]
+        period = _period(np.asarray(days["Year"])[valid], np.asarray(days["Month"])[valid])
+
+        # 设备编码：沿用已有标签，新设备追加在后面（已有三元组的编码不变）
+        plants, devices, codes = encode_devices(plant, device, plants, devices)
+
+        keys = (codes.astype(np.int64) << (PERIOD_BITS + BIN_BITS)) | (period << BIN_BITS) | bins
+        keys, counts, sums = cls._reduce(keys, np.ones(len(keys)), power)
+        return cls(plants, devices, keys, counts, sums)
+
+    @staticmethod
+    def _reduce(keys, counts, power):
+        # 相同组合键的样本数、功率和相加（结果按键排序）
+        keys, inverse = np.unique(keys, return_inverse=True)
+        return keys, np.bincount(inverse, weights=counts, minlength=len(keys)), \
+            np.bincount(inverse, weights=power, minlength=len(keys))
+
+    def extend(self, days):
+        # 增量更新：只对新增的设备日分箱，与现有三元组合并后重新计算参考曲线（数据按整日追加）
+        added = PowerCurves.from_days(days, self.plants, self.devices)
+        keys, counts, power = self._reduce(np.concatenate([self.keys, added.keys]),
+                                           np.concatenate([self.counts, added.counts]),
+                                           np.concatenate([self.power, added.power]))
+        return PowerCurves(added.plants, added.devices, keys, counts, power)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.counts.nbytes + self.power.nbytes
+
+    def _mask(self, plant, year, month=None):
+        # 指定电厂、年份（和月份）的三元组
+        plant_code = self.plants.get_indexer([plant])[0]
+        if month is None:
+            period = self.period // 12 == year
+        else:
+            period = self.period == _period(year, month)
+        return (self.plant == plant_code) & period
+
+    def reference_curve(self, plant):
+        # 电厂参考曲线：区间中心风速、平均功率、样本数
+        plant_code = self.plants.get_indexer([plant])[0]
+        samples = self.reference_samples[plant_code] if plant_code >= 0 else np.zeros(N_BINS)
+        reference = self.reference[plant_code] if plant_code >= 0 else np.full(N_BINS, np.nan)
+        return pd.DataFrame({WIND: bin_centers(), "Reference power (kW)": reference, "Samples": samples})
+
+    def scores(self, plant, year, month=None):
+        # 时段内每台设备的实际/期望平均功率和偏差，按偏差升序（出力最低的在前）
+        mask = self._mask(plant, year, month)
+        codes = self.device[mask]
+        size = len(self.devices)
+        days = np.bincount(codes, weights=self.scored_counts[mask], minlength=size)
+        actual = np.bincount(codes, weights=self.scored_power[mask], minlength=size)
+        expected = np.bincount(codes, weights=self.expected[mask], minlength=size)
+        present = np.bincount(codes, minlength=size) > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            frame = pd.DataFrame({
+                "Device Name": self.devices.get_level_values(1),
+                "Days": days,
+                "Actual power (kW)": actual / days,
+                "Expected power (kW)": expected / days,
+                "Deviation": actual / expected - 1,
+            })
+        frame["Underperforming"] = (frame["Days"] >= MIN_DAYS) & (frame["Deviation"] < UNDERPERFORMANCE_THRESHOLD)
+        frame = frame[present].sort_values("Deviation", kind="mergesort", na_position="last")
+        return frame.reset_index(drop=True)
+
+    def device_curves(self, plant, devices, year, month=None):
+        # 所选设备在时段内各区间的平均功率：{设备: 数组}
+        mask = self._mask(plant, year, month)
+        curves = {}
+        codes = self.devices.get_indexer(pd.MultiIndex.from_arrays([[plant] * len(devices), list(devices)]))
+        for device, code in zip(devices, codes):
+            if code < 0:  # 不属于该电厂的设备（如切换电厂前勾选的设备）
+                continue
+            selected = mask & (self.device == code)
+            counts = np.bincount(self.bin[selected], weights=self.counts[selected], minlength=N_BINS)
+            power = np.bincount(self.bin[selected], weights=self.power[selected], minlength=N_BINS)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                curves[device] = np.where(counts > 0, power / counts, np.nan)
+        return curves
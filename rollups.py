@@ -0,0 +1,302 @@
+# 预聚合立方体：加载时一次性计算所有电厂在各个时间粒度上的汇总，回调只做查表和作图
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+from compact import measure_values
+from data_index import partition_spans
+from data_loader import columns_to_numeric
+
+# 按均值汇总的列（其余变量按求和汇总）
+MEAN_COLUMNS = ["Average ambient temperature (°C)", "Average wind speed (m/s)"]
+SUM_COLUMNS = [col for col in columns_to_numeric if col not in MEAN_COLUMNS]
+
+
+def _count_column(col):
+    return f"{col} count"
+
+
+def _device_table(table):
+    table = table[table["Device Name"].notna()].assign(Day=lambda t: t["Day"].dt.date)
+    return table[["Device Name", "Day"] + columns_to_numeric].reset_index(drop=True)
+
+
+class RollupLevel:
+    # 单个粒度的汇总结果：按键排序的紧凑数组 + 前缀键到连续区间的索引
+    def __init__(self, frame, span_keys):
+        self.size = len(frame)
+        self.arrays = {col: frame[col].to_numpy() for col in frame.columns}
+        # span_keys 为若干键前缀，如 [["Power plant name"], ["Power plant name", "Year"]]
+        self.spans = {
+            len(keys): partition_spans([self.arrays[key] for key in keys], self.size)
+            for keys in span_keys
+        }
+
+    def frame(self, *key):
+        # O(1) 查表：返回该键前缀对应的汇总行，均值列由 sum / count 计算
+        spans = self.spans[len(key)]
+        return self.take(spans.get(key if len(key) > 1 else key[0], slice(0, 0)))
+
+    def take(self, rows):
+        # rows 为切片或行号数组；均值列由 sum / count 计算
+        data = {}
+        for col, values in self.arrays.items():
+            if col.endswith(" count"):
+                continue
+            if col in MEAN_COLUMNS:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    data[col] = values[rows] / self.arrays[_count_column(col)][rows]
+            else:
+                data[col] = values[rows]
+        return pd.DataFrame(data)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.arrays.values())
+
+    def to_frame(self):
+        # 还原为包含求和列与计数列的汇总表（用于增量合并）
+        return pd.DataFrame(self.arrays)
+
+
+def _sum_by(frame, keys):
+    # 可加性汇总：求和列与计数列直接相加即可上卷到更粗的粒度
+    return frame.groupby(keys, sort=True, dropna=False).sum(min_count=0).reset_index()
+
+
+PLANT = ["Power plant name"]
+# 各粒度的分组键（分组结果即按这些键排序）与查表用的键前缀
+LEVEL_KEYS = {
+    "device_daily": PLANT + ["Year", "Month", "Device Name", "Day"],
+    "plant_daily": PLANT + ["Year", "Month", "Day"],
+    "weekly": PLANT + ["Week"],
+    "monthly": PLANT + ["Year", "Month"],
+    "annual": PLANT + ["Year"],
+}
+LEVEL_SPANS = {
+    "device_daily": [PLANT + ["Year", "Month"]],
+    "plant_daily": [PLANT + ["Year"], PLANT + ["Year", "Month"]],
+    "weekly": [PLANT],
+    "monthly": [PLANT, PLANT + ["Year"]],
+    "annual": [PLANT],
+}
+
+
+def rollup_frames(df):
+    # 1. 设备日汇总（一次向量化 groupby 完成所有电厂）
+    days = df["Statistical time"].dt.normalize()
+    work = pd.DataFrame({
+        "Power plant name": df["Power plant name"].to_numpy(),
+        "Year": days.dt.year.to_numpy(),
+        "Month": days.dt.month.to_numpy(),
+        "Device Name": df["Device Name"].to_numpy(),
+        "Day": days.to_numpy(),
+    })
+    for col in columns_to_numeric:
+        work[col] = measure_values(df, col)
+    for col in MEAN_COLUMNS:
+        work[_count_column(col)] = df[col].notna().to_numpy(dtype="int32")
+    device_daily = _sum_by(work, LEVEL_KEYS["device_daily"])
+
+    # 2. 电厂日汇总
+    plant_daily = _sum_by(device_daily.drop(columns=["Device Name"]), LEVEL_KEYS["plant_daily"])
+
+    # 3. 电厂周汇总（W-Mon：周二至周一为一周，以周一作为标签，与 resample("W-Mon") 一致）
+    days = plant_daily["Day"]
+    week_label = days + pd.to_timedelta((-days.dt.weekday) % 7, unit="D")
+    weekly = _sum_by(plant_daily.drop(columns=["Year", "Month", "Day"]).assign(Week=week_label),
+                     LEVEL_KEYS["weekly"])
+
+    # 4. 电厂月汇总、年汇总
+    monthly = _sum_by(plant_daily.drop(columns=["Day"]), LEVEL_KEYS["monthly"])
+    annual = _sum_by(monthly.drop(columns=["Month"]), LEVEL_KEYS["annual"])
+    return {"device_daily": device_daily, "plant_daily": plant_daily, "weekly": weekly,
+            "monthly": monthly, "annual": annual}
+
+
+# 前缀和中的列：求和列、均值列的和与计数（区间均值 = 区间和 / 区间计数）
+PREFIX_COLUMNS = columns_to_numeric + [_count_column(col) for col in MEAN_COLUMNS]
+
+
+def _day_number_array(days):
+    return np.asarray(days).astype("datetime64[D]").astype(np.int64)
+
+
+def _day_number(day):
+    # 日期（字符串、date、Timestamp）→ 自 1970-01-01 起的日序号
+    return int(np.datetime64(pd.Timestamp(day), "D").astype(np.int64))
+
+
+def _totals_frame(totals, days):
+    # 前缀和之差 (行, PREFIX_COLUMNS) → 合计表：有数据的天数 + 各数值列（均值列为区间均值）
+    data = {"Days": days}
+    for position, col in enumerate(columns_to_numeric):
+        if col in MEAN_COLUMNS:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                data[col] = totals[:, position] / totals[:, PREFIX_COLUMNS.index(_count_column(col))]
+        else:
+            data[col] = totals[:, position]
+    return pd.DataFrame(data)
+
+
+class PrefixSums:
+    # 按 (组, 日) 排序的日汇总行的累计和：cum[k, i] 为第 k 列前 i 行之和（按列连续存放）；
+    # pos[g, t] 为组 g 中第一个日序号 >= first_day + t 的行位置（稠密表，t = n_days 为组末尾），
+    # 任意日期区间的行范围和合计都只需两次查表，与区间长度无关
+    def __init__(self, groups, n_groups, days, values, rows=None):
+        # groups、days（日序号）已按 (组, 日) 排序且每组每日至多一行；
+        # values 为 PREFIX_COLUMNS 对应的数组，rows 不为 None 时按 rows 取出（即排序后的行）
+        self.first_day = int(days.min()) if len(days) else 0
+        self.n_days = int(days.max()) - self.first_day + 1 if len(days) else 0
+        self.cum = np.zeros((len(PREFIX_COLUMNS), len(days) + 1))
+        for position, col in enumerate(PREFIX_COLUMNS):
+            column = values[col] if rows is None else values[col][rows]
+            np.cumsum(column, out=self.cum[position, 1:], dtype=np.float64)
+        # 组合键 组 × (天数 + 1) + 日 全局有序：一次 searchsorted 得到所有 (组, 日) 的行位置
+        width = self.n_days + 1
+        keys = groups.astype(np.int64) * width + (days - self.first_day)
+        dtype = np.int32 if len(days) < 2 ** 31 else np.int64
+        self.pos = np.searchsorted(keys, np.arange(n_groups * width)).astype(dtype).reshape(n_groups, width)
+
+    @property
+    def nbytes(self):
+        return self.cum.nbytes + self.pos.nbytes
+
+    def bounds(self, groups, start, end):
+        # 日期区间 [start, end]（含两端）在各组中的行范围 [lo, hi)
+        first = min(max(_day_number(start) - self.first_day, 0), self.n_days)
+        stop = min(max(_day_number(end) - self.first_day + 1, first), self.n_days)
+        return self.pos[groups, first], self.pos[groups, stop]
+
+    def totals(self, lo, hi):
+        # 行范围的合计：(组, PREFIX_COLUMNS)
+        return (self.cum[:, hi] - self.cum[:, lo]).T
+
+
+class RollupCube:
+    def __init__(self, df=None, frames=None):
+        if frames is None:
+            frames = rollup_frames(df)
+        self.device_daily = RollupLevel(frames["device_daily"], LEVEL_SPANS["device_daily"])
+        self.plant_daily = RollupLevel(frames["plant_daily"], LEVEL_SPANS["plant_daily"])
+        self.weekly = RollupLevel(frames["weekly"], LEVEL_SPANS["weekly"])
+        self.monthly = RollupLevel(frames["monthly"], LEVEL_SPANS["monthly"])
+        self.annual = RollupLevel(frames["annual"], LEVEL_SPANS["annual"])
+
+        # 日期区间查询的前缀和：电厂日（组 = 电厂，电厂日汇总本身即按 (电厂, 日) 排序）
+        arrays = self.plant_daily.arrays
+        self.plants = pd.Index(pd.unique(arrays["Power plant name"]))
+        self.plant_prefix = PrefixSums(self.plants.get_indexer(arrays["Power plant name"]), len(self.plants),
+                                       _day_number_array(arrays["Day"]), arrays)
+        # 设备日（组 = (电厂, 设备)，按电厂、设备名编号）：按 (设备, 日) 重新排序，device_rows 为对应的设备日汇总行号
+        arrays = self.device_daily.arrays
+        rows = np.flatnonzero(pd.notna(arrays["Device Name"]))
+        pairs = pd.MultiIndex.from_arrays([arrays["Power plant name"][rows], arrays["Device Name"][rows]])
+        width = len(pairs.levels[1])
+        unique, groups = np.unique(pairs.codes[0].astype(np.int64) * width + pairs.codes[1], return_inverse=True)
+        self.devices = pd.MultiIndex.from_arrays([pairs.levels[0][unique // width], pairs.levels[1][unique % width]])
+        days = _day_number_array(arrays["Day"][rows])
+        order = np.lexsort((days, groups))
+        self.device_rows = rows[order]
+        self.device_prefix = PrefixSums(groups[order], len(self.devices), days[order], arrays, self.device_rows)
+        # 各电厂的设备编号区间
+        self.plant_devices = partition_spans([self.devices.get_level_values(0).to_numpy()], len(self.devices))
+
+    def extend(self, new_rows):
+        # 增量更新：只汇总新增行，再与现有各粒度按键相加（跨周、跨月的边界自动合并）
+        added = rollup_frames(new_rows)
+        frames = {
+            name: _sum_by(pd.concat([getattr(self, name).to_frame(), frame], ignore_index=True), LEVEL_KEYS[name])
+            for name, frame in added.items()
+        }
+        return RollupCube(frames=frames)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in
+                   (self.device_daily, self.plant_daily, self.weekly, self.monthly, self.annual,
+                    self.plant_prefix, self.device_prefix)) + self.device_rows.nbytes
+
+    def device_table(self, plant, year, month):
+        # 表格：设备 × 日（与原 groupby(["Device Name", "Day"]) 输出一致）
+        return _device_table(self.device_daily.frame(plant, year, month))
+
+    def device_table_range(self, plant, start, end):
+        # 任意日期区间 [start, end] 的设备 × 日表格（格式同 device_table）：各设备的行范围由前缀和的位置表查得
+        lo, hi = self.device_prefix.bounds(self._device_codes(plant), start, end)
+        lengths = hi - lo
+        index = np.repeat(lo - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return _device_table(self.device_daily.take(self.device_rows[index]))
+
+    def device_range_totals(self, plant, start, end):
+        # 各设备在区间内的合计和均值（区间内无数据的设备不列出）：每台设备两次查表，所有设备一次向量化完成
+        codes = self._device_codes(plant)
+        lo, hi = self.device_prefix.bounds(codes, start, end)
+        totals = _totals_frame(self.device_prefix.totals(lo, hi), hi - lo)
+        totals.insert(0, "Device Name", self.devices.get_level_values(1)[codes])
+        return totals[hi > lo].reset_index(drop=True)
+
+    def _device_codes(self, plant):
+        devices = self.plant_devices.get(plant, slice(0, 0))
+        return np.arange(devices.start, devices.stop)
+
+    def daily_range(self, plant, start, end):
+        # 任意日期区间 [start, end] 的电厂日汇总（格式同 daily）
+        lo, hi = self._plant_bounds(plant, start, end)
+        return self.plant_daily.take(slice(lo, hi)).set_index("Day")
+
+    def range_totals(self, plant, start, end):
+        # 电厂在区间内的合计和均值（Series，含有数据的天数）：两次查表
+        lo, hi = self._plant_bounds(plant, start, end)
+        return _totals_frame(self.plant_prefix.totals(np.array([lo]), np.array([hi])), [hi - lo]).iloc[0]
+
+    def _plant_bounds(self, plant, start, end):
+        code = self.plants.get_indexer([plant])[0]
+        if code < 0:
+            return 0, 0
+        lo, hi = self.plant_prefix.bounds(code, start, end)
+        return int(lo), int(hi)
+
+    def daily(self, plant, year, month=None):
+        # 电厂日产量与日平均风速，以日期为索引（不指定月份时为全年）
+        if month is None:
+            return self.plant_daily.frame(plant, year).set_index("Day")
+        return self.plant_daily.frame(plant, year, month).set_index("Day")
+
+    def weekly_wind(self, plant):
+        # 每周平均风速，以周一日期为索引
+        return self.weekly.frame(plant).set_index("Week")["Average wind speed (m/s)"]
+
+    def monthly_summary(self, plant, year=None):
+        # 月度产量与平均风速（可选限定年份）
+        if year is None:
+            return self.monthly.frame(plant)
+        return self.monthly.frame(plant, year)
+
+    def annual_production(self, plant):
+        return self.annual.frame(plant)[["Year", "Active Energy Exported(kWh)"]]
+
+    def device_month_sums(self):
+        # 设备月可加量（机队 KPI 用）：设备日汇总按 (电厂, 年, 月, 设备, 日) 排序，前四个键连续相同的行即一个设备月
+        # 返回 ([电厂, 年, 月, 设备] 键数组, {求和列: 数组})
+        arrays = self.device_daily.arrays
+        n = self.device_daily.size
+        keys = [arrays["Power plant name"], arrays["Year"], arrays["Month"], arrays["Device Name"]]
+        change = np.zeros(n, dtype=bool)
+        if n:
+            change[0] = True
+        for values in keys:
+            change[1:] |= values[1:] != values[:-1]
+        starts = np.flatnonzero(change)
+        sums = {col: np.add.reduceat(arrays[col], starts) if n else np.zeros(0) for col in SUM_COLUMNS}
+        return [values[starts] for values in keys], sums
+
+    def device_day_power(self):
+        # 设备日的平均风速、上网电量和发电时间（功率曲线用），返回 {列: 数组}
+        arrays = self.device_daily.arrays
+        wind = "Average wind speed (m/s)"
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_wind = arrays[wind] / arrays[_count_column(wind)]
+        days = {col: arrays[col] for col in ("Power plant name", "Year", "Month", "Device Name",
+                                              "Active Energy Exported(kWh)", "Energy production time (h)")}
+        days[wind] = mean_wind
+        return days
@@ -0,0 +1,156 @@
+# 共享选择阶段：一次下拉框变化只计算一次 (电厂, 年, 月) 的工作集，保存在服务端，
+# dcc.Store 中只传递选择键；各图表和表格回调从同一个工作集取数据
+import datetime
+import functools
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from dash.exceptions import PreventUpdate
+
+from metrics import add_rows, checkpoint
+
+# 选择键中的字段；"start"/"end" 为日期区间（未选择时为 None），"version" 为数据快照版本
+SELECTION_FIELDS = ("plant", "year", "month", "start", "end", "version")
+
+# 工作集的计算步骤，按粒度分组：同一电厂切换月份时复用电厂级和年级的结果
+PLANT_STEPS = {
+    "monthly": lambda rollups, plant: rollups.monthly_summary(plant),
+    "weekly": lambda rollups, plant: rollups.weekly_wind(plant),
+    "annual": lambda rollups, plant: rollups.annual_production(plant),
+}
+YEAR_STEPS = {
+    "year_monthly": lambda rollups, plant, year: rollups.monthly_summary(plant, year),
+    "year_daily": lambda rollups, plant, year: rollups.daily(plant, year),
+}
+MONTH_STEPS = {
+    "daily": lambda rollups, plant, year, month: rollups.daily(plant, year, month),
+    "device_table": lambda rollups, plant, year, month: rollups.device_table(plant, year, month),
+    "device_totals": lambda rollups, plant, year, month: rollups.device_range_totals(plant, *month_range(year, month)),
+}
+# 选择了日期区间时代替月份粒度：日数据、设备表格和合计由前缀和查得
+RANGE_STEPS = {
+    "daily": lambda rollups, plant, start, end: rollups.daily_range(plant, start, end),
+    "device_table": lambda rollups, plant, start, end: rollups.device_table_range(plant, start, end),
+    "device_totals": lambda rollups, plant, start, end: rollups.device_range_totals(plant, start, end),
+    "range_totals": lambda rollups, plant, start, end: rollups.range_totals(plant, start, end),
+}
+
+
+def month_range(year, month):
+    # 月份的首日和末日（"YYYY-MM-DD"）
+    last = (year + 1, 1) if month == 12 else (year, month + 1)
+    end = datetime.date(*last, 1) - datetime.timedelta(days=1)
+    return f"{year:04d}-{month:02d}-01", end.isoformat()
+
+
+class WorkingSet:
+    # 一个选择对应的数据：预聚合结果的切片 + 图表补齐所需的全局范围
+    def __init__(self, snapshot, plant, year, month, parts, start=None, end=None):
+        self.snapshot = snapshot
+        self.plant = plant
+        self.year = year
+        self.month = month
+        self.start = start
+        self.end = end
+        self.all_years = snapshot.index.all_years
+        self.start_time = snapshot.index.start_time
+        self.end_time = snapshot.index.end_time
+        for part in parts:
+            self.__dict__.update(part)
+
+
+class SelectionStage:
+    def __init__(self, store, max_entries=64):
+        self.store = store
+        self.max_entries = max_entries
+        self._parts = OrderedDict()  # (版本, 粒度键) -> {步骤名: 结果}
+        self._lock = threading.Lock()
+        self._timings = defaultdict(lambda: {"count": 0, "total_s": 0.0, "last_s": 0.0})
+
+    def _record(self, step, seconds):
+        timing = self._timings[step]
+        timing["count"] += 1
+        timing["total_s"] += seconds
+        timing["last_s"] = seconds
+
+    def _part(self, snapshot, key, steps):
+        # 某一粒度的结果：缓存命中直接返回，否则逐步计算并记录耗时
+        cache_key = (snapshot.version,) + key
+        with self._lock:
+            part = self._parts.get(cache_key)
+            if part is not None:
+                self._parts.move_to_end(cache_key)
+                return part
+        part = {}
+        for name, step in steps.items():
+            start = time.perf_counter()
+            part[name] = step(snapshot.rollups, *key)
+            elapsed = time.perf_counter() - start
+            add_rows(len(part[name]))
+            with self._lock:
+                self._record(name, elapsed)
+        with self._lock:
+            self._parts[cache_key] = part
+            while len(self._parts) > self.max_entries:
+                self._parts.popitem(last=False)
+        return part
+
+    def working_set(self, selection):
+        # 由选择键取得工作集；其他进程生成的键或已淘汰的键按当前快照重新计算
+        snapshot = self.store.current()
+        plant, year, month = selection["plant"], selection["year"], selection["month"]
+        range_start, range_end = selection.get("start"), selection.get("end")
+        start = time.perf_counter()
+        parts = [
+            self._part(snapshot, (plant,), PLANT_STEPS),
+            self._part(snapshot, (plant, year), YEAR_STEPS),
+            self._part(snapshot, (plant, year, month), MONTH_STEPS) if range_start is None
+            else self._part(snapshot, (plant, range_start, range_end), RANGE_STEPS),
+        ]
+        with self._lock:
+            self._record("working_set", time.perf_counter() - start)
+        checkpoint("working_set")
+        return WorkingSet(snapshot, plant, year, month, parts, range_start, range_end)
+
+    def select(self, plant, year, month, previous=None, start=None, end=None):
+        # 计算（预热）工作集并返回选择键；changed 记录相对上一次选择变化的字段
+        # 日期区间只在两端都选定时生效（"YYYY-MM-DD"，起止顺序颠倒时交换）
+        if start is None or end is None:
+            start = end = None
+        else:
+            start, end = sorted((str(start)[:10], str(end)[:10]))
+        selection = {"plant": plant, "year": year, "month": month, "start": start, "end": end,
+                     "version": self.store.current().version}
+        self.working_set(selection)
+        selection["changed"] = [
+            field for field in SELECTION_FIELDS
+            if previous is None or previous.get(field) != selection[field]
+        ]
+        return selection
+
+    def consumes(self, *fields):
+        # 装饰回调：只有所依赖的字段（或数据版本）变化时才更新输出
+        watched = set(fields) | {"version"}
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(selection, *args):
+                if not selection or not watched.intersection(selection["changed"]):
+                    raise PreventUpdate
+                return func(selection, *args)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        # 各步骤耗时统计（毫秒）
+        with self._lock:
+            return {
+                step: {
+                    "count": timing["count"],
+                    "mean_ms": 1000 * timing["total_s"] / timing["count"] if timing["count"] else 0.0,
+                    "last_ms": 1000 * timing["last_s"],
+                    "total_ms": 1000 * timing["total_s"],
+                }
+                for step, timing in self._timings.items()
+            }
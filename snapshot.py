@@ -0,0 +1,68 @@
+# 数据快照：分区索引 + 预聚合 + 下拉选项打包为一个不可变对象，重新加载时整体原子替换
+import hashlib
+
+import pandas as pd  # 数据处理
+
+from compact import compact_frame
+from data_index import PartitionIndex
+from kpi import FleetKpis
+from power_curve import PowerCurves
+from rollups import RollupCube
+from wind_distribution import WindHistograms
+
+
+def newer_rows(new_rows, end_times):
+    # 每个电厂只保留晚于该电厂已有最大时间的行（end_times：{电厂: 最大时间}，新电厂的行全部保留）：
+    # 多个工作簿各自更新时，一个国家较晚到达的数据不会因其他国家已有更晚的数据而被丢弃
+    cutoff = pd.to_datetime(new_rows["Power plant name"].astype(object).map(end_times))
+    return new_rows[cutoff.isna() | (new_rows["Statistical time"] > cutoff)]
+
+
+class DataSnapshot:
+    # 快照创建后不再修改；回调开始时取一次 current()，整个回调内使用同一个一致视图
+    def __init__(self, index, rollups, version, compact=False, power_curves=None, wind_histograms=None):
+        self.compact = compact
+        self.index = index
+        self.df = index.df
+        self.rollups = rollups
+        # 机队 KPI（设备月可加量，加载后一次计算）
+        self.kpis = FleetKpis(rollups)
+        # 功率曲线（设备 × 年月 × 风速区间的可加统计量）；追加数据时增量合并
+        self.power_curves = PowerCurves.from_days(rollups.device_day_power()) if power_curves is None else power_curves
+        # 风速分布（设备 × 日 × 风速区间的样本数，由原始行一次分箱）；追加数据时增量合并
+        self.wind_histograms = WindHistograms.from_rows(index.df) if wind_histograms is None else wind_histograms
+        self.version = version
+        self.max_time = index.end_time
+        # 下拉框选项
+        self.available_years = sorted({year for _, year in index.year_spans}, reverse=True)
+        self.available_projects = sorted(index.plant_spans)
+
+    def plant_end_times(self):
+        # 各电厂的最大 "Statistical time"：分区内按时间排序，电厂区间的最后一行即最大时间
+        times = self.df["Statistical time"]
+        return {plant: times.iloc[span.stop - 1] for plant, span in self.index.plant_spans.items()}
+
+    @classmethod
+    def from_frame(cls, df, version, compact=False):
+        # compact=True 时使用紧凑数据模型（分类编码、float32、整数日序号）
+        if compact:
+            df = compact_frame(df)
+        index = PartitionIndex(df)
+        return cls(index, RollupCube(index.df), version, compact)
+
+    def append(self, new_rows, source=None):
+        # 每个电厂只接收晚于该电厂当前最大 "Statistical time" 的行，增量更新索引和预聚合后返回新快照
+        # source（新数据所属的数据源配置）只用于 SQLite 后端记录来源，内存快照不保存
+        new_rows = newer_rows(new_rows, self.plant_end_times())
+        if new_rows.empty:
+            return self
+        stamp = f"{self.version}|{new_rows['Statistical time'].max()}|{len(new_rows)}"
+        version = hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:16]
+        index = self.index.extend(new_rows)
+        if self.compact:  # 拼接后分类编码会退化为字符串，重新压缩
+            index.df = compact_frame(index.df)
+        power_curves = self.power_curves.extend(RollupCube(new_rows).device_day_power())
+        wind_histograms = self.wind_histograms.extend(new_rows)
+        return DataSnapshot(index, self.rollups.extend(new_rows), version, self.compact, power_curves,
+                            wind_histograms)
+
@@ -0,0 +1,426 @@
+# SQLite 存储后端：清洗后的 "Production statistics" 行写入本地 SQLite 文件，
+# 回调所需的筛选和聚合以 SQL 在索引上执行，内存中只保留查询结果（数据量可超过内存）
+# 与内存预聚合（RollupCube）提供相同的查询方法，快照接口与 DataSnapshot 相同
+# 用法（等价性检查 + 延迟对比）：python sqlite_store.py <工作簿路径> [工作表名]
+import hashlib
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+from data_loader import DEFAULT_CACHE_DIR, columns_to_numeric, expand_sources, file_fingerprint, load_source
+from kpi import FleetKpis
+from power_curve import BIN_WIDTH, MAX_WIND, N_BINS, PowerCurves
+from rollups import MEAN_COLUMNS, SUM_COLUMNS
+from snapshot import newer_rows
+from wind_distribution import WindHistograms
+
+DEFAULT_DB_PATH = os.path.join(DEFAULT_CACHE_DIR, "production.sqlite")
+# 每批写入的行数
+INSERT_CHUNK_ROWS = 50_000
+# 时间以文本保存（可排序，且可直接使用 SQLite 日期函数）
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+TIME_MIN, TIME_MAX = "0000", "9999"
+
+TIME, PLANT, DEVICE = "Statistical time", "Power plant name", "Device Name"
+
+
+def _q(name):
+    # 列名含空格和括号，统一加双引号
+    return '"' + name.replace('"', '""') + '"'
+
+
+# 聚合表达式：求和列用 TOTAL（全部为空时为 0，与 pandas sum(min_count=0) 一致），均值列用 AVG（忽略空值）
+AGGREGATES = ", ".join(
+    f"AVG({_q(col)}) AS {_q(col)}" if col in MEAN_COLUMNS else f"TOTAL({_q(col)}) AS {_q(col)}"
+    for col in columns_to_numeric
+)
+DAY = f"date({_q(TIME)})"
+YEAR = f"CAST(strftime('%Y', {_q(TIME)}) AS INTEGER)"
+MONTH = f"CAST(strftime('%m', {_q(TIME)}) AS INTEGER)"
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS sources (id INTEGER PRIMARY KEY, path TEXT UNIQUE, version TEXT)",
+    f"""CREATE TABLE IF NOT EXISTS production (
+        source_id INTEGER, {_q(TIME)} TEXT NOT NULL, {_q(PLANT)} TEXT NOT NULL, {_q(DEVICE)} TEXT,
+        {", ".join(f"{_q(col)} REAL" for col in columns_to_numeric)})""",
+    f"CREATE INDEX IF NOT EXISTS production_plant_time ON production ({_q(PLANT)}, {_q(TIME)})",
+    f"CREATE INDEX IF NOT EXISTS production_plant_device_time ON production ({_q(PLANT)}, {_q(DEVICE)}, {_q(TIME)})",
+]
+
+
+def _month_bounds(year, month=None):
+    # [start, stop) 时间文本区间
+    if month is None:
+        return f"{year:04d}", f"{year + 1:04d}"
+    stop = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}", f"{stop[0]:04d}-{stop[1]:02d}"
+
+
+class SqliteStore:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self.connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def connection(self):
+        # 每个线程（以及 fork 后的每个进程）使用各自的连接
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")  # 读写并发：写入时读者仍可查询
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def query(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def frame(self, sql, params, columns):
+        return pd.DataFrame.from_records(self.query(sql, params), columns=columns)
+
+    def _insert(self, conn, df, source_id):
+        columns = [TIME, PLANT, DEVICE] + columns_to_numeric
+        sql = (f"INSERT INTO production (source_id, {', '.join(_q(col) for col in columns)}) "
+               f"VALUES ({', '.join('?' * (len(columns) + 1))})")
+        for start in range(0, len(df), INSERT_CHUNK_ROWS):
+            chunk = df.iloc[start:start + INSERT_CHUNK_ROWS]
+            values = {
+                TIME: chunk[TIME].dt.strftime(TIME_FORMAT).to_numpy(dtype=object),
+                PLANT: chunk[PLANT].astype(str).to_numpy(dtype=object),
+                DEVICE: chunk[DEVICE].astype(object).where(chunk[DEVICE].notna(), None).map(
+                    lambda value: None if value is None else str(value)).to_numpy(dtype=object),
+            }
+            for col in columns_to_numeric:
+                numbers = chunk[col].to_numpy(dtype="float64")
+                values[col] = np.where(np.isnan(numbers), None, numbers)
+            rows = zip([source_id] * len(chunk), *(values[col] for col in columns))
+            conn.executemany(sql, rows)
+
+    def ingest_sources(self, sources, cache_dir=DEFAULT_CACHE_DIR):
+        # 逐个工作簿写入（内存中同时只有一个工作簿）；内容未变化的工作簿跳过，变化的先删除旧行再写入
+        # 返回失败列表 [(路径, 错误信息)]
+        failures = []
+        for source in expand_sources(sources):
+            try:
+                version = file_fingerprint(source["path"], source["sheet"], source["reader"])["sha256"][:16]
+                known = self.query("SELECT id, version FROM sources WHERE path = ?", (source["path"],))
+                if known and known[0][1] == version:
+                    continue
+                df = load_source(source, cache_dir)
+            except Exception as exc:  # 与内存模式一致：记录失败并继续
+                failures.append((source["path"], f"{type(exc).__name__}: {exc}"))
+                continue
+            conn = self.connection()
+            with conn:  # 单个事务：删除旧行、写入新行、更新版本
+                if known:
+                    conn.execute("DELETE FROM production WHERE source_id = ?", (known[0][0],))
+                self._delete_unsourced(conn, df)
+                self._insert(conn, df, self._register_source(conn, source["path"], version))
+        return failures
+
+    @staticmethod
+    def _register_source(conn, path, version):
+        # 记录工作簿的内容版本，返回其 source_id
+        known = conn.execute("SELECT id FROM sources WHERE path = ?", (path,)).fetchall()
+        if known:
+            conn.execute("UPDATE sources SET version = ? WHERE id = ?", (version, known[0][0]))
+            return known[0][0]
+        return conn.execute("INSERT INTO sources (path, version) VALUES (?, ?)", (path, version)).lastrowid
+
+    @staticmethod
+    def _delete_unsourced(conn, df):
+        # 删除工作簿覆盖范围（各电厂的首末时间）内没有来源的行（投递文件追加的行），工作簿写入后不会重复
+        spans = df.groupby(df[PLANT].astype(str))[TIME].agg(["min", "max"])
+        conn.executemany(
+            f"DELETE FROM production WHERE source_id IS NULL AND {_q(PLANT)} = ? "
+            f"AND {_q(TIME)} >= ? AND {_q(TIME)} <= ?",
+            [(plant, first.strftime(TIME_FORMAT), last.strftime(TIME_FORMAT))
+             for plant, first, last in spans.itertuples()])
+
+    def plant_end_times(self, conn=None, max_rowid=None):
+        # 各电厂的最大时间（max_rowid：只统计快照可见的行）
+        sql = f"SELECT {_q(PLANT)}, MAX({_q(TIME)}) FROM production"
+        params = ()
+        if max_rowid is not None:
+            sql, params = sql + " WHERE rowid <= ?", (max_rowid,)
+        rows = (conn or self.connection()).execute(sql + f" GROUP BY {_q(PLANT)}", params).fetchall()
+        return {plant: pd.Timestamp(end) for plant, end in rows}
+
+    def append(self, new_rows, source_path=None, source_version=None):
+        # 每个电厂追加晚于库中该电厂最大时间的行；写事务内再次检查，多个进程同时追加同一批数据时只写入一次
+        # 来自配置的工作簿时（source_path），行记录该工作簿的 source_id，并在同一事务中更新其版本：
+        # 重启后工作簿视为未变化，不会重新写入（否则追加的行会重复）
+        conn = self.connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            new_rows = newer_rows(new_rows, self.plant_end_times(conn))
+            source_id = None
+            if source_path is not None:
+                source_id = self._register_source(conn, source_path, source_version)
+            if not new_rows.empty:
+                self._insert(conn, new_rows, source_id)
+
+    def version(self):
+        # 数据版本：各工作簿内容版本 + 行数和最大时间（追加的数据也会改变版本）
+        sources = self.query("SELECT path, version FROM sources ORDER BY path")
+        (count, max_time), = self.query(f"SELECT COUNT(*), MAX({_q(TIME)}) FROM production")
+        stamp = "|".join(f"{path}:{version}" for path, version in sources) + f"|{count}|{max_time}"
+        return hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:16]
+
+
+class SqliteRollups:
+    # 与 RollupCube 相同的查询方法；所有查询限定在快照的最大 rowid 之内，快照之后追加的行不可见
+    # （追加的行可能早于其他电厂的最大时间，因此不能按时间划分快照）
+    def __init__(self, store, max_rowid):
+        self.store = store
+        self.max_rowid = max_rowid
+
+    def _where(self, plant, year=None, month=None, device=False):
+        start, stop = _month_bounds(year, month) if year is not None else (TIME_MIN, TIME_MAX)
+        return self._between(plant, start, stop, device)
+
+    def _range_where(self, plant, start, end, device=False):
+        # 日期区间 [start, end]（含两端）
+        return self._between(plant, pd.Timestamp(start).strftime("%Y-%m-%d"),
+                             (pd.Timestamp(end).normalize() + pd.Timedelta(days=1)).strftime("%Y-%m-%d"), device)
+
+    def _between(self, plant, start, stop, device=False):
+        sql = f"{_q(PLANT)} = ? AND {_q(TIME)} >= ? AND {_q(TIME)} < ? AND rowid <= ?"
+        if device:
+            sql += f" AND {_q(DEVICE)} IS NOT NULL"
+        return sql, (plant, start, stop, self.max_rowid)
+
+    def device_table(self, plant, year, month):
+        # 表格：设备 × 日
+        return self._device_table(*self._where(plant, year, month, device=True))
+
+    def device_table_range(self, plant, start, end):
+        return self._device_table(*self._range_where(plant, start, end, device=True))
+
+    def _device_table(self, where, params):
+        table = self.store.frame(
+            f"SELECT {_q(DEVICE)}, {DAY} AS Day, {AGGREGATES} FROM production WHERE {where} "
+            f"GROUP BY {_q(DEVICE)}, Day ORDER BY {_q(DEVICE)}, Day",
+            params, [DEVICE, "Day"] + columns_to_numeric)
+        table["Day"] = pd.to_datetime(table["Day"]).dt.date
+        return table
+
+    def daily(self, plant, year, month=None):
+        # 电厂日产量与日平均风速，以日期为索引（不指定月份时为全年）
+        return self._daily(plant, *self._where(plant, year, month))
+
+    def daily_range(self, plant, start, end):
+        return self._daily(plant, *self._range_where(plant, start, end))
+
+    def _daily(self, plant, where, params):
+        daily = self.store.frame(
+            f"SELECT {DAY} AS Day, {AGGREGATES} FROM production WHERE {where} GROUP BY Day ORDER BY Day",
+            params, ["Day"] + columns_to_numeric)
+        daily["Day"] = pd.to_datetime(daily["Day"])
+        daily.insert(0, PLANT, plant)
+        daily.insert(1, "Year", daily["Day"].dt.year)
+        daily.insert(2, "Month", daily["Day"].dt.month)
+        return daily.set_index("Day")
+
+    def range_totals(self, plant, start, end):
+        # 区间合计和均值（Series，含有数据的天数）
+        where, params = self._range_where(plant, start, end)
+        return self.store.frame(f"SELECT COUNT(DISTINCT {DAY}) AS Days, {AGGREGATES} FROM production WHERE {where}",
+                                params, ["Days"] + columns_to_numeric).iloc[0]
+
+    def device_range_totals(self, plant, start, end):
+        # 各设备在区间内的合计和均值
+        where, params = self._range_where(plant, start, end, device=True)
+        return self.store.frame(
+            f"SELECT {_q(DEVICE)}, COUNT(DISTINCT {DAY}) AS Days, {AGGREGATES} FROM production WHERE {where} "
+            f"GROUP BY {_q(DEVICE)} ORDER BY {_q(DEVICE)}",
+            params, [DEVICE, "Days"] + columns_to_numeric)
+
+    def weekly_wind(self, plant):
+        # 每周平均风速，以周一日期为索引（'weekday 1'：当天或之后的第一个周一，与 W-Mon 一致）
+        where, params = self._where(plant)
+        wind = _q("Average wind speed (m/s)")
+        weekly = self.store.frame(
+            f"SELECT date({_q(TIME)}, 'weekday 1') AS Week, AVG({wind}) FROM production WHERE {where} "
+            f"GROUP BY Week ORDER BY Week",
+            params, ["Week", "Average wind speed (m/s)"])
+        weekly["Week"] = pd.to_datetime(weekly["Week"])
+        return weekly.set_index("Week")["Average wind speed (m/s)"]
+
+    def monthly_summary(self, plant, year=None):
+        # 月度产量与平均风速（可选限定年份）
+        where, params = self._where(plant, year)
+        monthly = self.store.frame(
+            f"SELECT {YEAR} AS Year, {MONTH} AS Month, {AGGREGATES} FROM production WHERE {where} "
+            f"GROUP BY Year, Month ORDER BY Year, Month",
+            params, ["Year", "Month"] + columns_to_numeric)
+        monthly.insert(0, PLANT, plant)
+        return monthly
+
+    def annual_production(self, plant):
+        where, params = self._where(plant)
+        exported = _q("Active Energy Exported(kWh)")
+        return self.store.frame(
+            f"SELECT {YEAR} AS Year, TOTAL({exported}) FROM production WHERE {where} GROUP BY Year ORDER BY Year",
+            params, ["Year", "Active Energy Exported(kWh)"])
+
+    def device_month_sums(self):
+        # 设备月可加量（机队 KPI 用），返回格式与 RollupCube.device_month_sums 相同
+        sums = ", ".join(f"TOTAL({_q(col)})" for col in SUM_COLUMNS)
+        frame = self.store.frame(
+            f"SELECT {_q(PLANT)}, {YEAR} AS Year, {MONTH} AS Month, {_q(DEVICE)}, {sums} FROM production "
+            f"WHERE rowid <= ? GROUP BY {_q(PLANT)}, Year, Month, {_q(DEVICE)} "
+            f"ORDER BY {_q(PLANT)}, Year, Month, {_q(DEVICE)}",
+            (self.max_rowid,), [PLANT, "Year", "Month", DEVICE] + SUM_COLUMNS)
+        keys = [frame[col].to_numpy() for col in (PLANT, "Year", "Month", DEVICE)]
+        keys[3] = frame[DEVICE].astype(object).where(frame[DEVICE].notna(), np.nan).to_numpy()
+        return keys, {col: frame[col].to_numpy(dtype="float64") for col in SUM_COLUMNS}
+
+    def device_day_power(self):
+        # 设备日的平均风速、上网电量和发电时间（功率曲线用），返回格式与 RollupCube.device_day_power 相同
+        columns = ["Average wind speed (m/s)", "Active Energy Exported(kWh)", "Energy production time (h)"]
+        frame = self.store.frame(
+            f"SELECT {_q(PLANT)}, {YEAR} AS Year, {MONTH} AS Month, {_q(DEVICE)}, {DAY} AS Day, "
+            f"AVG({_q(columns[0])}), TOTAL({_q(columns[1])}), TOTAL({_q(columns[2])}) FROM production "
+            f"WHERE rowid <= ? AND {_q(DEVICE)} IS NOT NULL "
+            f"GROUP BY {_q(PLANT)}, Year, Month, {_q(DEVICE)}, Day",
+            (self.max_rowid,), [PLANT, "Year", "Month", DEVICE, "Day"] + columns)
+        return {col: frame[col].to_numpy() for col in [PLANT, "Year", "Month", DEVICE] + columns}
+
+    def wind_bins(self):
+        # 风速直方图（分布统计用）：(电厂, 设备, 日序号, 区间) 的样本数，参数顺序与 WindHistograms.from_bins 相同
+        wind = _q("Average wind speed (m/s)")
+        frame = self.store.frame(
+            f"SELECT {_q(PLANT)}, {_q(DEVICE)}, CAST(julianday(date({_q(TIME)})) - 2440587.5 AS INTEGER) AS Day, "
+            f"MIN(CAST({wind} / ? AS INTEGER), ?) AS Bin, COUNT(*) FROM production "
+            f"WHERE rowid <= ? AND {_q(DEVICE)} IS NOT NULL AND {wind} >= 0 AND {wind} < ? "
+            f"GROUP BY {_q(PLANT)}, {_q(DEVICE)}, Day, Bin",
+            (BIN_WIDTH, N_BINS - 1, self.max_rowid, MAX_WIND), [PLANT, DEVICE, "Day", "Bin", "Samples"])
+        return (frame[PLANT].to_numpy(), frame[DEVICE].to_numpy(), frame["Day"].to_numpy(dtype=np.int64),
+                frame["Bin"].to_numpy(dtype=np.int64), frame["Samples"].to_numpy(dtype=np.float64))
+
+
+class SqliteCatalog:
+    # 快照的元数据（对应 PartitionIndex 中回调使用的部分）：年份、时间范围、存在数据的 (电厂, 年, 月)
+    def __init__(self, store, max_rowid):
+        # 年份按首次出现的顺序（与内存模式 df["Year"].unique() 一致）
+        self.all_years = np.array([year for year, _ in store.query(
+            f"SELECT {YEAR} AS Year, MIN(rowid) AS first FROM production WHERE rowid <= ? "
+            f"GROUP BY Year ORDER BY first", (max_rowid,))], dtype=np.int64)
+        (start, end), = store.query(f"SELECT MIN({_q(TIME)}), MAX({_q(TIME)}) FROM production "
+                                    f"WHERE rowid <= ?", (max_rowid,))
+        self.start_time = pd.Timestamp(start) if start else pd.NaT
+        self.end_time = pd.Timestamp(end) if end else pd.NaT
+        keys = store.query(f"SELECT DISTINCT {_q(PLANT)}, {YEAR} AS Year, {MONTH} AS Month FROM production "
+                           f"WHERE rowid <= ? ORDER BY {_q(PLANT)}, Year, Month", (max_rowid,))
+        # 与 PartitionIndex 的键相同；SQLite 后端没有行区间，值为 None
+        self.month_spans = {(plant, year, month): None for plant, year, month in keys}
+        self.year_spans = {(plant, year): None for plant, year, _ in keys}
+        self.plant_spans = {plant: None for plant, _, _ in keys}
+
+
+class SqliteSnapshot:
+    # 与 DataSnapshot 接口相同的快照；max_rowid 之后追加的行属于下一个快照
+    def __init__(self, store, version, max_rowid=None):
+        if max_rowid is None:
+            (max_rowid,), = store.query("SELECT MAX(rowid) FROM production")
+        self.store = store
+        self.compact = False
+        self.df = None  # 数据保存在 SQLite 中
+        self.max_rowid = max_rowid or 0
+        self.index = SqliteCatalog(store, self.max_rowid)
+        self.rollups = SqliteRollups(store, self.max_rowid)
+        self.version = version
+        self.max_time = self.index.end_time
+        self.available_years = sorted({year for _, year in self.index.year_spans}, reverse=True)
+        self.available_projects = sorted(self.index.plant_spans)
+        self.kpis = FleetKpis(self.rollups)
+        self.power_curves = PowerCurves.from_days(self.rollups.device_day_power())
+        self.wind_histograms = WindHistograms.from_bins(*self.rollups.wind_bins())
+
+    def plant_end_times(self):
+        return self.store.plant_end_times(max_rowid=self.max_rowid)
+
+    def append(self, new_rows, source=None):
+        # source：新数据所属的数据源配置（投递文件为 None）；工作簿没有新行时仍记录其新版本
+        source_version = new_rows.attrs.get("data_version")  # load_source 记录的工作簿内容版本
+        new_rows = newer_rows(new_rows, self.plant_end_times())
+        if source is not None:
+            self.store.append(new_rows, source["path"], source_version)
+        elif not new_rows.empty:
+            self.store.append(new_rows)
+        if new_rows.empty:
+            return self
+        return SqliteSnapshot(self.store, self.store.version())
+
+
+def open_sqlite_snapshot(sources, path=None, cache_dir=DEFAULT_CACHE_DIR):
+    # 写入新增或变化的工作簿后返回 (快照, 失败列表)
+    store = SqliteStore(path or DEFAULT_DB_PATH)
+    failures = store.ingest_sources(sources, cache_dir)
+    if not store.query("SELECT 1 FROM production LIMIT 1"):
+        raise RuntimeError(f"No production statistics could be loaded: {failures}")
+    return SqliteSnapshot(store, store.version()), failures
+
+
+def compare_latency(reference, candidate, repeat=3):
+    # 两个快照在相同查询上的延迟（毫秒中位数）：{查询: (参考, 候选)}
+    plant = reference.available_projects[0]
+    year, month = max((y, m) for p, y, m in reference.index.month_spans if p == plant)
+    # 日期区间：所选月份之前的 90 天
+    end = pd.Timestamp(year=year, month=month, day=1) - pd.Timedelta(days=1)
+    start, end = (end - pd.Timedelta(days=89)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    queries = {
+        "device_table": lambda s: s.rollups.device_table(plant, year, month),
+        "daily": lambda s: s.rollups.daily(plant, year, month),
+        "year_daily": lambda s: s.rollups.daily(plant, year),
+        "device_table_range": lambda s: s.rollups.device_table_range(plant, start, end),
+        "daily_range": lambda s: s.rollups.daily_range(plant, start, end),
+        "range_totals": lambda s: s.rollups.range_totals(plant, start, end),
+        "weekly_wind": lambda s: s.rollups.weekly_wind(plant),
+        "monthly_summary": lambda s: s.rollups.monthly_summary(plant),
+        "year_monthly": lambda s: s.rollups.monthly_summary(plant, year),
+        "annual_production": lambda s: s.rollups.annual_production(plant),
+        "fleet_kpis": lambda s: FleetKpis(s.rollups),
+        "power_curves": lambda s: PowerCurves.from_days(s.rollups.device_day_power()),
+        "wind_device_summary": lambda s: s.wind_histograms.device_summary(plant, year, month),
+    }
+    results = {}
+    for name, query in queries.items():
+        timings = []
+        for snapshot in (reference, candidate):
+            runs = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                query(snapshot)
+                runs.append(1000 * (time.perf_counter() - t0))
+            timings.append(statistics.median(runs))
+        results[name] = tuple(timings)
+    return results
+
+
+if __name__ == "__main__":
+    from compact import compare_snapshots
+    from snapshot import DataSnapshot
+
+    source = {"path": sys.argv[1], "sheet": (sys.argv[2:3] or ["Production statistics"])[0]}
+    memory = DataSnapshot.from_frame(load_source(expand_sources([source])[0]), "memory", compact=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        sqlite, _ = open_sqlite_snapshot([source], os.path.join(tmp, "production.sqlite"))
+        print(f"ingest: {time.perf_counter() - start:.1f}s")
+        problems = compare_snapshots(memory, sqlite)
+        print("equivalence:", "OK" if not problems else problems[:20])
+        print(f"{'query':<20} {'memory ms':>10} {'sqlite ms':>10}")
+        for name, (memory_ms, sqlite_ms) in compare_latency(memory, sqlite).items():
+            print(f"{name:<20} {memory_ms:>10.2f} {sqlite_ms:>10.2f}")
+    sys.exit(1 if problems else 0)
@@ -0,0 +1,78 @@
+# 表格服务端分页、排序、筛选：DataTable 使用 custom 模式时，只返回当前页的数据
+import math
+import operator as op
+import re
+
+import pandas as pd  # 数据处理
+
+# DataTable filter_query 中的运算符（英文别名与符号两种写法）
+FILTER_OPERATORS = [
+    ("ge", ">="), ("le", "<="), ("lt", "<"), ("gt", ">"), ("ne", "!="), ("eq", "="),
+    ("contains", None), ("datestartswith", None),
+]
+_FILTER_PART = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s*(?P<operator>"
+    + "|".join(sorted((re.escape(token) for pair in FILTER_OPERATORS for token in pair if token),
+                      key=len, reverse=True))
+    + r")\s*(?P<value>.*)$"
+)
+_COMPARISONS = {"ge": op.ge, "le": op.le, "lt": op.lt, "gt": op.gt, "ne": op.ne, "eq": op.eq}
+_CANONICAL = {token: name for name, symbol in FILTER_OPERATORS for token in (name, symbol) if token}
+
+
+def split_filter_part(part):
+    # "{Device Name} contains A01" -> ("Device Name", "contains", "A01")
+    match = _FILTER_PART.match(part.strip())
+    if match is None:
+        return None, None, None
+    value = match.group("value").strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"`":
+        value = value[1:-1]
+    return match.group("column"), _CANONICAL[match.group("operator")], value
+
+
+def apply_filter(frame, filter_query):
+    # 多个条件以 " && " 连接，全部满足的行保留
+    if not filter_query:
+        return frame
+    for part in filter_query.split(" && "):
+        column, operator, value = split_filter_part(part)
+        if column not in frame.columns:
+            continue
+        series = frame[column]
+        if operator in ("contains", "datestartswith"):
+            text = series.astype(str)
+            mask = text.str.startswith(value) if operator == "datestartswith" else text.str.contains(value, regex=False)
+        else:
+            # 数值列按数值比较，其余列（设备名、日期）按文本比较
+            if pd.api.types.is_numeric_dtype(series):
+                try:
+                    value = float(value)
+                except ValueError:
+                    continue  # 数值列上的非数值条件忽略
+            else:
+                series = series.astype(str)
+            mask = _COMPARISONS[operator](series, value)
+        frame = frame[mask]
+    return frame
+
+
+def apply_sort(frame, sort_by):
+    # sort_by: [{"column_id": ..., "direction": "asc" | "desc"}, ...]
+    sort_by = [item for item in (sort_by or []) if item["column_id"] in frame.columns]
+    if not sort_by:
+        return frame
+    return frame.sort_values(
+        [item["column_id"] for item in sort_by],
+        ascending=[item["direction"] == "asc" for item in sort_by],
+        kind="mergesort",
+        na_position="last",
+    )
+
+
+def page_of(frame, page_current, page_size):
+    # 返回 (当前页数据, 总页数)；页码越界时回到最后一页
+    page_count = max(1, math.ceil(len(frame) / page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+    return frame.iloc[start:start + page_size], page_count
@@ -0,0 +1,191 @@
+# 传输优化：响应压缩、静态资源长期缓存、条件请求（ETag）和传输字节统计，挂接在 Flask 服务的请求钩子上
+# - 压缩：客户端接受且响应不小于 min_bytes 时压缩文本类响应，优先 brotli（未安装时使用 gzip）；
+#   带版本号的静态资源内容不变，压缩结果缓存后直接复用
+# - 静态资源：组件包（/_dash-component-suites，URL 含版本号）和带 ?m=<修改时间> 的 /assets 文件设置一年的 Cache-Control
+# - 回调 ETag：由数据版本 + 请求体（输出、触发的输入和选择器取值）计算，同一数据版本下相同请求的结果相同；
+#   请求头 If-None-Match 命中时直接返回 304，不执行回调。Dash 前端本身不发送条件请求，
+#   由 assets/callback_cache.js 缓存最近的回调响应并在 304 时交回缓存内容
+# - 其他 GET 响应（页面、布局、回调依赖）按内容计算 ETag，浏览器再次请求时返回 304
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict, defaultdict
+
+from flask import Response, g, request
+
+from metrics import DASH_UPDATE_PATH
+
+try:  # brotli 为可选依赖，未安装时只使用 gzip
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+# 可压缩的响应类型（图片、字体等已压缩的格式不再压缩）
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/x-javascript",
+                      "image/svg+xml")
+COMPONENT_SUITES_PATH = "/_dash-component-suites/"
+ASSETS_PATH = "/assets/"
+# 静态资源压缩结果的缓存上限（字节）
+STATIC_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+def compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def callback_etag(version, body):
+    # 回调请求的 ETag：数据版本 + 请求体
+    digest = hashlib.sha1(str(version).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()[:20]
+
+
+class Transport:
+    def __init__(self, version, min_bytes=1024, static_max_age=31536000, compression=True, etags=True):
+        self.version = version  # 可调用对象：当前数据版本（数据未就绪时为 None）
+        self.min_bytes = min_bytes
+        self.static_max_age = static_max_age
+        self.compression = compression
+        self.etags = etags
+        self._lock = threading.Lock()
+        self._static = OrderedDict()  # (路径, 查询串, 编码) -> 压缩后的内容
+        self._static_bytes = 0
+        # 按路由（回调按输出）统计：请求数、原始字节、传输字节、304 次数
+        self._stats = defaultdict(lambda: {"requests": 0, "raw_bytes": 0, "wire_bytes": 0, "not_modified": 0})
+
+    def _route(self):
+        # 统计分组：回调按输出（例如 "..chart2.figure.."），其余按路径类别
+        path = request.path
+        if path.endswith(DASH_UPDATE_PATH):
+            body = request.get_json(silent=True) or {}
+            return f"callback {body.get('output', 'unknown')}"
+        if path.startswith(COMPONENT_SUITES_PATH):
+            return "component-suites"
+        if path.startswith(ASSETS_PATH):
+            return "assets"
+        return path
+
+    def _record(self, route, raw, wire, not_modified=False):
+        with self._lock:
+            stats = self._stats[route]
+            stats["requests"] += 1
+            stats["raw_bytes"] += raw
+            stats["wire_bytes"] += wire
+            stats["not_modified"] += not_modified
+
+    def _is_static(self):
+        # 带版本号的静态资源：内容随版本号变化，可长期缓存
+        if request.path.startswith(COMPONENT_SUITES_PATH):
+            return True
+        return request.path.startswith(ASSETS_PATH) and "m" in request.args
+
+    def _encoding(self):
+        if HAS_BROTLI and request.accept_encodings["br"]:
+            return "br"
+        if request.accept_encodings["gzip"]:
+            return "gzip"
+        return None
+
+    def _compressed(self, data, encoding, static):
+        if not static:
+            return compress(data, encoding)
+        key = (request.path, request.query_string, encoding)
+        with self._lock:
+            body = self._static.get(key)
+            if body is not None:
+                self._static.move_to_end(key)
+                return body
+        body = compress(data, encoding)
+        with self._lock:
+            if key not in self._static:
+                self._static[key] = body
+                self._static_bytes += len(body)
+                while self._static_bytes > STATIC_CACHE_MAX_BYTES and len(self._static) > 1:
+                    _, evicted = self._static.popitem(last=False)
+                    self._static_bytes -= len(evicted)
+        return body
+
+    def _before_request(self):
+        # 回调请求：计算 ETag，与浏览器缓存的版本相同时直接返回 304
+        if not self.etags or request.method != "POST" or not request.path.endswith(DASH_UPDATE_PATH):
+            return None
+        version = self.version()
+        if version is None:
+            return None
+        etag = g.callback_etag = callback_etag(version, request.get_data())
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+            response.set_etag(etag)
+            self._record(self._route(), 0, 0, not_modified=True)
+            return response
+        return None
+
+    def _after_request(self, response):
+        if response.status_code == 304:
+            return response
+        static = self._is_static()
+        if static and response.status_code == 200:
+            response.headers["Cache-Control"] = f"public, max-age={self.static_max_age}, immutable"
+        if response.is_streamed and not (static and response.direct_passthrough):
+            return response  # 流式响应（例如导出文件）不统计、不压缩
+        response.direct_passthrough = False  # 静态文件由 send_file 以文件对象返回，读出后再压缩
+        route = self._route()
+        data = response.get_data()
+        raw = len(data)
+
+        etag = g.pop("callback_etag", None)
+        if response.status_code == 200:
+            if etag is not None:
+                response.set_etag(etag)
+            elif self.etags and request.method == "GET" and not static and response.get_etag() == (None, None):
+                response.add_etag()
+                response.make_conditional(request)
+                if response.status_code == 304:
+                    self._record(route, raw, 0, not_modified=True)
+                    return response
+
+        compressible = response.mimetype.startswith(COMPRESSIBLE_TYPES)
+        if compressible:
+            response.vary.add("Accept-Encoding")
+        encoding = self._encoding() if self.compression and compressible else None
+        if (response.status_code == 200 and encoding is not None and raw >= self.min_bytes
+                and "Content-Encoding" not in response.headers):
+            body = self._compressed(data, encoding, static)
+            if len(body) < raw:
+                response.set_data(body)
+                response.headers["Content-Encoding"] = encoding
+                # 压缩后的表示与原始内容不同，ETag 改为弱校验
+                tag, weak = response.get_etag()
+                if tag is not None and not weak:
+                    response.set_etag(tag, weak=True)
+        self._record(route, raw, len(response.get_data()))
+        return response
+
+    def stats(self):
+        with self._lock:
+            routes = {route: dict(stats) for route, stats in sorted(self._stats.items())}
+            static_entries, static_bytes = len(self._static), self._static_bytes
+        raw = sum(stats["raw_bytes"] for stats in routes.values())
+        wire = sum(stats["wire_bytes"] for stats in routes.values())
+        return {"encodings": ["br", "gzip"] if HAS_BROTLI else ["gzip"], "raw_bytes": raw, "wire_bytes": wire,
+                "ratio": round(wire / raw, 4) if raw else None, "static_cache_entries": static_entries,
+                "static_cache_bytes": static_bytes, "routes": routes}
+
+    def register(self, server):
+        # 在 Flask 服务上挂接请求钩子和 /transport-stats 端点；
+        # 应在其他 after_request 钩子之前挂接（Flask 按注册的逆序执行），压缩在最后一步进行，埋点记录的仍是原始大小
+        server.before_request(self._before_request)
+        server.after_request(self._after_request)
+
+        @server.route("/transport-stats")
+        def transport_stats():
+            # 各路由的原始字节数和实际传输字节数、304 次数
+            return self.stats()
+
+        return transport_stats
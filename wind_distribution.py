@@ -0,0 +1,134 @@
+# 风速分布：加载时一次构建按 (设备, 日, 风速区间) 统计样本数的固定分箱直方图，
+# 任意电厂/设备、任意时段的分布由相同区间的样本数直接相加得到，百分位数和分布图不再读取原始行；
+# 新数据到达时只对新增行分箱，再与现有直方图合并
+# 百分位数（P10/P50/P90）由累计分布在区间内线性插值（分辨率为一个区间宽度），
+# Weibull 参数由分布的均值和标准差按经验公式估计：k = (σ / μ)^-1.086，c = μ / Γ(1 + 1/k)
+# 风速区间与功率曲线相同（power_curve 中的定义），超出 0–MAX_WIND 的样本同样不计入
+import math
+
+import numpy as np  # 数值计算
+import pandas as pd  # 数据处理
+
+from power_curve import BIN_WIDTH, N_BINS, WIND, bin_centers, bin_edges, encode_devices, wind_bins
+
+PERCENTILES = (10, 50, 90)
+# 组合键的位宽：设备编码 | 日序号（自 1970-01-01 起）| 风速区间
+DAY_BITS, BIN_BITS = 24, 8
+SUMMARY_COLUMNS = ["Samples", "Mean (m/s)"] + [f"P{q} (m/s)" for q in PERCENTILES] + ["Weibull k", "Weibull c (m/s)"]
+
+
+def summarize(counts):
+    # 直方图矩阵 (行, N_BINS) → 每行的样本数、均值、百分位数和 Weibull 参数
+    counts = np.atleast_2d(np.asarray(counts, dtype=np.float64))
+    total = counts.sum(axis=1)
+    centers = bin_centers()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = counts @ centers / total
+        std = np.sqrt(np.maximum(counts @ centers ** 2 / total - mean ** 2, 0))
+        data = {"Samples": total, "Mean (m/s)": mean}
+        # 百分位数：累计样本数首次达到目标的区间内线性插值
+        cumulative = np.cumsum(counts, axis=1)
+        rows = np.arange(len(counts))
+        for q in PERCENTILES:
+            target = total * q / 100
+            position = np.minimum((cumulative < target[:, None]).sum(axis=1), N_BINS - 1)
+            below = np.where(position > 0, cumulative[rows, position - 1], 0.0)
+            fraction = (target - below) / counts[rows, position]
+            data[f"P{q} (m/s)"] = np.where(total > 0, (position + fraction) * BIN_WIDTH, np.nan)
+        k = (std / mean) ** -1.086
+    gamma = np.array([math.gamma(1 + 1 / value) if np.isfinite(value) and value > 0 else np.nan for value in k])
+    data["Weibull k"] = np.where(np.isfinite(k), k, np.nan)
+    data["Weibull c (m/s)"] = mean / gamma
+    return pd.DataFrame(data, columns=SUMMARY_COLUMNS)
+
+
+def weibull_bin_probabilities(k, c):
+    # 拟合的 Weibull 分布落在各区间的概率（以 0–MAX_WIND 内的概率归一化，与不计入更大风速的直方图一致）
+    cdf = 1 - np.exp(-(bin_edges() / c) ** k)
+    return np.diff(cdf) / cdf[-1]
+
+
+class WindHistograms:
+    # 状态只有设备标签和 (设备, 日, 区间) 的样本数，可直接相加合并
+    def __init__(self, plants, devices, keys, counts):
+        self.plants = plants  # pd.Index：电厂
+        self.devices = devices  # pd.MultiIndex：(电厂, 设备)
+        self.keys, self.counts = keys, counts  # 按组合键排序
+        self.device = keys >> (DAY_BITS + BIN_BITS)
+        self.bin = keys & ((1 << BIN_BITS) - 1)
+        months = ((keys >> BIN_BITS) & ((1 << DAY_BITS) - 1)).astype("datetime64[D]").astype("datetime64[M]")
+        self.period = months.astype(np.int64) + 1970 * 12  # 年 * 12 + 月 - 1
+        self.plant = plants.get_indexer(devices.get_level_values(0))[self.device]
+
+    @classmethod
+    def from_bins(cls, plant, device, days, bins, counts, plants=None, devices=None):
+        # 已分箱的样本：(电厂, 设备, 日序号, 区间, 样本数)；设备为空或区间为 -1 的样本不计入
+        plant, device = np.asarray(plant, dtype=object), np.asarray(device, dtype=object)
+        valid = pd.notna(device) & (bins >= 0)
+        plants, devices, codes = encode_devices(plant[valid], device[valid], plants, devices)
+        days = np.asarray(days, dtype=np.int64)[valid]
+        keys = (codes.astype(np.int64) << (DAY_BITS + BIN_BITS)) | (days << BIN_BITS) | bins[valid]
+        keys, counts = cls._reduce(keys, np.asarray(counts, dtype=np.float64)[valid])
+        return cls(plants, devices, keys, counts)
+
+    @classmethod
+    def from_rows(cls, df, plants=None, devices=None):
+        # 清洗后的原始行：每行一个风速样本
+        days = df["Statistical time"].to_numpy().astype("datetime64[D]").astype(np.int64)
+        return cls.from_bins(df["Power plant name"].to_numpy(), df["Device Name"].to_numpy(), days,
+                             wind_bins(df[WIND].to_numpy()), np.ones(len(df)), plants, devices)
+
+    @staticmethod
+    def _reduce(keys, counts):
+        # 相同组合键的样本数相加（结果按键排序）
+        keys, inverse = np.unique(keys, return_inverse=True)
+        return keys, np.bincount(inverse, weights=counts, minlength=len(keys))
+
+    def extend(self, new_rows):
+        # 增量更新：只对新增行分箱，与现有直方图合并
+        added = WindHistograms.from_rows(new_rows, self.plants, self.devices)
+        keys, counts = self._reduce(np.concatenate([self.keys, added.keys]),
+                                    np.concatenate([self.counts, added.counts]))
+        return WindHistograms(added.plants, added.devices, keys, counts)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes + self.counts.nbytes
+
+    def _mask(self, plant, year, month=None):
+        # 指定电厂、年份（和月份）的样本
+        plant_code = self.plants.get_indexer([plant])[0]
+        if month is None:
+            period = self.period // 12 == year
+        else:
+            period = self.period == year * 12 + month - 1
+        return (self.plant == plant_code) & period
+
+    def histogram(self, plant, year, month=None):
+        # 电厂在时段内各区间的样本数
+        mask = self._mask(plant, year, month)
+        return np.bincount(self.bin[mask], weights=self.counts[mask], minlength=N_BINS)
+
+    def distribution(self, plant, year, month=None):
+        # 电厂分布的统计量（一行）
+        return summarize(self.histogram(plant, year, month)).iloc[0]
+
+    def device_summary(self, plant, year, month=None):
+        # 电厂内每台设备在时段内的分布统计量，按设备名排序
+        mask = self._mask(plant, year, month)
+        codes, inverse = np.unique(self.device[mask], return_inverse=True)
+        counts = np.bincount(inverse * N_BINS + self.bin[mask], weights=self.counts[mask],
+                             minlength=len(codes) * N_BINS).reshape(len(codes), N_BINS)
+        summary = summarize(counts)
+        summary.insert(0, "Device Name", self.devices.get_level_values(1)[codes])
+        return summary.sort_values("Device Name", kind="mergesort").reset_index(drop=True)
+
+    def monthly_summary(self, plant, year):
+        # 电厂在所选年份各月的分布统计量（无数据的月份样本数为 0）
+        mask = self._mask(plant, year)
+        months = self.period[mask] - year * 12
+        counts = np.bincount(months * N_BINS + self.bin[mask], weights=self.counts[mask],
+                             minlength=12 * N_BINS).reshape(12, N_BINS)
+        summary = summarize(counts)
+        summary.insert(0, "Month", np.arange(1, 13))
+        return summary
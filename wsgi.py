@@ -0,0 +1,46 @@
+# 生产部署入口：由预派生（pre-fork）的 WSGI 服务器加载
+#   gunicorn -c gunicorn.conf.py wsgi:application
+# 默认（preload_app）本模块在主进程中导入一次，数据在 fork 前同步加载一次；fork 后各工作进程以写时复制方式共享快照
+# DASH_BACKGROUND_LOAD=1 时工作进程立即开始接受请求，各自在后台加载数据（不共享内存，/readyz 就绪前返回 503）
+import gc
+import os
+
+from PPT1 import create_app
+
+background_load = os.environ.get("DASH_BACKGROUND_LOAD") == "1"
+app = create_app({"load_mode": "deferred" if background_load else "sync"})
+application = server = app.server
+
+# 加载过程中的临时对象先回收，其余对象冻结到永久代：
+# 工作进程中的垃圾回收不再扫描（写入）这些对象，数据所在的内存页保持共享
+gc.collect()
+gc.freeze()
+
+
+def start_worker():
+    # fork 后在每个工作进程中调用（线程不会随 fork 复制）：
+    # 后台加载模式下启动加载线程，加载完成后开始监视数据源；否则直接监视数据源，新数据只追加到本进程的快照
+    if background_load:
+        app.data_loader.start(watch=True)
+    else:
+        app.data_loader.start_watcher()
+
+
+def process_memory():
+    # 当前进程的内存占用（KB）；Linux 下区分共享页和私有页，用于评估每个工作进程的额外开销
+    memory = {"pid": os.getpid()}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                field, _, value = line.partition(":")
+                if field in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty"):
+                    memory[field] = int(value.split()[0])
+    except OSError:
+        import resource
+        memory["MaxRss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return memory
+
+
+@server.route("/worker-memory")
+def worker_memory():
+    return process_memory()